@@ -1,6 +1,6 @@
 # agent.py
 from pydantic_ai import Agent
-from tools import get_research
+from tools import get_research, get_research_many
 
 # A simple Research Agent using pydantic-ai
 model = "google-gla:gemini-2.5-flash"
@@ -10,9 +10,11 @@ research_agent = Agent(
         "You are a research assistant. "
         "When users ask for information about a specific topic "
         "use the get_research tool with clear, specific keywords. "
+        "When a question needs several topics (comparisons, multi-part or broad questions), "
+        "call get_research_many once with all of the topics instead of calling get_research repeatedly. "
         "For follow-up questions like 'elaborate' or 'more details', provide detailed explanations using your existing knowledge "
         "rather than calling the research tool again with vague terms. "
         "Always explain results clearly and simply."
     ),
-    tools=[get_research],
+    tools=[get_research, get_research_many],
 )
@@ -0,0 +1,222 @@
+# answer_cache.py
+import os
+import random
+import re
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import replace
+from typing import Awaitable, Callable, Dict, FrozenSet, List, Optional, Set
+import logfire
+from pydantic_ai.messages import ModelRequest
+
+# Answer cache settings, overridable from the environment
+ENABLED = os.getenv("RESEARCH_ANSWER_CACHE", "1") not in ("0", "false", "False")
+THRESHOLD = float(os.getenv("RESEARCH_ANSWER_CACHE_THRESHOLD", "0.9"))
+TTL = float(os.getenv("RESEARCH_ANSWER_CACHE_TTL", "3600"))
+MAX_ENTRIES = int(os.getenv("RESEARCH_ANSWER_CACHE_ENTRIES", "5000"))
+
+NGRAM = 3
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+_PRIME = (1 << 61) - 1
+
+# Words that only pad a request. Question words (who/why/how) and tense
+# (is/was/does/did) change the answer, so they stay in the fingerprint.
+FILLER = frozenset("a an the please explain tell me about describe you".split())
+# Definitional openings ask the same thing as "explain X", so a leading one is
+# dropped too. Only these: "what was" or "who is" still change the question.
+LEAD_INS = (("what", "is"), ("what", "are"), ("what", "s"), ("whats",), ("define",),
+            ("definition", "of"), ("meaning", "of"))
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+_hits_counter = logfire.metric_counter("answer_cache.hits", unit="1", description="Answer cache hits")
+_misses_counter = logfire.metric_counter("answer_cache.misses", unit="1", description="Answer cache misses")
+_saved_counter = logfire.metric_counter("answer_cache.saved_ms", unit="ms", description="Latency saved by answer cache hits")
+
+
+def words(question: str) -> List[str]:
+    tokens = _WORD_RE.findall(question.lower())
+    for lead in LEAD_INS:
+        if len(tokens) > len(lead) and tuple(tokens[:len(lead)]) == lead:
+            tokens = tokens[len(lead):]
+            break
+    return [w for w in tokens if w not in FILLER]
+
+
+def numbers(question: str) -> FrozenSet[str]:
+    """Tokens containing digits (years, versions, quantities); these must match exactly"""
+    return frozenset(w for w in _WORD_RE.findall(question.lower()) if any(c.isdigit() for c in w))
+
+
+def shingles(question: str) -> FrozenSet[str]:
+    """Character n-grams of the question with filler ("the", "explain", a leading "what is") removed"""
+    text = " ".join(words(question)) or question.lower().strip()
+    if len(text) <= NGRAM:
+        return frozenset([text])
+    return frozenset(text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1))
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+class CachedAnswer:
+    """Stands in for an agent run result on a cache hit"""
+
+    def __init__(self, output: str, messages: List, similarity: float):
+        self.output = output
+        self._messages = messages
+        self.similarity = similarity
+
+    def all_messages(self) -> List:
+        return list(self._messages)
+
+
+class _Entry:
+    __slots__ = ("question", "shingles", "numbers", "signature", "output", "messages", "latency_ms", "expires_at")
+
+
+class AnswerCache:
+    """
+    Near-duplicate question cache. Candidates come from MinHash LSH buckets
+    over character n-grams and are verified with exact Jaccard similarity;
+    a candidate whose numbers differ from the question's never matches.
+    """
+
+    def __init__(self, threshold: float = THRESHOLD, ttl: float = TTL, max_entries: int = MAX_ENTRIES):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        rng = random.Random(1234)
+        self._perms = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._buckets: Dict[tuple, Set[int]] = defaultdict(set)
+        self._next_id = 0
+        self.stats = {"hits": 0, "misses": 0, "saved_ms": 0.0}
+
+    def _signature(self, grams: FrozenSet[str]) -> List[int]:
+        hashes = [hash(g) & 0xFFFFFFFFFFFF for g in grams]
+        return [min((a * h + b) % _PRIME for h in hashes) for a, b in self._perms]
+
+    def _bands(self, signature: List[int]):
+        for band in range(BANDS):
+            yield (band, *signature[band * ROWS:(band + 1) * ROWS])
+
+    def _remove(self, entry_id: int):
+        entry = self._entries.pop(entry_id)
+        for key in self._bands(entry.signature):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def lookup(self, question: str) -> Optional[CachedAnswer]:
+        grams = shingles(question)
+        question_numbers = numbers(question)
+        signature = self._signature(grams)
+        now = time.time()
+
+        candidates: Set[int] = set()
+        for key in self._bands(signature):
+            candidates |= self._buckets.get(key, set())
+
+        best, best_score = None, 0.0
+        for entry_id in candidates:
+            entry = self._entries.get(entry_id)
+            if entry is None:
+                continue
+            if now >= entry.expires_at:
+                self._remove(entry_id)
+                continue
+            if entry.numbers != question_numbers:
+                continue
+            score = jaccard(grams, entry.shingles)
+            if score > best_score:
+                best, best_score = entry, score
+
+        if best is None or best_score < self.threshold:
+            self.stats["misses"] += 1
+            _misses_counter.add(1)
+            return None
+
+        self.stats["hits"] += 1
+        self.stats["saved_ms"] += best.latency_ms
+        _hits_counter.add(1)
+        _saved_counter.add(int(best.latency_ms))
+        logfire.info(
+            "Answer cache hit",
+            question=question,
+            matched=best.question,
+            similarity=round(best_score, 3),
+            saved_ms=round(best.latency_ms, 1),
+            hit_rate=round(self.hit_rate(), 3),
+        )
+        return CachedAnswer(best.output, self._rewrite_prompt(best.messages, question), best_score)
+
+    @staticmethod
+    def _rewrite_prompt(messages: List, question: str) -> List:
+        """Put the new wording of the question into the cached history"""
+        messages = list(messages)
+        for i, message in enumerate(messages):
+            if isinstance(message, ModelRequest):
+                parts = [replace(p, content=question) if p.part_kind == "user-prompt" else p for p in message.parts]
+                messages[i] = replace(message, parts=parts)
+                break
+        return messages
+
+    def store(self, question: str, output: str, messages: List, latency_ms: float):
+        entry = _Entry()
+        entry.question = question
+        entry.shingles = shingles(question)
+        entry.numbers = numbers(question)
+        entry.signature = self._signature(entry.shingles)
+        entry.output = output
+        entry.messages = list(messages)
+        entry.latency_ms = latency_ms
+        entry.expires_at = time.time() + self.ttl
+
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = entry
+        for key in self._bands(entry.signature):
+            self._buckets[key].add(entry_id)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def hit_rate(self) -> float:
+        total = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / total if total else 0.0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_cache: Optional[AnswerCache] = None
+
+
+def get_answer_cache() -> Optional[AnswerCache]:
+    """Process-wide answer cache, or None when disabled"""
+    global _cache
+    if ENABLED and _cache is None:
+        _cache = AnswerCache()
+    return _cache
+
+
+async def cached_run(user_message: str, history: list, run: Callable[[], Awaitable]):
+    """
+    Serve first-turn questions from the answer cache, otherwise call `run()`
+    and remember its answer. Follow-up turns always go to the agent.
+    """
+    cache = get_answer_cache() if not history else None
+    if cache is not None:
+        hit = cache.lookup(user_message)
+        if hit is not None:
+            return hit
+
+    started = time.perf_counter()
+    result = await run()
+    if cache is not None:
+        cache.store(user_message, str(result.output), result.all_messages(), (time.perf_counter() - started) * 1000)
+    return result
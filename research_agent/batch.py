@@ -0,0 +1,136 @@
+# batch.py
+"""
+Batch research: answer a file of questions concurrently and write JSONL.
+
+Input is one question per line, or JSONL objects with "question" and an
+optional "id" (line number otherwise); lines without a question are
+skipped with a warning. Use "-" to read from stdin.
+Results are appended to the output file as they complete. Rerunning with
+the same output file skips ids that were already answered.
+
+Usage: python batch.py questions.txt -o answers.jsonl [-c 8]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Dict, Iterator, List, Set, Tuple
+from dotenv import load_dotenv
+
+# Load environment variables BEFORE importing the agent
+load_dotenv(override=True)
+
+import logfire
+from agent import research_agent
+import http_client
+from answer_cache import cached_run
+
+
+def read_questions(source: str) -> Iterator[Tuple[str, str]]:
+    """Yield (id, question) pairs; JSONL lines without a usable question are skipped with a warning"""
+    stream = sys.stdin if source == "-" else open(source, encoding="utf-8")
+    try:
+        for line_no, line in enumerate(stream, 1):
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                try:
+                    record = json.loads(line)
+                    question = record["question"]
+                except (json.JSONDecodeError, KeyError):
+                    question = None
+                if not isinstance(question, str) or not question.strip():
+                    # One bad line should not abort the whole batch
+                    logfire.warn("Skipping batch input line without a question", line=line_no)
+                    print(f"Skipping line {line_no}: no \"question\"", file=sys.stderr)
+                    continue
+                yield str(record.get("id", line_no)), question
+            else:
+                yield str(line_no), line
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def completed_ids(output: str) -> Set[str]:
+    """Ids already present in the output file (successful answers only)"""
+    done = set()
+    if not os.path.exists(output):
+        return done
+    with open(output, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # partial line from an interrupted run
+            if "answer" in record:
+                done.add(record["id"])
+    return done
+
+
+async def run_batch(questions: List[Tuple[str, str]], output: str, concurrency: int) -> Dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    with open(output, "a", encoding="utf-8") as out:
+
+        async def answer(qid: str, question: str):
+            nonlocal errors
+            async with semaphore:
+                started = time.perf_counter()
+                record = {"id": qid, "question": question}
+                try:
+                    result = await cached_run(question, [], lambda: research_agent.run(question))
+                    record["answer"] = str(result.output)
+                except Exception as e:
+                    errors += 1
+                    record["error"] = f"{type(e).__name__}: {e}"
+                    logfire.warn("Batch question failed", id=qid, error=str(e))
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                latencies.append(elapsed_ms)
+                record["latency_ms"] = round(elapsed_ms, 2)
+                # One write per line keeps the file resumable after an interruption
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(answer(qid, q) for qid, q in questions))
+        wall = time.perf_counter() - started
+
+    return {
+        "answered": len(latencies) - errors,
+        "errors": errors,
+        "wall_seconds": round(wall, 2),
+        "throughput_qps": round(len(latencies) / wall, 2) if wall else 0.0,
+        "p50_ms": round(statistics.median(latencies), 1) if latencies else 0.0,
+        "p95_ms": round(sorted(latencies)[int(0.95 * (len(latencies) - 1))], 1) if latencies else 0.0,
+    }
+
+
+async def main(args):
+    logfire.configure()
+    logfire.instrument_pydantic_ai()
+
+    done = completed_ids(args.output)
+    questions = [(qid, q) for qid, q in read_questions(args.input) if qid not in done]
+    print(f"{len(questions)} questions to answer ({len(done)} already done), concurrency {args.concurrency}")
+
+    async with http_client.lifespan():
+        stats = await run_batch(questions, args.output, args.concurrency)
+
+    stats["skipped"] = len(done)
+    logfire.info("Batch completed", **stats)
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Answer a file of research questions concurrently")
+    parser.add_argument("input", help="questions file (text or JSONL), or - for stdin")
+    parser.add_argument("-o", "--output", default="answers.jsonl")
+    parser.add_argument("-c", "--concurrency", type=int, default=8)
+    asyncio.run(main(parser.parse_args()))
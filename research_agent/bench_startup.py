@@ -0,0 +1,63 @@
+# bench_startup.py
+"""
+Startup benchmark for the research CLI.
+
+Reports, over several runs:
+  ready_ms           process start until the background warm-up (telemetry,
+                     agent and tool imports) has finished, i.e. until the
+                     first question can be answered (minus bare interpreter start)
+  time_to_prompt_ms  process start until the first "You: " prompt is printed
+
+Usage: python bench_startup.py [runs]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _wall_ms(args) -> float:
+    started = time.perf_counter()
+    subprocess.run(args, cwd=HERE, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return (time.perf_counter() - started) * 1000
+
+
+def measure_ready() -> float:
+    baseline = _wall_ms([sys.executable, "-c", "pass"])
+    # _ready() raises if the warm-up failed, which fails the run
+    return _wall_ms([sys.executable, "-c", "import asyncio, main; asyncio.run(main._ready())"]) - baseline
+
+
+def measure_time_to_prompt() -> float:
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-u", "main.py"],
+        cwd=HERE,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+    seen = b""
+    while b"You: " not in seen:
+        chunk = proc.stdout.read1(1024)
+        if not chunk:
+            break
+        seen += chunk
+    elapsed = (time.perf_counter() - started) * 1000
+    proc.communicate(b"exit\n", timeout=30)
+    return elapsed
+
+
+def main(runs: int = 5):
+    ready = [measure_ready() for _ in range(runs)]
+    prompts = [measure_time_to_prompt() for _ in range(runs)]
+    print(f"runs: {runs}")
+    print(f"ready_ms           median {statistics.median(ready):8.1f}  min {min(ready):8.1f}")
+    print(f"time_to_prompt_ms  median {statistics.median(prompts):8.1f}  min {min(prompts):8.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,201 @@
+# benchmark.py
+"""
+Offline benchmark for research_agent.
+
+Runs the real agent and tools against a scripted stand-in model
+(pydantic-ai FunctionModel) and a local fake DuckDuckGo server, so no
+Gemini quota or internet access is needed.
+
+Usage:
+  python benchmark.py                                  # default profile
+  python benchmark.py --ddg-latency 0.2 --error-rate 0.1 --concurrency 1 8 32
+  python benchmark.py --save-baseline bench_baseline.json
+  python benchmark.py --compare bench_baseline.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import time
+from typing import Dict, List
+
+# Point the research tool at the fake server and keep the benchmark self-contained.
+# These must be set before the agent modules are imported.
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+_port = _free_port()
+os.environ["RESEARCH_DDG_URL"] = f"http://127.0.0.1:{_port}/"
+os.environ.setdefault("RESEARCH_CACHE_PATH", "")
+os.environ.setdefault("RESEARCH_HTTP2", "0")
+os.environ.setdefault("LOGFIRE_IGNORE_NO_CONFIG", "1")
+# The real model is never called, but constructing the agent needs a key
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+
+import uvicorn
+from fastapi import FastAPI, Response
+from pydantic_ai.messages import ModelMessage, ModelResponse, TextPart, ToolCallPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+from agent import research_agent
+import http_client
+
+
+# --- Fake DuckDuckGo ---
+
+def fake_duckduckgo(latency: float, jitter: float, error_rate: float, empty_rate: float) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/")
+    async def instant_answer(q: str = ""):
+        await asyncio.sleep(max(0.0, random.gauss(latency, jitter)))
+        roll = random.random()
+        if roll < error_rate:
+            return Response(status_code=500, content="upstream error")
+        if roll < error_rate + empty_rate:
+            return {"AbstractText": "", "Answer": "", "RelatedTopics": []}
+        return {
+            "AbstractText": f"{q} is a topic with a reasonably long abstract. " * 5,
+            "RelatedTopics": [
+                {"Text": f"{q} related topic {i}", "FirstURL": f"https://duckduckgo.com/{q.replace(' ', '_')}_related_{i}"}
+                for i in range(5)
+            ],
+        }
+
+    return app
+
+
+async def start_server(app: FastAPI, port: int):
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    return server, task
+
+
+# --- Scripted model ---
+
+def scripted_model(model_latency: float) -> FunctionModel:
+    """First step calls get_research with the user's question, second step answers"""
+
+    async def respond(messages: List[ModelMessage], info: AgentInfo) -> ModelResponse:
+        await asyncio.sleep(model_latency)
+        last = messages[-1].parts[-1]
+        if last.part_kind == "user-prompt":
+            return ModelResponse(parts=[ToolCallPart("get_research", {"topic": last.content})])
+        return ModelResponse(parts=[TextPart("Here is a short summary of the research results.")])
+
+    return FunctionModel(respond)
+
+
+# --- Load generation ---
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))]
+
+
+async def run_level(concurrency: int, turns: int, topics: int) -> Dict:
+    latencies: List[float] = []
+    tool_calls = 0
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one_turn(i: int):
+        nonlocal tool_calls, errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                result = await research_agent.run(f"benchmark topic {concurrency}-{i % topics}")
+            except Exception:
+                errors += 1
+                return
+            latencies.append((time.perf_counter() - started) * 1000)
+            tool_calls += sum(
+                1 for m in result.all_messages() for p in m.parts if p.part_kind == "tool-call"
+            )
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_turn(i) for i in range(turns)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "turns": turns,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "mean_ms": round(statistics.mean(latencies), 2) if latencies else 0.0,
+        "tool_calls": tool_calls,
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+    }
+
+
+def print_report(results: List[Dict], baseline: Dict = None):
+    header = f"{'conc':>5} {'turns':>6} {'err':>4} {'p50_ms':>9} {'p95_ms':>9} {'p99_ms':>9} {'tools':>6} {'rps':>8}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['concurrency']:>5} {r['turns']:>6} {r['errors']:>4} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} "
+            f"{r['p99_ms']:>9.1f} {r['tool_calls']:>6} {r['throughput_rps']:>8.1f}"
+        )
+        base = (baseline or {}).get(str(r["concurrency"]))
+        if base:
+            deltas = []
+            for key in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps"):
+                if base[key]:
+                    deltas.append(f"{key} {100 * (r[key] - base[key]) / base[key]:+.1f}%")
+            print("      vs baseline: " + ", ".join(deltas))
+
+
+async def main(args):
+    random.seed(args.seed)
+    server, server_task = await start_server(
+        fake_duckduckgo(args.ddg_latency, args.ddg_jitter, args.error_rate, args.empty_rate), _port
+    )
+    results = []
+    try:
+        with research_agent.override(model=scripted_model(args.model_latency)):
+            for concurrency in args.concurrency:
+                results.append(await run_level(concurrency, args.turns, args.topics))
+    finally:
+        await http_client.aclose_client()
+        server.should_exit = True
+        await server_task
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    print_report(results, baseline)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({"profile": vars(args), "results": {str(r["concurrency"]): r for r in results}}, f, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline research_agent benchmark")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--turns", type=int, default=100, help="agent turns per concurrency level")
+    parser.add_argument("--topics", type=int, default=1000, help="distinct topics (lower = more cache hits)")
+    parser.add_argument("--model-latency", type=float, default=0.05, help="seconds per scripted model step")
+    parser.add_argument("--ddg-latency", type=float, default=0.1, help="mean fake DuckDuckGo latency (s)")
+    parser.add_argument("--ddg-jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of 500 responses")
+    parser.add_argument("--empty-rate", type=float, default=0.0, help="share of empty answers")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--compare", metavar="PATH")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,140 @@
+# circuit_breaker.py
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable
+import logfire
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Bounds for the adaptive per-call timeout, overridable from the environment
+MIN_TIMEOUT = float(os.getenv("RESEARCH_TIMEOUT_MIN", "1"))
+MAX_TIMEOUT = float(os.getenv("RESEARCH_TIMEOUT_MAX", "10"))
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the upstream while the breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker with an adaptive timeout.
+
+    Opens when the error rate or slow-call rate over the recent window crosses
+    its threshold, stays open for `open_seconds`, then lets a limited number
+    of trial calls through (half-open) before closing again.
+    The per-call timeout follows the observed p95 latency.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: int = int(os.getenv("RESEARCH_BREAKER_WINDOW", "20")),
+        min_calls: int = int(os.getenv("RESEARCH_BREAKER_MIN_CALLS", "5")),
+        error_rate: float = float(os.getenv("RESEARCH_BREAKER_ERROR_RATE", "0.5")),
+        slow_call_seconds: float = float(os.getenv("RESEARCH_BREAKER_SLOW_CALL", "5")),
+        slow_call_rate: float = float(os.getenv("RESEARCH_BREAKER_SLOW_RATE", "0.8")),
+        open_seconds: float = float(os.getenv("RESEARCH_BREAKER_OPEN_SECONDS", "30")),
+        half_open_calls: int = 1,
+        min_timeout: float = MIN_TIMEOUT,
+        max_timeout: float = MAX_TIMEOUT,
+        timeout_multiplier: float = 2.0,
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout_multiplier = timeout_multiplier
+
+        # (succeeded, latency seconds) for the most recent calls
+        self._outcomes: deque = deque(maxlen=window)
+        self.state = CLOSED
+        self._opened_at = 0.0
+        self._trials = 0
+
+    # --- State ---
+
+    def _transition(self, new_state: str, reason: str = ""):
+        if new_state == self.state:
+            return
+        log = logfire.warn if new_state == OPEN else logfire.info
+        log("Circuit breaker state changed", breaker=self.name, old_state=self.state, new_state=new_state, reason=reason)
+        self.state = new_state
+        if new_state == OPEN:
+            self._opened_at = time.monotonic()
+        if new_state == HALF_OPEN:
+            self._trials = 0
+        if new_state == CLOSED:
+            self._outcomes.clear()
+
+    def allow(self) -> bool:
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < self.open_seconds:
+                return False
+            self._transition(HALF_OPEN, "cooldown elapsed")
+        if self.state == HALF_OPEN:
+            if self._trials >= self.half_open_calls:
+                return False
+            self._trials += 1
+        return True
+
+    def record(self, succeeded: bool, latency: float):
+        if self.state == HALF_OPEN:
+            if succeeded and latency < self.slow_call_seconds:
+                self._transition(CLOSED, "trial call succeeded")
+            else:
+                self._transition(OPEN, "trial call failed")
+            return
+
+        self._outcomes.append((succeeded, latency))
+        if len(self._outcomes) < self.min_calls:
+            return
+        failures = sum(1 for ok, _ in self._outcomes if not ok)
+        slow = sum(1 for _, elapsed in self._outcomes if elapsed >= self.slow_call_seconds)
+        if failures / len(self._outcomes) >= self.error_rate:
+            self._transition(OPEN, f"error rate {failures}/{len(self._outcomes)}")
+        elif slow / len(self._outcomes) >= self.slow_call_rate:
+            self._transition(OPEN, f"slow call rate {slow}/{len(self._outcomes)}")
+
+    # --- Adaptive timeout ---
+
+    def p95(self) -> float:
+        latencies = sorted(elapsed for ok, elapsed in self._outcomes if ok)
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+
+    def timeout(self) -> float:
+        p95 = self.p95()
+        if not p95:
+            return self.max_timeout
+        return max(self.min_timeout, min(self.max_timeout, p95 * self.timeout_multiplier))
+
+    # --- Calls ---
+
+    async def call(self, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} circuit is open")
+
+        timeout = self.timeout()
+        started = time.monotonic()
+        try:
+            result = await asyncio.wait_for(fn(*args, **kwargs), timeout=timeout)
+        except asyncio.CancelledError:
+            # Cancelled by the caller: not the upstream's fault
+            if self.state == HALF_OPEN:
+                self._trials -= 1
+            raise
+        except Exception:
+            self.record(False, time.monotonic() - started)
+            raise
+        self.record(True, time.monotonic() - started)
+        return result
@@ -0,0 +1,137 @@
+# history.py
+import json
+import os
+from dataclasses import replace
+from typing import List, Tuple
+import logfire
+from pydantic_ai.messages import ModelMessage, ModelRequest, ModelResponse, TextPart
+
+# History budget, overridable from the environment
+TOKEN_BUDGET = int(os.getenv("RESEARCH_HISTORY_TOKENS", "4000"))
+KEEP_RECENT_TURNS = int(os.getenv("RESEARCH_HISTORY_KEEP_TURNS", "3"))
+# Replace tool results from earlier turns with a short reference (set to 0 to only do so when over budget)
+TOOL_REFS = os.getenv("RESEARCH_HISTORY_TOOL_REFS", "1") not in ("0", "false", "False")
+SUMMARY_CHARS = 300
+
+# Rough chars-per-token ratio; good enough for budgeting without a tokenizer
+CHARS_PER_TOKEN = 4
+
+
+def _part_text(part) -> str:
+    if part.part_kind == "tool-call":
+        args = part.args
+        return part.tool_name + (args if isinstance(args, str) else json.dumps(args or {}))
+    content = getattr(part, "content", "")
+    return content if isinstance(content, str) else str(content)
+
+
+def estimate_tokens(messages: List[ModelMessage]) -> int:
+    chars = sum(len(_part_text(part)) for message in messages for part in message.parts)
+    return chars // CHARS_PER_TOKEN
+
+
+def split_turns(messages: List[ModelMessage]) -> List[List[ModelMessage]]:
+    """Group messages into turns, each starting at a request with a user prompt"""
+    turns: List[List[ModelMessage]] = []
+    for message in messages:
+        starts_turn = isinstance(message, ModelRequest) and any(
+            part.part_kind == "user-prompt" for part in message.parts
+        )
+        if starts_turn or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+class HistoryManager:
+    """
+    Keeps conversation history within a token budget.
+
+    The most recent turns are kept verbatim. Older turns are reduced to the
+    user prompt plus a truncated final answer (tool calls dropped), and the
+    oldest are dropped entirely if that is still over budget.
+    """
+
+    def __init__(self, token_budget: int = TOKEN_BUDGET, keep_recent_turns: int = KEEP_RECENT_TURNS):
+        self.token_budget = token_budget
+        self.keep_recent_turns = keep_recent_turns
+        self.total_saved = 0
+
+    def _summarize_turn(self, turn: List[ModelMessage]) -> List[ModelMessage]:
+        request = turn[0]
+        responses = [m for m in turn if isinstance(m, ModelResponse)]
+        answer = ""
+        if responses:
+            answer = "".join(p.content for p in responses[-1].parts if p.part_kind == "text").strip()
+        if not answer:
+            return []
+
+        if len(answer) > SUMMARY_CHARS:
+            answer = answer[:SUMMARY_CHARS].rstrip() + "…"
+        user_parts = [p for p in request.parts if p.part_kind in ("system-prompt", "user-prompt")]
+        return [replace(request, parts=user_parts), replace(responses[-1], parts=[TextPart(content=answer)])]
+
+    def _reference_tool_returns(self, turn: List[ModelMessage]) -> List[ModelMessage]:
+        """Swap tool-return payloads for a short reference to what was looked up"""
+        topics = {}
+        for message in turn:
+            if isinstance(message, ModelResponse):
+                for p in message.parts:
+                    if p.part_kind == "tool-call":
+                        args = p.args_as_dict() if hasattr(p, "args_as_dict") else {}
+                        topics[p.tool_call_id] = args.get("topic") or args.get("topics") or p.tool_name
+
+        compacted = []
+        for message in turn:
+            if isinstance(message, ModelRequest) and any(p.part_kind == "tool-return" for p in message.parts):
+                parts = [
+                    replace(p, content=f"[earlier research on {topics.get(p.tool_call_id, p.tool_name)!r} omitted]")
+                    if p.part_kind == "tool-return" else p
+                    for p in message.parts
+                ]
+                message = replace(message, parts=parts)
+            compacted.append(message)
+        return compacted
+
+    def compact(self, messages: List[ModelMessage]) -> Tuple[List[ModelMessage], int]:
+        """Return (compacted history, estimated prompt tokens saved)"""
+        before = estimate_tokens(messages)
+        turns = split_turns(messages)
+        if not turns:
+            return messages, 0
+
+        # The system prompt lives in the very first request; keep it whatever happens to that turn
+        system_parts = [p for p in turns[0][0].parts if p.part_kind == "system-prompt"]
+
+        recent = turns[-self.keep_recent_turns:] if self.keep_recent_turns else []
+        old = [self._summarize_turn(turn) for turn in turns[:len(turns) - len(recent)]]
+        old = [turn for turn in old if turn]
+
+        def flatten():
+            return [m for turn in old + recent for m in turn]
+
+        # Only the latest turn needs the full research payloads
+        if TOOL_REFS:
+            recent = [self._reference_tool_returns(turn) for turn in recent[:-1]] + recent[-1:]
+        while old and estimate_tokens(flatten()) > self.token_budget:
+            old.pop(0)
+        if not TOOL_REFS and estimate_tokens(flatten()) > self.token_budget:
+            recent = [self._reference_tool_returns(turn) for turn in recent[:-1]] + recent[-1:]
+
+        compacted = flatten()
+        if system_parts and compacted:
+            first = compacted[0]
+            if not any(p.part_kind == "system-prompt" for p in first.parts):
+                compacted[0] = replace(first, parts=system_parts + list(first.parts))
+
+        saved = max(0, before - estimate_tokens(compacted))
+        self.total_saved += saved
+        logfire.info(
+            "History compacted",
+            tokens_before=before,
+            tokens_after=before - saved,
+            tokens_saved=saved,
+            total_saved=self.total_saved,
+            turns=len(turns),
+        )
+        return compacted, saved
@@ -0,0 +1,139 @@
+# http_client.py
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+import httpx
+import logfire
+
+# Browser-like headers for the DuckDuckGo Instant Answer API.
+# Connection management is left to the pool (keep-alive / HTTP/2).
+DDG_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "application/json, text/plain, */*",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept-Encoding": "gzip, deflate",
+    "DNT": "1",
+}
+
+# Pool settings, overridable from the environment
+MAX_CONNECTIONS = int(os.getenv("RESEARCH_HTTP_MAX_CONNECTIONS", "20"))
+MAX_KEEPALIVE = int(os.getenv("RESEARCH_HTTP_MAX_KEEPALIVE", "10"))
+KEEPALIVE_EXPIRY = float(os.getenv("RESEARCH_HTTP_KEEPALIVE_EXPIRY", "30"))
+CONNECT_TIMEOUT = float(os.getenv("RESEARCH_HTTP_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("RESEARCH_HTTP_READ_TIMEOUT", "10"))
+HTTP2 = os.getenv("RESEARCH_HTTP2", "1") not in ("0", "false", "False")
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional `h2` package (httpx[http2])"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _build_client() -> httpx.AsyncClient:
+    http2 = HTTP2 and _http2_available()
+    logfire.info(
+        "HTTP client created",
+        http2=http2,
+        max_connections=MAX_CONNECTIONS,
+        max_keepalive=MAX_KEEPALIVE,
+    )
+    return httpx.AsyncClient(
+        http2=http2,
+        headers=DDG_HEADERS,
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+    )
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the shared application-scoped client, creating it on first use"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+
+async def aclose_client():
+    """Close the shared client and release pooled connections"""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+        logfire.info("HTTP client closed")
+    _client = None
+
+
+@asynccontextmanager
+async def lifespan():
+    """Tie the shared client to the lifetime of the agent process"""
+    get_client()
+    try:
+        yield
+    finally:
+        await aclose_client()
+
+
+class RequestTimings:
+    """Collects connect / TLS / transfer timings from httpcore trace events"""
+
+    def __init__(self):
+        self._started = {}
+        self.connect_ms = 0.0
+        self.tls_ms = 0.0
+        self.transfer_ms = 0.0
+        self.total_ms = 0.0
+        self.reused_connection = True
+        self._t0 = time.perf_counter()
+
+    async def trace(self, event_name: str, info: dict):
+        now = time.perf_counter()
+        step, _, phase = event_name.rpartition(".")
+        if phase == "started":
+            self._started[step] = now
+            return
+        if phase != "complete" or step not in self._started:
+            return
+
+        elapsed = (now - self._started.pop(step)) * 1000
+        if step == "connection.connect_tcp":
+            self.connect_ms += elapsed
+            self.reused_connection = False
+        elif step == "connection.start_tls":
+            self.tls_ms += elapsed
+        elif step.endswith(("send_request_headers", "send_request_body", "receive_response_headers", "receive_response_body")):
+            self.transfer_ms += elapsed
+
+    def finish(self):
+        self.total_ms = (time.perf_counter() - self._t0) * 1000
+
+    def as_dict(self) -> dict:
+        return {
+            "connect_ms": round(self.connect_ms, 2),
+            "tls_ms": round(self.tls_ms, 2),
+            "transfer_ms": round(self.transfer_ms, 2),
+            "total_ms": round(self.total_ms, 2),
+            "reused_connection": self.reused_connection,
+        }
+
+
+async def timed_get(url: str, **kwargs) -> httpx.Response:
+    """GET through the shared client and log per-request timings"""
+    timings = RequestTimings()
+    extensions = dict(kwargs.pop("extensions", None) or {})
+    extensions["trace"] = timings.trace
+
+    try:
+        return await get_client().get(url, extensions=extensions, **kwargs)
+    finally:
+        timings.finish()
+        logfire.info("HTTP request timings", url=url, **timings.as_dict())
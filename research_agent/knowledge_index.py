@@ -0,0 +1,234 @@
+# knowledge_index.py
+"""
+Local BM25 knowledge index used as an offline source for get_research.
+
+Build:  python knowledge_index.py build <corpus_dir_or_file> [index_dir]
+Query:  python knowledge_index.py query "<question>" [index_dir]
+
+The corpus may contain JSONL files (one {"title", "text"} object per line)
+and Markdown files (split into one document per heading).
+"""
+import array
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+INDEX_PATH = os.getenv("RESEARCH_INDEX_PATH", os.path.join(os.path.dirname(__file__), "knowledge_index"))
+
+K1 = 1.5
+B = 0.75
+
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does explain for from how i in is it me of on or "
+    "tell that the this to was what when where which who why with you about".split()
+)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+# --- Corpus loading ---
+
+def _iter_jsonl(path: str) -> Iterator[Tuple[str, str]]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            text = record.get("text") or record.get("body") or ""
+            if text:
+                yield record.get("title", ""), text
+
+
+def _iter_markdown(path: str) -> Iterator[Tuple[str, str]]:
+    title = os.path.splitext(os.path.basename(path))[0]
+    lines: List[str] = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("#"):
+                if "".join(lines).strip():
+                    yield title, "".join(lines).strip()
+                title, lines = line.lstrip("#").strip(), []
+            else:
+                lines.append(line)
+    if "".join(lines).strip():
+        yield title, "".join(lines).strip()
+
+
+def iter_corpus(source: str) -> Iterator[Tuple[str, str]]:
+    """Yield (title, text) documents from a file or directory"""
+    paths = [source]
+    if os.path.isdir(source):
+        paths = sorted(
+            os.path.join(root, name) for root, _, names in os.walk(source) for name in names
+        )
+    for path in paths:
+        if path.endswith(".jsonl"):
+            yield from _iter_jsonl(path)
+        elif path.endswith((".md", ".markdown")):
+            yield from _iter_markdown(path)
+
+
+# --- Index build ---
+
+def build_index(source: str, index_dir: str = INDEX_PATH) -> dict:
+    """
+    Build the on-disk index. Layout:
+      terms.json     term -> [postings offset, document frequency]
+      postings.bin   uint32 (doc_id, tf) pairs, grouped by term
+      doclens.bin    uint32 token count per document
+      docs.jsonl     stored title/text per document
+      meta.json      corpus statistics
+    """
+    started = time.perf_counter()
+    os.makedirs(index_dir, exist_ok=True)
+
+    postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+    doc_lens = array.array("I")
+
+    with open(os.path.join(index_dir, "docs.jsonl"), "w", encoding="utf-8") as docs:
+        for doc_id, (title, text) in enumerate(iter_corpus(source)):
+            tokens = tokenize(f"{title} {text}")
+            doc_lens.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                postings[term].append((doc_id, tf))
+            docs.write(json.dumps({"title": title, "text": text}) + "\n")
+
+    terms = {}
+    flat = array.array("I")
+    for term in sorted(postings):
+        terms[term] = [len(flat) // 2, len(postings[term])]
+        for doc_id, tf in postings[term]:
+            flat.append(doc_id)
+            flat.append(tf)
+
+    with open(os.path.join(index_dir, "postings.bin"), "wb") as f:
+        flat.tofile(f)
+    with open(os.path.join(index_dir, "doclens.bin"), "wb") as f:
+        doc_lens.tofile(f)
+    with open(os.path.join(index_dir, "terms.json"), "w", encoding="utf-8") as f:
+        json.dump(terms, f)
+
+    meta = {
+        "documents": len(doc_lens),
+        "terms": len(terms),
+        "avgdl": (sum(doc_lens) / len(doc_lens)) if doc_lens else 0.0,
+        "build_seconds": round(time.perf_counter() - started, 3),
+    }
+    with open(os.path.join(index_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    return meta
+
+
+# --- Index query ---
+
+class KnowledgeIndex:
+    """Read-only BM25 index with memory-mapped postings"""
+
+    def __init__(self, index_dir: str = INDEX_PATH):
+        with open(os.path.join(index_dir, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        with open(os.path.join(index_dir, "terms.json"), encoding="utf-8") as f:
+            self.terms: Dict[str, List[int]] = json.load(f)
+
+        self.doc_lens = array.array("I")
+        with open(os.path.join(index_dir, "doclens.bin"), "rb") as f:
+            self.doc_lens.frombytes(f.read())
+
+        self._postings_file = open(os.path.join(index_dir, "postings.bin"), "rb")
+        size = os.fstat(self._postings_file.fileno()).st_size
+        self._postings = (
+            memoryview(mmap.mmap(self._postings_file.fileno(), 0, access=mmap.ACCESS_READ)).cast("I")
+            if size else memoryview(array.array("I"))
+        )
+
+        # Byte offsets into docs.jsonl so stored documents are read on demand
+        self._docs_path = os.path.join(index_dir, "docs.jsonl")
+        self._doc_offsets = array.array("Q")
+        offset = 0
+        with open(self._docs_path, "rb") as f:
+            for line in f:
+                self._doc_offsets.append(offset)
+                offset += len(line)
+
+        self.n_docs = self.meta["documents"]
+        self.avgdl = self.meta["avgdl"] or 1.0
+
+    def _idf(self, df: int) -> float:
+        return math.log(1 + (self.n_docs - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, k: int = 3) -> List[Tuple[float, int]]:
+        """Return the top-k (score, doc_id) pairs for a query"""
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            entry = self.terms.get(term)
+            if entry is None:
+                continue
+            start, df = entry
+            idf = self._idf(df)
+            pairs = self._postings[start * 2:(start + df) * 2]
+            for i in range(0, len(pairs), 2):
+                doc_id, tf = pairs[i], pairs[i + 1]
+                norm = K1 * (1 - B + B * self.doc_lens[doc_id] / self.avgdl)
+                scores[doc_id] += idf * tf * (K1 + 1) / (tf + norm)
+        return heapq.nlargest(k, ((score, doc_id) for doc_id, score in scores.items()))
+
+    def document(self, doc_id: int) -> dict:
+        with open(self._docs_path, "rb") as f:
+            f.seek(self._doc_offsets[doc_id])
+            return json.loads(f.readline())
+
+    def close(self):
+        self._postings.release()
+        self._postings_file.close()
+
+
+_index: Optional[KnowledgeIndex] = None
+_index_loaded = False
+_index_lock = threading.Lock()
+
+
+def get_index() -> Optional[KnowledgeIndex]:
+    """Load the index once; returns None when no index has been built"""
+    global _index, _index_loaded
+    if not _index_loaded:
+        # Lookups run in worker threads; later callers wait for the first load
+        # instead of seeing "no index" while it is still being opened
+        with _index_lock:
+            if not _index_loaded:
+                if os.path.exists(os.path.join(INDEX_PATH, "meta.json")):
+                    _index = KnowledgeIndex(INDEX_PATH)
+                _index_loaded = True
+    return _index
+
+
+def main(argv: List[str]):
+    if len(argv) >= 2 and argv[0] == "build":
+        meta = build_index(argv[1], argv[2] if len(argv) > 2 else INDEX_PATH)
+        print(f"Indexed {meta['documents']} documents, {meta['terms']} terms in {meta['build_seconds']}s")
+    elif len(argv) >= 2 and argv[0] == "query":
+        index = KnowledgeIndex(argv[2] if len(argv) > 2 else INDEX_PATH)
+        started = time.perf_counter()
+        hits = index.search(argv[1])
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        for score, doc_id in hits:
+            print(f"{score:.3f}  {index.document(doc_id)['title']}")
+        print(f"({elapsed_ms:.3f} ms)")
+    else:
+        print(__doc__)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
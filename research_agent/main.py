@@ -1,25 +1,69 @@
 # main.py
 import os
+import sys
 import asyncio
-import logfire
+import logging
+import threading
+from typing import Optional
 from dotenv import load_dotenv
-import time
 
 # Load environment variables BEFORE importing the agent
 load_dotenv(override=True)
 
-from agent import research_agent
-logfire.configure()
-logfire.instrument_pydantic_ai()
+# Print answers token by token as they arrive (set RESEARCH_STREAM=0 to disable)
+STREAM = os.getenv("RESEARCH_STREAM", "1") not in ("0", "false", "False")
+
+
+def _load():
+    """Configure telemetry and import the heavy modules (pydantic-ai, httpx, logfire)"""
+    import logfire
+    logfire.configure()
+    logfire.instrument_pydantic_ai()
+
+    import agent  # noqa: F401
+    import answer_cache  # noqa: F401
+    import history  # noqa: F401
+    import streaming  # noqa: F401
+
+
+_warmup_error: Optional[Exception] = None
+
+
+def _warm_up():
+    """Run _load() in the background while the user types the first prompt"""
+    global _warmup_error
+    try:
+        _load()
+    except Exception as e:
+        # Logged now, raised again by _ready() when the first prompt needs the agent
+        _warmup_error = e
+        logging.getLogger(__name__).exception("Background warm-up failed")
+
+
+_warmup = threading.Thread(target=_warm_up, name="warmup", daemon=True)
+
+
+async def _ready():
+    """Wait for background warm-up; it normally finishes before the first prompt is entered"""
+    if not _warmup.is_alive() and not _warmup.ident:
+        _warmup.start()
+    await asyncio.to_thread(_warmup.join)
+    if _warmup_error is not None:
+        raise RuntimeError("Research agent failed to start") from _warmup_error
 
-# Give logfire time to print its project URL message
-time.sleep(1)
 
 async def run_agent(user_message: str, history: list):
     """Runs the agent and logs the interaction."""
+    await _ready()
+    import logfire
+    from agent import research_agent
+    from answer_cache import cached_run
+
     logfire.info("User input received", message=user_message)
 
-    result = await research_agent.run(user_message, message_history=history)
+    result = await cached_run(
+        user_message, history, lambda: research_agent.run(user_message, message_history=history)
+    )
 
     logfire.info("Agent output generated", output=str(result.output))
 
@@ -27,8 +71,24 @@ async def run_agent(user_message: str, history: list):
 
 
 async def main():
+    _warmup.start()
+    try:
+        await chat_loop()
+    finally:
+        # Only shut down what was actually loaded during the session
+        prefetch = sys.modules.get("prefetch")
+        if prefetch and prefetch.get_prefetcher():
+            await prefetch.get_prefetcher().aclose()
+        # Shared HTTP client lives for the whole session (keep-alive, HTTP/2)
+        http_client = sys.modules.get("http_client")
+        if http_client:
+            await http_client.aclose_client()
+
+
+async def chat_loop():
     print("Research Agent Ready! (type 'exit' / 'quit' / 'bye' to stop)")
     history = []
+    history_manager = None
 
     while True:
         user_msg = await asyncio.to_thread(input, "You: ")
@@ -37,12 +97,25 @@ async def main():
             print("Goodbye!")
             break
 
-        result = await run_agent(user_msg, history)
-
-        print("Agent:", result.output)
-
-        # Store messages for conversation continuity
-        history = result.all_messages()
+        await _ready()
+        from history import HistoryManager
+        from streaming import StreamedRun
+        history_manager = history_manager or HistoryManager()
+
+        if STREAM:
+            run = StreamedRun(user_msg, history)
+            print("Agent: ", end="", flush=True)
+            async for delta in run:
+                print(delta, end="", flush=True)
+            print()
+            messages = run.messages
+        else:
+            result = await run_agent(user_msg, history)
+            print("Agent:", result.output)
+            messages = result.all_messages()
+
+        # Store messages for conversation continuity, compacted to the token budget
+        history, _ = history_manager.compact(messages)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,135 @@
+# prefetch.py
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import List, Optional
+from urllib.parse import unquote
+import logfire
+from circuit_breaker import CLOSED
+from research_cache import get_cache, normalize_topic
+
+# Prefetch settings, overridable from the environment (disabled by default)
+ENABLED = os.getenv("RESEARCH_PREFETCH", "0") not in ("0", "false", "False")
+MAX_RELATED = int(os.getenv("RESEARCH_PREFETCH_RELATED", "3"))
+WORKERS = int(os.getenv("RESEARCH_PREFETCH_WORKERS", "2"))
+RATE_PER_SECOND = float(os.getenv("RESEARCH_PREFETCH_RATE", "2"))
+QUEUE_SIZE = 100
+TRACKED = 5000
+
+_issued_counter = logfire.metric_counter("research_prefetch.issued", unit="1", description="Related topics prefetched")
+_used_counter = logfire.metric_counter("research_prefetch.used", unit="1", description="Prefetched topics later requested")
+
+
+def related_topics(data: dict, limit: int = MAX_RELATED) -> List[str]:
+    """Topic names from a DuckDuckGo response's RelatedTopics (including grouped topics)"""
+    names = []
+
+    def visit(items):
+        for item in items:
+            if len(names) >= limit:
+                return
+            if not isinstance(item, dict):
+                continue
+            if item.get("Topics"):
+                visit(item["Topics"])
+                continue
+            url = item.get("FirstURL") or ""
+            name = unquote(url.rstrip("/").rsplit("/", 1)[-1]).replace("_", " ") if url else ""
+            if name and name not in names:
+                names.append(name)
+
+    visit(data.get("RelatedTopics") or [])
+    return names
+
+
+class Prefetcher:
+    """
+    Low-priority background pool that warms the research cache with related
+    topics. A small fixed number of workers, a request rate limit and a
+    bounded queue (overflow is dropped) keep it from competing with real calls.
+    """
+
+    def __init__(self, workers: int = WORKERS, rate_per_second: float = RATE_PER_SECOND):
+        self.workers = workers
+        self.interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._next_slot = 0.0
+        self._prefetched: "OrderedDict[str, None]" = OrderedDict()
+        self.stats = {"issued": 0, "used": 0, "dropped": 0}
+
+    def _start(self):
+        self._queue = asyncio.Queue(QUEUE_SIZE)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def schedule(self, topics: List[str]):
+        if self._queue is None:
+            self._start()
+        for topic in topics:
+            try:
+                self._queue.put_nowait(topic)
+            except asyncio.QueueFull:
+                self.stats["dropped"] += 1
+
+    def note_request(self, topic: str):
+        """Record a real lookup; counts as "used" if we prefetched it"""
+        key = normalize_topic(topic)
+        if key in self._prefetched:
+            del self._prefetched[key]
+            self.stats["used"] += 1
+            _used_counter.add(1)
+            logfire.info("Prefetched topic used", topic=topic, **self.usage())
+
+    def usage(self) -> dict:
+        issued = self.stats["issued"]
+        return {"issued": issued, "used": self.stats["used"], "use_rate": round(self.stats["used"] / issued, 3) if issued else 0.0}
+
+    async def _rate_limit(self):
+        now = time.monotonic()
+        wait = self._next_slot - now
+        self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    async def _worker(self):
+        # Imported here: sources imports this module
+        from sources import get_duckduckgo_source
+
+        cache = get_cache()
+        while True:
+            topic = await self._queue.get()
+            try:
+                source = get_duckduckgo_source()
+                if source.breaker.state != CLOSED or await cache.contains(topic):
+                    continue
+                await self._rate_limit()
+                # Shares the flight of a user lookup for the same topic (and caches the result)
+                await source.fetch(topic, prefetch_related=False)
+                self._prefetched[normalize_topic(topic)] = None
+                while len(self._prefetched) > TRACKED:
+                    self._prefetched.popitem(last=False)
+                self.stats["issued"] += 1
+                _issued_counter.add(1)
+                logfire.debug("Related topic prefetched", topic=topic)
+            except Exception as e:
+                logfire.debug("Prefetch failed", topic=topic, error=str(e))
+            finally:
+                self._queue.task_done()
+
+    async def aclose(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks, self._queue = [], None
+
+
+_prefetcher: Optional[Prefetcher] = None
+
+
+def get_prefetcher() -> Optional[Prefetcher]:
+    """Process-wide prefetcher, or None when disabled"""
+    global _prefetcher
+    if ENABLED and _prefetcher is None:
+        _prefetcher = Prefetcher()
+    return _prefetcher
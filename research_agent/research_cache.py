@@ -0,0 +1,222 @@
+# research_cache.py
+import os
+import re
+import sqlite3
+import threading
+import time
+import asyncio
+from collections import OrderedDict
+from typing import Optional
+import logfire
+
+# Cache settings, overridable from the environment
+CACHE_PATH = os.getenv("RESEARCH_CACHE_PATH", os.path.join(os.path.dirname(__file__), ".research_cache.sqlite3"))
+MEMORY_MAX_ENTRIES = int(os.getenv("RESEARCH_CACHE_MEMORY_ENTRIES", "512"))
+DISK_MAX_ENTRIES = int(os.getenv("RESEARCH_CACHE_DISK_ENTRIES", "20000"))
+POSITIVE_TTL = float(os.getenv("RESEARCH_CACHE_TTL", str(6 * 3600)))
+NEGATIVE_TTL = float(os.getenv("RESEARCH_CACHE_NEGATIVE_TTL", "600"))
+# A disk hit refreshes its LRU access time at most this often, so most reads skip the write
+ACCESS_RESOLUTION = 60.0
+
+_hits_counter = logfire.metric_counter("research_cache.hits", unit="1", description="Research cache hits")
+_misses_counter = logfire.metric_counter("research_cache.misses", unit="1", description="Research cache misses")
+
+
+def normalize_topic(topic: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace"""
+    topic = re.sub(r"[^\w\s]", " ", topic.lower())
+    return " ".join(topic.split())
+
+
+class CacheEntry:
+    """A cached research result. `value` is None for a negative (empty) answer"""
+
+    __slots__ = ("value", "expires_at")
+
+    def __init__(self, value: Optional[str], expires_at: float):
+        self.value = value
+        self.expires_at = expires_at
+
+    @property
+    def negative(self) -> bool:
+        return self.value is None
+
+    def expired(self, now: float) -> bool:
+        return now >= self.expires_at
+
+
+class MemoryTier:
+    """Size-bounded LRU with per-entry expiry"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, CacheEntry]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry.expired(time.time()):
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return entry
+
+    def set(self, key: str, entry: CacheEntry):
+        self._data[key] = entry
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class DiskTier:
+    """SQLite-backed tier that survives restarts"""
+
+    def __init__(self, path: str, max_entries: int, access_resolution: float = ACCESS_RESOLUTION):
+        self.max_entries = max_entries
+        self.access_resolution = access_resolution
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS research_cache ("
+            " key TEXT PRIMARY KEY, value TEXT, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_research_cache_accessed ON research_cache(accessed_at)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at, accessed_at FROM research_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now >= row[1]:
+                self._conn.execute("DELETE FROM research_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            if now - row[2] >= self.access_resolution:
+                self._conn.execute("UPDATE research_cache SET accessed_at = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+        return CacheEntry(row[0], row[1])
+
+    def set(self, key: str, entry: CacheEntry):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO research_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, entry.value, entry.expires_at, time.time()),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        # Drop expired rows first, then least recently accessed beyond the bound
+        self._conn.execute("DELETE FROM research_cache WHERE expires_at <= ?", (time.time(),))
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM research_cache").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM research_cache WHERE key IN "
+                "(SELECT key FROM research_cache ORDER BY accessed_at LIMIT ?)",
+                (overflow,),
+            )
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM research_cache")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ResearchCache:
+    """Two-tier (memory LRU + SQLite) cache for research results keyed on normalized topics"""
+
+    def __init__(
+        self,
+        path: Optional[str] = CACHE_PATH,
+        memory_entries: int = MEMORY_MAX_ENTRIES,
+        disk_entries: int = DISK_MAX_ENTRIES,
+        ttl: float = POSITIVE_TTL,
+        negative_ttl: float = NEGATIVE_TTL,
+    ):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.memory = MemoryTier(memory_entries)
+        self.disk = DiskTier(path, disk_entries) if path else None
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "negative_hits": 0}
+
+    async def get(self, topic: str) -> Optional[CacheEntry]:
+        key = normalize_topic(topic)
+        entry = self.memory.get(key)
+        tier = "memory"
+
+        if entry is None and self.disk is not None:
+            entry = await asyncio.to_thread(self.disk.get, key)
+            tier = "disk"
+            if entry is not None:
+                self.memory.set(key, entry)
+
+        if entry is None:
+            self.stats["misses"] += 1
+            _misses_counter.add(1)
+            logfire.debug("Research cache miss", key=key)
+            return None
+
+        self.stats[f"{tier}_hits"] += 1
+        if entry.negative:
+            self.stats["negative_hits"] += 1
+        _hits_counter.add(1, {"tier": tier, "negative": entry.negative})
+        logfire.info("Research cache hit", key=key, tier=tier, negative=entry.negative)
+        return entry
+
+    async def contains(self, topic: str) -> bool:
+        """Check for a live entry without touching hit/miss statistics"""
+        key = normalize_topic(topic)
+        if self.memory.get(key) is not None:
+            return True
+        if self.disk is not None:
+            entry = await asyncio.to_thread(self.disk.get, key)
+            if entry is not None:
+                self.memory.set(key, entry)
+                return True
+        return False
+
+    async def set(self, topic: str, value: Optional[str]):
+        """Store a result; pass None to negatively cache an empty answer"""
+        key = normalize_topic(topic)
+        ttl = self.negative_ttl if value is None else self.ttl
+        entry = CacheEntry(value, time.time() + ttl)
+        self.memory.set(key, entry)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.set, key, entry)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def close(self):
+        if self.disk is not None:
+            self.disk.close()
+
+
+_cache: Optional[ResearchCache] = None
+
+
+def get_cache() -> ResearchCache:
+    """Return the process-wide research cache"""
+    global _cache
+    if _cache is None:
+        _cache = ResearchCache()
+    return _cache
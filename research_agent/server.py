@@ -0,0 +1,182 @@
+# server.py - FastAPI service for the research agent
+import asyncio
+import json
+import os
+from contextlib import asynccontextmanager
+from typing import Optional
+import logfire
+from dotenv import load_dotenv
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+# Load environment variables BEFORE importing the agent
+load_dotenv(override=True)
+
+from agent import research_agent
+import http_client
+from sessions import SessionStore
+from answer_cache import cached_run
+from prefetch import get_prefetcher
+from streaming import StreamedRun
+
+# Service limits, overridable from the environment
+MAX_CONCURRENT_RUNS = int(os.getenv("RESEARCH_MAX_CONCURRENT_RUNS", "16"))
+MAX_QUEUED_RUNS = int(os.getenv("RESEARCH_MAX_QUEUED_RUNS", "64"))
+DRAIN_SECONDS = float(os.getenv("RESEARCH_DRAIN_SECONDS", "30"))
+
+
+class ChatRequest(BaseModel):
+    message: str
+    session_id: Optional[str] = None
+
+
+class ChatResponse(BaseModel):
+    session_id: str
+    output: str
+
+
+class RunLimiter:
+    """
+    Bounds concurrent agent runs. Up to `max_queued` callers may wait for a
+    slot; beyond that, admission fails so the caller can answer 429.
+    """
+
+    def __init__(self, max_concurrent: int, max_queued: int):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.admitted = 0
+
+    def try_admit(self) -> bool:
+        if self.admitted >= self.max_concurrent + self.max_queued:
+            return False
+        self.admitted += 1
+        return True
+
+    def release(self):
+        self.admitted -= 1
+
+    @asynccontextmanager
+    async def slot(self):
+        async with self._semaphore:
+            yield
+
+
+class AdmittedStreamingResponse(StreamingResponse):
+    """
+    Streaming response holding one limiter admission. The admission is given
+    back however the response ends, including a client that disconnects
+    before the body (and so the event generator) ever starts.
+    """
+
+    def __init__(self, content, limiter: RunLimiter, **kwargs):
+        super().__init__(content, **kwargs)
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            # Let a suspended generator leave its session lock and run slot now
+            await self.body_iterator.aclose()
+            self.limiter.release()
+
+
+sessions = SessionStore()
+limiter = RunLimiter(MAX_CONCURRENT_RUNS, MAX_QUEUED_RUNS)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    logfire.configure()
+    logfire.instrument_pydantic_ai()
+
+    evictor = asyncio.create_task(sessions.run_evictor())
+    async with http_client.lifespan():
+        # Uvicorn stops accepting connections and waits for in-flight requests
+        # (up to --timeout-graceful-shutdown) before this shutdown half runs
+        yield
+        evictor.cancel()
+        if get_prefetcher():
+            await get_prefetcher().aclose()
+
+
+app = FastAPI(title="Research Agent", lifespan=lifespan)
+
+
+def admit():
+    if not limiter.try_admit():
+        raise HTTPException(status_code=429, detail="Too many concurrent requests", headers={"Retry-After": "1"})
+
+
+def sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post("/chat", response_model=ChatResponse)
+async def chat(req: ChatRequest):
+    admit()
+
+    try:
+        session = sessions.get_or_create(req.session_id)
+        async with session.lock, limiter.slot():
+            logfire.info("User input received", message=req.message, session_id=session.id)
+            history = session.history
+            result = await cached_run(
+                req.message, history, lambda: research_agent.run(req.message, message_history=history)
+            )
+            logfire.info("Agent output generated", output=str(result.output), session_id=session.id)
+
+            session.history, _ = session.history_manager.compact(result.all_messages())
+            session.touch()
+        return ChatResponse(session_id=session.id, output=str(result.output))
+    finally:
+        limiter.release()
+
+
+@app.post("/chat/stream")
+async def chat_stream(req: ChatRequest):
+    """Server-sent events: `session`, then `delta` events, then `done` (or `error`)"""
+    admit()
+    session = sessions.get_or_create(req.session_id)
+
+    async def events():
+        try:
+            yield sse("session", {"session_id": session.id})
+            async with session.lock, limiter.slot():
+                run = StreamedRun(req.message, session.history)
+                async for delta in run:
+                    yield sse("delta", {"text": delta})
+
+                session.history, _ = session.history_manager.compact(run.messages)
+                session.touch()
+            yield sse("done", {"output": run.output, "ttft_ms": run.ttft_ms, "total_ms": run.total_ms})
+        except Exception as e:
+            logfire.warn("Streaming run failed", error=str(e), error_type=type(e).__name__, session_id=session.id)
+            yield sse("error", {"error": str(e)})
+
+    return AdmittedStreamingResponse(
+        events(), limiter, media_type="text/event-stream", headers={"Cache-Control": "no-cache"}
+    )
+
+
+@app.delete("/sessions/{session_id}")
+async def end_session(session_id: str):
+    if not sessions.drop(session_id):
+        raise HTTPException(status_code=404, detail="Unknown session")
+    return {"deleted": session_id}
+
+
+@app.get("/health")
+async def health():
+    return {
+        "status": "ok",
+        "sessions": len(sessions),
+        "in_flight": limiter.admitted,
+    }
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=8000, timeout_graceful_shutdown=int(DRAIN_SECONDS))
@@ -0,0 +1,70 @@
+# sessions.py
+import asyncio
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import List, Optional
+import logfire
+from history import HistoryManager
+
+# Session settings, overridable from the environment
+IDLE_SECONDS = float(os.getenv("RESEARCH_SESSION_IDLE_SECONDS", "1800"))
+MAX_SESSIONS = int(os.getenv("RESEARCH_MAX_SESSIONS", "10000"))
+
+
+class Session:
+    """Conversation state for one client"""
+
+    def __init__(self, session_id: str):
+        self.id = session_id
+        self.history: List = []
+        self.history_manager = HistoryManager()
+        self.last_used = time.monotonic()
+        # Turns within one session run one at a time so history stays ordered
+        self.lock = asyncio.Lock()
+
+    def touch(self):
+        self.last_used = time.monotonic()
+
+
+class SessionStore:
+    """Session-keyed history store with idle eviction and an LRU size bound"""
+
+    def __init__(self, idle_seconds: float = IDLE_SECONDS, max_sessions: int = MAX_SESSIONS):
+        self.idle_seconds = idle_seconds
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+
+    def get_or_create(self, session_id: Optional[str] = None) -> Session:
+        session = self._sessions.get(session_id) if session_id else None
+        if session is None:
+            session = Session(session_id or uuid.uuid4().hex)
+            self._sessions[session.id] = session
+            while len(self._sessions) > self.max_sessions:
+                evicted_id, _ = self._sessions.popitem(last=False)
+                logfire.info("Session evicted (capacity)", session_id=evicted_id)
+        self._sessions.move_to_end(session.id)
+        session.touch()
+        return session
+
+    def drop(self, session_id: str) -> bool:
+        return self._sessions.pop(session_id, None) is not None
+
+    def evict_idle(self) -> int:
+        cutoff = time.monotonic() - self.idle_seconds
+        idle = [sid for sid, s in self._sessions.items() if s.last_used < cutoff and not s.lock.locked()]
+        for sid in idle:
+            del self._sessions[sid]
+        if idle:
+            logfire.info("Idle sessions evicted", count=len(idle), remaining=len(self._sessions))
+        return len(idle)
+
+    async def run_evictor(self, interval: float = 60.0):
+        """Background loop; cancel the task to stop it"""
+        while True:
+            await asyncio.sleep(interval)
+            self.evict_idle()
+
+    def __len__(self):
+        return len(self._sessions)
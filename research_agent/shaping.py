@@ -0,0 +1,72 @@
+# shaping.py
+import os
+import re
+from typing import Tuple
+import logfire
+from history import CHARS_PER_TOKEN
+
+# Per tool result budget, overridable from the environment
+MAX_CHARS = int(os.getenv("RESEARCH_TOOL_RESULT_CHARS", "1200"))
+
+_HEADER_RE = re.compile(r"^(Live research(?: summary)?|Local knowledge) about '.*?':\n", re.DOTALL | re.MULTILINE)
+_SOURCE_TAGS = {"Live research": "web", "Live research summary": "web", "Local knowledge": "local"}
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+_BULLET_RE = re.compile(r"^\s*[•\-*]\s*", re.MULTILINE)
+
+_bytes_saved_counter = logfire.metric_counter(
+    "tool_result.bytes_saved", unit="By", description="Bytes removed from tool results by shaping"
+)
+
+
+def _sentences(body: str):
+    for line in _BULLET_RE.sub("", body).splitlines():
+        for sentence in _SENTENCE_RE.split(line.strip()):
+            if sentence:
+                yield sentence
+
+
+def _key(sentence: str) -> str:
+    return re.sub(r"\W+", " ", sentence.lower()).strip()
+
+
+def shape_result(topic: str, text: str, max_chars: int = MAX_CHARS) -> str:
+    """
+    Compact a research result for the model context:
+      one "[web] <topic>" header instead of the prose preamble of each
+      (merged) answer, bullet markers removed, duplicate sentences dropped,
+      body cut at a sentence boundary within `max_chars`.
+    """
+    sources = dict.fromkeys(_SOURCE_TAGS[m.group(1)] for m in _HEADER_RE.finditer(text)) or {"web": None}
+    body = _HEADER_RE.sub("", text)
+
+    header = f"[{'+'.join(sources)}] {topic.strip()}"
+    kept, seen, used = [], set(), len(header)
+    for sentence in _sentences(body):
+        key = _key(sentence)
+        if not key or key in seen:
+            continue
+        if used + len(sentence) + 1 > max_chars:
+            if not kept:
+                kept.append(sentence[:max(0, max_chars - used - 2)].rstrip() + "…")
+            break
+        seen.add(key)
+        kept.append(sentence)
+        used += len(sentence) + 1
+    return header + "\n" + " ".join(kept)
+
+
+def shape_and_measure(topic: str, text: str) -> Tuple[str, int]:
+    """Shape a tool result and log the bytes / estimated tokens saved"""
+    shaped = shape_result(topic, text)
+    raw_bytes, shaped_bytes = len(text.encode()), len(shaped.encode())
+    saved = max(0, raw_bytes - shaped_bytes)
+    _bytes_saved_counter.add(saved)
+    logfire.info(
+        "Tool result shaped",
+        topic=topic,
+        raw_bytes=raw_bytes,
+        shaped_bytes=shaped_bytes,
+        bytes_saved=saved,
+        tokens_saved=saved // CHARS_PER_TOKEN,
+    )
+    return shaped, saved
@@ -0,0 +1,61 @@
+# singleflight.py
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+import logfire
+
+_coalesced_counter = logfire.metric_counter(
+    "research.coalesced_calls", unit="1", description="Duplicate calls collapsed into an in-flight request"
+)
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one in-flight task.
+    Every caller receives the task's result or exception. A caller being
+    cancelled does not cancel the shared task unless it was the last waiter.
+    """
+
+    def __init__(self, name: str = "singleflight"):
+        self.name = name
+        self._inflight: Dict[str, _Call] = {}
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._inflight.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._inflight[key] = call
+            call.task.add_done_callback(lambda t, k=key, c=call: self._forget(k, c))
+        else:
+            self.coalesced += 1
+            _coalesced_counter.add(1, {"name": self.name})
+            logfire.debug("Coalesced duplicate call", name=self.name, key=key)
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            # Only abandon the shared work once nobody is waiting for it
+            if not call.task.done() and call.waiters == 1:
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _forget(self, key: str, call: _Call):
+        if self._inflight.get(key) is call:
+            del self._inflight[key]
+        # Avoid "exception was never retrieved" when every waiter was cancelled
+        if not call.task.cancelled():
+            call.task.exception()
+
+    def __len__(self):
+        return len(self._inflight)
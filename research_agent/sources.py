@@ -0,0 +1,283 @@
+# sources.py
+import asyncio
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+import logfire
+from http_client import timed_get
+from research_cache import get_cache, normalize_topic
+from singleflight import SingleFlight
+from knowledge_index import get_index
+from circuit_breaker import MAX_TIMEOUT, MIN_TIMEOUT, CircuitBreaker, CircuitOpenError
+from prefetch import get_prefetcher, related_topics
+
+DDG_URL = os.getenv("RESEARCH_DDG_URL", "https://api.duckduckgo.com/")
+
+# Overall budget for one research call across all sources
+DEADLINE = float(os.getenv("RESEARCH_DEADLINE", "8"))
+# "first": first good answer wins; "merge": also keep answers arriving within MERGE_WINDOW
+STRATEGY = os.getenv("RESEARCH_STRATEGY", "first")
+MERGE_WINDOW = float(os.getenv("RESEARCH_MERGE_WINDOW", "0.5"))
+
+# A local match only counts as a "good" answer above this BM25 score
+LOCAL_MIN_SCORE = float(os.getenv("RESEARCH_LOCAL_MIN_SCORE", "4.0"))
+LOCAL_SNIPPET_CHARS = 400
+# Recent local lookups kept so the fallback reuses the race's result
+LOCAL_RECENT = 128
+
+_source_latency = logfire.metric_histogram(
+    "research.source_latency", unit="ms", description="Latency of individual research sources"
+)
+
+
+class ResearchSource(ABC):
+    """A source of research answers"""
+
+    name = "source"
+
+    @abstractmethod
+    async def search(self, topic: str) -> Optional[str]:
+        """Return an answer for the topic, or None when there is nothing useful"""
+
+
+# --- DuckDuckGo ---
+
+async def fetch_duckduckgo(topic: str, prefetch_related: bool = True) -> Optional[str]:
+    """
+    Query the DuckDuckGo Instant Answer API.
+    Returns None when the API answers but has nothing useful; raises on transport errors.
+    When prefetching is enabled, related topics are queued to warm the cache.
+    """
+    res = await timed_get(
+        DDG_URL,
+        params={"q": topic, "format": "json", "no_redirect": "1"},
+    )
+    res.raise_for_status()
+    data = res.json()
+
+    prefetcher = get_prefetcher() if prefetch_related else None
+    if prefetcher is not None:
+        prefetcher.schedule(related_topics(data))
+
+    # If the API returns useful info
+    if data.get("AbstractText") and data["AbstractText"].strip():
+        summary = data["AbstractText"]
+        logfire.info("Live research completed", summary_length=len(summary))
+        return f"Live research summary about '{topic}':\n{summary}"
+
+    # Check for other possible data fields
+    elif data.get("Answer") and data["Answer"].strip():
+        summary = data["Answer"]
+        logfire.info("Live research completed", summary_length=len(summary))
+        return f"Live research summary about '{topic}':\n{summary}"
+
+    # Try to get information from RelatedTopics
+    elif data.get("RelatedTopics") and len(data["RelatedTopics"]) > 0:
+        topics = []
+        for item in data["RelatedTopics"][:3]:  # Get first 3 topics
+            if isinstance(item, dict) and item.get("Text"):
+                topics.append(f"• {item['Text']}")
+
+        if topics:
+            summary = "\n".join(topics)
+            logfire.info("Live research completed from RelatedTopics", summary_length=len(summary))
+            return f"Live research about '{topic}':\n{summary}"
+
+    return None
+
+
+class DuckDuckGoSource(ResearchSource):
+    """DuckDuckGo behind the research cache, request coalescing and a circuit breaker"""
+
+    name = "duckduckgo"
+
+    def __init__(self):
+        # Concurrent lookups of the same normalized topic share one upstream request
+        self._flight = SingleFlight("duckduckgo")
+        # Time out (and count the failure) before the research deadline cancels
+        # the call, or a hung upstream would never open the breaker
+        cap = DEADLINE * 0.9
+        self.breaker = CircuitBreaker("duckduckgo", min_timeout=min(MIN_TIMEOUT, cap), max_timeout=min(MAX_TIMEOUT, cap))
+
+    async def fetch(self, topic: str, prefetch_related: bool = True) -> Optional[str]:
+        """
+        Fetch through the breaker and store the result in the research cache.
+        Concurrent fetches of the same normalized topic (user lookups and
+        prefetches alike) share one upstream request.
+        """
+
+        async def fetch_and_cache():
+            if prefetch_related:
+                summary = await self.breaker.call(fetch_duckduckgo, topic)
+            else:
+                summary = await self.breaker.call(fetch_duckduckgo, topic, prefetch_related=False)
+            # Empty answers are cached too (with a shorter TTL)
+            await get_cache().set(topic, summary)
+            return summary
+
+        return await self._flight.do(normalize_topic(topic), fetch_and_cache)
+
+    async def search(self, topic: str) -> Optional[str]:
+        prefetcher = get_prefetcher()
+        if prefetcher is not None:
+            prefetcher.note_request(topic)
+
+        cached = await get_cache().get(topic)
+        if cached is not None:
+            return cached.value
+
+        try:
+            return await self.fetch(topic)
+        except CircuitOpenError:
+            # Upstream is known to be down: go straight to the other sources / fallback
+            logfire.info("DuckDuckGo skipped, circuit open", topic=topic)
+            return None
+
+
+# --- Local knowledge index ---
+
+def local_hits(topic: str) -> List[Tuple[float, dict]]:
+    """(score, document) matches from the local BM25 index. Blocking: reads the postings and docs files"""
+    index = get_index()
+    if index is None:
+        return []
+    return [(score, index.document(doc_id)) for score, doc_id in index.search(topic)]
+
+
+def format_local(topic: str, hits: List[Tuple[float, dict]]) -> Optional[str]:
+    """Answer built from local index hits, or None when there are none"""
+    if not hits:
+        return None
+
+    snippets = []
+    for score, doc in hits:
+        text = doc["text"][:LOCAL_SNIPPET_CHARS]
+        snippets.append(f"• {doc['title']}: {text}" if doc["title"] else f"• {text}")
+    logfire.info("Local research completed", topic=topic, hits=len(hits), top_score=round(hits[0][0], 3))
+    return f"Local knowledge about '{topic}':\n" + "\n".join(snippets)
+
+
+class LocalIndexSource(ResearchSource):
+    """
+    Strong matches from the local BM25 index. Lookups run in a worker thread,
+    and the last few are kept so weak_answer() after a research race does not
+    search the index a second time.
+    """
+
+    name = "local_index"
+
+    def __init__(self, min_score: float = LOCAL_MIN_SCORE, remember: int = LOCAL_RECENT):
+        self.min_score = min_score
+        self.remember = remember
+        self._recent: "OrderedDict[str, List[Tuple[float, dict]]]" = OrderedDict()
+
+    async def hits(self, topic: str) -> List[Tuple[float, dict]]:
+        key = normalize_topic(topic)
+        hits = self._recent.get(key)
+        if hits is not None:
+            self._recent.move_to_end(key)
+            return hits
+        hits = await asyncio.to_thread(local_hits, topic)
+        self._recent[key] = hits
+        while len(self._recent) > self.remember:
+            self._recent.popitem(last=False)
+        return hits
+
+    async def search(self, topic: str) -> Optional[str]:
+        return format_local(topic, [hit for hit in await self.hits(topic) if hit[0] >= self.min_score])
+
+    async def weak_answer(self, topic: str) -> Optional[str]:
+        """Any local match, however weak: the answer of last resort"""
+        return format_local(topic, await self.hits(topic))
+
+
+# --- Registry ---
+
+_duckduckgo = DuckDuckGoSource()
+_local = LocalIndexSource()
+_sources: List[ResearchSource] = [_duckduckgo, _local]
+
+
+def get_duckduckgo_source() -> DuckDuckGoSource:
+    return _duckduckgo
+
+
+def get_local_source() -> LocalIndexSource:
+    return _local
+
+
+def register_source(source: ResearchSource):
+    """Add a source to every subsequent research call"""
+    _sources.append(source)
+
+
+def get_sources() -> List[ResearchSource]:
+    return list(_sources)
+
+
+async def _timed_search(source: ResearchSource, topic: str) -> Optional[str]:
+    started = time.perf_counter()
+    outcome = "empty"
+    try:
+        result = await source.search(topic)
+        if result:
+            outcome = "ok"
+        return result
+    except asyncio.CancelledError:
+        outcome = "cancelled"
+        raise
+    except Exception as e:
+        outcome = "error"
+        logfire.warn("Research source failed", source=source.name, error=str(e), error_type=type(e).__name__)
+        return None
+    finally:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        _source_latency.record(elapsed_ms, {"source": source.name, "outcome": outcome})
+        logfire.info("Research source finished", source=source.name, outcome=outcome, latency_ms=round(elapsed_ms, 2))
+
+
+async def research(
+    topic: str,
+    sources: Optional[List[ResearchSource]] = None,
+    deadline: float = DEADLINE,
+    strategy: str = STRATEGY,
+    merge_window: float = MERGE_WINDOW,
+) -> Optional[str]:
+    """
+    Query all sources concurrently under one deadline.
+    Returns the first good answer (or merged answers), cancelling the rest.
+    """
+    sources = get_sources() if sources is None else sources
+    loop = asyncio.get_running_loop()
+    end = loop.time() + deadline
+
+    tasks = {asyncio.ensure_future(_timed_search(source, topic)): source for source in sources}
+    pending = set(tasks)
+    answers: List[Tuple[int, str]] = []
+
+    try:
+        while pending:
+            timeout = end - loop.time()
+            if timeout <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.result():
+                    answers.append((sources.index(tasks[task]), task.result()))
+            if answers:
+                if strategy != "merge":
+                    break
+                end = min(end, loop.time() + merge_window)
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            logfire.info("Cancelled late research sources", sources=[tasks[t].name for t in pending])
+
+    if not answers:
+        return None
+    # Keep registration order so merged output is stable
+    answers.sort()
+    return "\n\n".join(answer for _, answer in answers)
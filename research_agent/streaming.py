@@ -0,0 +1,55 @@
+# streaming.py
+import time
+from typing import AsyncIterator, List, Optional
+import logfire
+from agent import research_agent
+from answer_cache import get_answer_cache
+
+
+class StreamedRun:
+    """
+    Streams one agent turn as text deltas.
+    After iteration, `output` and `messages` hold the final answer and full history.
+    """
+
+    def __init__(self, user_message: str, history: list):
+        self.user_message = user_message
+        self.history = history
+        self.output = ""
+        self.messages: List = []
+        self.ttft_ms: Optional[float] = None
+        self.total_ms: Optional[float] = None
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        started = time.perf_counter()
+        logfire.info("User input received", message=self.user_message, streaming=True)
+
+        # First-turn questions may be answered from the near-duplicate answer cache
+        cache = get_answer_cache() if not self.history else None
+        hit = cache.lookup(self.user_message) if cache is not None else None
+        if hit is not None:
+            self.output, self.messages = hit.output, hit.all_messages()
+            self.ttft_ms = self.total_ms = (time.perf_counter() - started) * 1000
+            yield self.output
+            return
+
+        chunks = []
+        async with research_agent.run_stream(self.user_message, message_history=self.history) as result:
+            async for delta in result.stream_text(delta=True):
+                if self.ttft_ms is None:
+                    self.ttft_ms = (time.perf_counter() - started) * 1000
+                chunks.append(delta)
+                yield delta
+            self.messages = result.all_messages()
+
+        self.output = "".join(chunks)
+        self.total_ms = (time.perf_counter() - started) * 1000
+        if cache is not None:
+            cache.store(self.user_message, self.output, self.messages, self.total_ms)
+        logfire.info(
+            "Agent output generated",
+            output=self.output,
+            streaming=True,
+            ttft_ms=round(self.ttft_ms or self.total_ms, 2),
+            total_ms=round(self.total_ms, 2),
+        )
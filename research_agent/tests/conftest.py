@@ -0,0 +1,13 @@
+# conftest.py - Test setup for research_agent
+import os
+import sys
+
+# Modules import each other by bare name, as when run from research_agent/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep tests offline and self-contained; set before the agent modules are imported
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+os.environ.setdefault("LOGFIRE_IGNORE_NO_CONFIG", "1")
+os.environ.setdefault("RESEARCH_CACHE_PATH", "")
+os.environ.setdefault("RESEARCH_HTTP2", "0")
+os.environ.setdefault("RESEARCH_INDEX_PATH", os.path.join(os.path.dirname(__file__), "no_index"))
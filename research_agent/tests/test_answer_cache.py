@@ -0,0 +1,92 @@
+# test_answer_cache.py
+import asyncio
+import pytest
+from pydantic_ai.messages import ModelRequest, ModelResponse, TextPart, UserPromptPart
+import answer_cache
+from answer_cache import AnswerCache, cached_run
+
+
+def history(question, answer="cached answer"):
+    return [ModelRequest(parts=[UserPromptPart(content=question)]), ModelResponse(parts=[TextPart(content=answer)])]
+
+
+def cache_with(question):
+    cache = AnswerCache()
+    cache.store(question, "cached answer", history(question), latency_ms=1500)
+    return cache
+
+
+@pytest.mark.parametrize("stored, asked", [
+    ("population of india 2020", "population of india 2023"),
+    ("how does a car engine work", "why does a car engine work"),
+    ("who is the president of the usa", "who was the president of the usa"),
+    ("why is the sky blue", "is the sky blue"),
+    ("iphone 15 battery life", "iphone 14 battery life"),
+    ("what is the capital of germany", "what was the capital of germany"),
+    ("what are black holes", "who are black holes"),
+    ("define entropy", "define enthalpy"),
+])
+def test_near_miss_questions_do_not_match(stored, asked):
+    assert cache_with(stored).lookup(asked) is None
+
+
+@pytest.mark.parametrize("stored, asked", [
+    ("What is the capital of France?", "what is the capital of france"),
+    ("Explain quantum computing", "Tell me about quantum computing"),
+    ("population of india in 2020", "Population of India in 2020?"),
+    ("explain quantum computing", "what is quantum computing?"),
+    ("tell me about black holes", "what are black holes"),
+    ("What's photosynthesis?", "Define photosynthesis"),
+    ("meaning of entropy", "explain entropy please"),
+])
+def test_rewordings_match(stored, asked):
+    hit = cache_with(stored).lookup(asked)
+    assert hit is not None and hit.output == "cached answer"
+    # The cached history carries the new wording of the question
+    assert hit.all_messages()[0].parts[0].content == asked
+
+
+def test_expired_entries_are_dropped(monkeypatch):
+    cache = AnswerCache(ttl=10)
+    now = 1000.0
+    monkeypatch.setattr(answer_cache.time, "time", lambda: now)
+    cache.store("what is rust", "answer", history("what is rust"), 10)
+    monkeypatch.setattr(answer_cache.time, "time", lambda: now + 11)
+    assert cache.lookup("what is rust") is None
+    assert len(cache) == 0
+
+
+def test_size_bound_evicts_oldest():
+    cache = AnswerCache(max_entries=2)
+    for topic in ("rust", "python", "golang"):
+        cache.store(f"what is {topic}", topic, history(topic), 10)
+    assert len(cache) == 2
+    assert cache.lookup("what is rust") is None
+    assert cache.lookup("what is golang").output == "golang"
+
+
+class Result:
+    def __init__(self, output):
+        self.output = output
+
+    def all_messages(self):
+        return history("q", self.output)
+
+
+def test_cached_run_only_serves_first_turns(monkeypatch):
+    monkeypatch.setattr(answer_cache, "ENABLED", True)
+    monkeypatch.setattr(answer_cache, "_cache", AnswerCache())
+    calls = []
+
+    async def run():
+        calls.append(True)
+        return Result(f"answer {len(calls)}")
+
+    async def scenario():
+        first = await cached_run("what is rust", [], run)
+        repeat = await cached_run("What is Rust?", [], run)
+        follow_up = await cached_run("what is rust", history("earlier"), run)
+        return first.output, repeat.output, follow_up.output
+
+    assert asyncio.run(scenario()) == ("answer 1", "answer 1", "answer 2")
+    assert len(calls) == 2
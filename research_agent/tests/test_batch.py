@@ -0,0 +1,75 @@
+# test_batch.py
+import asyncio
+import json
+from pydantic_ai.models.test import TestModel
+import answer_cache
+import batch
+from agent import research_agent
+
+
+def test_read_questions_text_and_jsonl(tmp_path):
+    path = tmp_path / "questions.txt"
+    path.write_text('what is rust?\n\n{"id": "q7", "question": "what is go?"}\n{"question": "no id"}\n', encoding="utf-8")
+    assert list(batch.read_questions(str(path))) == [("1", "what is rust?"), ("q7", "what is go?"), ("4", "no id")]
+
+
+def test_completed_ids_skips_errors_and_partial_lines(tmp_path):
+    path = tmp_path / "answers.jsonl"
+    path.write_text(
+        json.dumps({"id": "1", "answer": "yes"}) + "\n"
+        + json.dumps({"id": "2", "error": "boom"}) + "\n"
+        + '{"id": "3", "answ',
+        encoding="utf-8",
+    )
+    assert batch.completed_ids(str(path)) == {"1"}
+    assert batch.completed_ids(str(tmp_path / "missing.jsonl")) == set()
+
+
+def test_run_batch_writes_one_line_per_question(tmp_path, monkeypatch):
+    monkeypatch.setattr(answer_cache, "_cache", answer_cache.AnswerCache())
+    output = str(tmp_path / "answers.jsonl")
+    questions = [("1", "capital of france"), ("2", "capital of spain")]
+
+    with research_agent.override(model=TestModel(call_tools=[], custom_output_text="An answer.")):
+        stats = asyncio.run(batch.run_batch(questions, output, concurrency=2))
+
+    with open(output, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert sorted(r["id"] for r in records) == ["1", "2"]
+    assert all(r["answer"] == "An answer." for r in records)
+    assert stats["answered"] == 2 and stats["errors"] == 0
+    assert batch.completed_ids(output) == {"1", "2"}
+
+
+def test_run_batch_records_failures(tmp_path, monkeypatch):
+    monkeypatch.setattr(answer_cache, "ENABLED", False)
+    monkeypatch.setattr(answer_cache, "_cache", None)
+
+    async def broken(*args, **kwargs):
+        raise RuntimeError("model unavailable")
+
+    monkeypatch.setattr(research_agent, "run", broken)
+    output = str(tmp_path / "answers.jsonl")
+    stats = asyncio.run(batch.run_batch([("1", "anything")], output, concurrency=1))
+
+    with open(output, encoding="utf-8") as f:
+        record = json.loads(f.readline())
+    assert record["error"] == "RuntimeError: model unavailable"
+    assert stats["errors"] == 1
+    assert batch.completed_ids(output) == set()
+
+
+def test_read_questions_skips_lines_without_a_question(tmp_path, capsys):
+    path = tmp_path / "questions.jsonl"
+    path.write_text(
+        '{"id": "a", "prompt": "wrong key"}\n'
+        '{"id": "b", "question": "what is go?"}\n'
+        '{"id": "c", "question": ""}\n'
+        '{"id": "d", "question": 42}\n'
+        '{"id": "e", "question": \n'
+        'what is rust?\n',
+        encoding="utf-8",
+    )
+    assert list(batch.read_questions(str(path))) == [("b", "what is go?"), ("6", "what is rust?")]
+    warnings = capsys.readouterr().err.splitlines()
+    assert [w.split(":")[0] for w in warnings] == ["Skipping line 1", "Skipping line 3", "Skipping line 4", "Skipping line 5"]
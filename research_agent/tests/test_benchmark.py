@@ -0,0 +1,33 @@
+# test_benchmark.py
+import asyncio
+import benchmark
+import http_client
+import sources
+from agent import research_agent
+
+
+def test_percentile():
+    values = [float(v) for v in range(1, 101)]
+    assert benchmark.percentile(values, 50) == 50
+    assert benchmark.percentile(values, 99) == 99
+    assert benchmark.percentile([], 95) == 0.0
+
+
+def test_run_level_end_to_end_offline(monkeypatch):
+    monkeypatch.setattr(sources, "DDG_URL", f"http://127.0.0.1:{benchmark._port}/")
+
+    async def scenario():
+        server, task = await benchmark.start_server(benchmark.fake_duckduckgo(0.0, 0.0, 0.0, 0.0), benchmark._port)
+        try:
+            with research_agent.override(model=benchmark.scripted_model(0.0)):
+                return await benchmark.run_level(concurrency=4, turns=8, topics=2)
+        finally:
+            await http_client.aclose_client()
+            server.should_exit = True
+            await task
+
+    result = asyncio.run(scenario())
+    assert result["errors"] == 0
+    assert result["turns"] == 8
+    assert result["tool_calls"] == 8
+    assert result["p50_ms"] <= result["p99_ms"]
@@ -0,0 +1,118 @@
+# test_circuit_breaker.py
+import asyncio
+import pytest
+import circuit_breaker
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", clock)
+    return clock
+
+
+def breaker(**kwargs):
+    options = dict(window=10, min_calls=4, error_rate=0.5, slow_call_seconds=2, slow_call_rate=0.8,
+                   open_seconds=30, min_timeout=1, max_timeout=10)
+    options.update(kwargs)
+    return CircuitBreaker("test", **options)
+
+
+def test_opens_on_error_rate(clock):
+    b = breaker()
+    for ok in (True, False, True):
+        b.record(ok, 0.1)
+    assert b.state == CLOSED  # below min_calls
+    b.record(False, 0.1)
+    assert b.state == OPEN
+    assert not b.allow()
+
+
+def test_opens_on_slow_call_rate(clock):
+    b = breaker()
+    for _ in range(4):
+        b.record(True, 3.0)
+    assert b.state == OPEN
+
+
+def test_half_open_trial_closes_or_reopens(clock):
+    b = breaker(min_calls=1, error_rate=1.0)
+    b.record(False, 0.1)
+    assert b.state == OPEN
+    clock.now += 31
+    assert b.allow() and b.state == HALF_OPEN
+    assert not b.allow()  # only one trial at a time
+    b.record(False, 0.1)
+    assert b.state == OPEN
+
+    clock.now += 31
+    assert b.allow()
+    b.record(True, 0.1)
+    assert b.state == CLOSED
+
+
+def test_timeout_follows_p95(clock):
+    b = breaker(min_calls=100)
+    assert b.timeout() == 10  # nothing observed yet
+    for _ in range(20):
+        b.record(True, 0.2)
+    assert b.timeout() == 1  # 2 x p95 clamped to the minimum
+    for _ in range(20):
+        b.record(True, 3.0)
+    assert b.timeout() == 6
+
+
+def test_call_raises_while_open():
+    b = breaker(min_calls=1, error_rate=1.0)
+
+    async def fail():
+        raise RuntimeError("down")
+
+    async def ok():
+        return "never"
+
+    with pytest.raises(RuntimeError):
+        run(b.call(fail))
+    with pytest.raises(CircuitOpenError):
+        run(b.call(ok))
+
+
+def test_call_times_out_with_adaptive_timeout():
+    b = breaker(max_timeout=0.05, min_calls=1, error_rate=1.0)
+
+    async def hang():
+        await asyncio.sleep(1)
+
+    with pytest.raises(asyncio.TimeoutError):
+        run(b.call(hang))
+    assert b.state == OPEN
+
+
+def test_cancelled_trial_is_not_counted(clock):
+    b = breaker(min_calls=1, error_rate=1.0)
+    b.record(False, 0.1)
+    clock.now += 31
+
+    async def scenario():
+        task = asyncio.ensure_future(b.call(asyncio.sleep, 1))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    run(scenario())
+    assert b.state == HALF_OPEN
+    assert b.allow()  # the trial slot was handed back
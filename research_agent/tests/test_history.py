@@ -0,0 +1,68 @@
+# test_history.py
+import pytest
+import history
+from history import HistoryManager, estimate_tokens, split_turns
+from pydantic_ai.messages import (
+    ModelRequest, ModelResponse, SystemPromptPart, TextPart, ToolCallPart, ToolReturnPart, UserPromptPart,
+)
+
+
+def turn(question, answer, topic=None, payload="", system=False):
+    first = [SystemPromptPart(content="You are a research assistant.")] if system else []
+    messages = [ModelRequest(parts=first + [UserPromptPart(content=question)])]
+    if topic:
+        call_id = f"call-{topic}"
+        messages.append(ModelResponse(parts=[ToolCallPart(tool_name="get_research", args={"topic": topic}, tool_call_id=call_id)]))
+        messages.append(ModelRequest(parts=[ToolReturnPart(tool_name="get_research", content=payload, tool_call_id=call_id)]))
+    messages.append(ModelResponse(parts=[TextPart(content=answer)]))
+    return messages
+
+
+def conversation(turns, payload="x" * 2000):
+    messages = []
+    for i in range(turns):
+        messages += turn(f"question {i}", f"answer {i} " + "detail " * 100, topic=f"topic {i}", payload=payload,
+                         system=(i == 0))
+    return messages
+
+
+def tool_returns(messages):
+    return [p.content for m in messages for p in m.parts if p.part_kind == "tool-return"]
+
+
+def test_split_turns():
+    messages = conversation(3)
+    turns = split_turns(messages)
+    assert len(turns) == 3
+    assert all(t[0].parts[-1].part_kind == "user-prompt" for t in turns)
+
+
+def test_recent_turns_kept_and_old_turns_summarized():
+    messages = conversation(5)
+    compacted, saved = HistoryManager(token_budget=100_000, keep_recent_turns=2).compact(messages)
+    turns = split_turns(compacted)
+    assert len(turns) == 5
+    # Old turns: user prompt plus a truncated answer, no tool traffic
+    assert [m.parts[-1].part_kind for m in turns[0]] == ["user-prompt", "text"]
+    assert len(turns[0][1].parts[0].content) <= history.SUMMARY_CHARS + 1
+    assert saved > 0
+
+
+def test_only_latest_turn_keeps_research_payloads(monkeypatch):
+    monkeypatch.setattr(history, "TOOL_REFS", True)
+    compacted, _ = HistoryManager(token_budget=100_000, keep_recent_turns=3).compact(conversation(3))
+    payloads = tool_returns(compacted)
+    assert payloads[:2] == ["[earlier research on 'topic 0' omitted]", "[earlier research on 'topic 1' omitted]"]
+    assert payloads[2] == "x" * 2000
+
+
+def test_oldest_turns_dropped_to_fit_budget_and_system_prompt_kept():
+    messages = conversation(8)
+    compacted, _ = HistoryManager(token_budget=1000, keep_recent_turns=2).compact(messages)
+    assert estimate_tokens(compacted) < estimate_tokens(messages)
+    assert len(split_turns(compacted)) < 8
+    assert compacted[0].parts[0].part_kind == "system-prompt"
+
+
+def test_empty_history():
+    assert HistoryManager().compact([]) == ([], 0)
@@ -0,0 +1,68 @@
+# test_http_client.py
+import asyncio
+import httpx
+import http_client
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_client_is_shared_until_closed():
+    async def scenario():
+        first = http_client.get_client()
+        assert http_client.get_client() is first
+        await http_client.aclose_client()
+        assert first.is_closed
+        second = http_client.get_client()
+        assert second is not first
+        await http_client.aclose_client()
+
+    run(scenario())
+
+
+def test_lifespan_closes_client():
+    async def scenario():
+        async with http_client.lifespan():
+            client = http_client.get_client()
+            assert not client.is_closed
+        assert client.is_closed
+        assert http_client._client is None
+
+    run(scenario())
+
+
+def test_timed_get_uses_shared_client(monkeypatch):
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(200, json={"q": request.url.params["q"]})
+
+    async def scenario():
+        monkeypatch.setattr(http_client, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        res = await http_client.timed_get("https://example.test/", params={"q": "python"})
+        assert res.json() == {"q": "python"}
+        await http_client.aclose_client()
+
+    run(scenario())
+    assert len(seen) == 1
+
+
+def test_request_timings_aggregate_trace_events():
+    timings = http_client.RequestTimings()
+
+    async def scenario():
+        for step in ("connection.connect_tcp", "connection.start_tls", "http11.send_request_headers",
+                     "http11.receive_response_body"):
+            await timings.trace(f"{step}.started", {})
+            await timings.trace(f"{step}.complete", {})
+        # A completion without a start is ignored
+        await timings.trace("http11.receive_response_headers.complete", {})
+
+    run(scenario())
+    timings.finish()
+    result = timings.as_dict()
+    assert result["reused_connection"] is False
+    assert set(result) == {"connect_ms", "tls_ms", "transfer_ms", "total_ms", "reused_connection"}
+    assert result["total_ms"] >= result["transfer_ms"] >= 0
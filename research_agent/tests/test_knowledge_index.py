@@ -0,0 +1,85 @@
+# test_knowledge_index.py
+import asyncio
+import json
+import time
+import knowledge_index
+from knowledge_index import KnowledgeIndex, build_index, iter_corpus, tokenize
+from sources import local_hits
+
+
+def write_corpus(directory):
+    with open(directory / "facts.jsonl", "w", encoding="utf-8") as f:
+        f.write(json.dumps({"title": "Python", "text": "Python is a programming language created by Guido."}) + "\n")
+        f.write("\n")
+        f.write(json.dumps({"title": "Rust", "body": "Rust is a systems programming language focused on safety."}) + "\n")
+    (directory / "space.md").write_text(
+        "Intro text about space.\n# Mars\nMars is the fourth planet from the Sun.\n# Venus\nVenus is the hottest planet.\n",
+        encoding="utf-8",
+    )
+
+
+def test_tokenize_drops_stopwords():
+    assert tokenize("What is the Capital of France?") == ["capital", "france"]
+
+
+def test_markdown_is_split_per_heading(tmp_path):
+    write_corpus(tmp_path)
+    titles = [title for title, _ in iter_corpus(str(tmp_path))]
+    assert titles == ["Python", "Rust", "space", "Mars", "Venus"]
+
+
+def test_build_and_search(tmp_path):
+    write_corpus(tmp_path)
+    meta = build_index(str(tmp_path), str(tmp_path / "index"))
+    assert meta["documents"] == 5
+
+    index = KnowledgeIndex(str(tmp_path / "index"))
+    try:
+        hits = index.search("hottest planet")
+        assert index.document(hits[0][1])["title"] == "Venus"
+        assert [index.document(d)["title"] for _, d in index.search("programming language", k=2)] in (
+            ["Python", "Rust"], ["Rust", "Python"])
+        assert index.search("zzzz unknown") == []
+    finally:
+        index.close()
+
+
+def test_empty_corpus_builds_a_searchable_index(tmp_path):
+    (tmp_path / "corpus").mkdir()
+    build_index(str(tmp_path / "corpus"), str(tmp_path / "index"))
+    index = KnowledgeIndex(str(tmp_path / "index"))
+    assert index.search("anything") == []
+    index.close()
+
+
+def test_get_index_is_none_without_a_built_index(monkeypatch, tmp_path):
+    monkeypatch.setattr(knowledge_index, "INDEX_PATH", str(tmp_path / "missing"))
+    monkeypatch.setattr(knowledge_index, "_index", None)
+    monkeypatch.setattr(knowledge_index, "_index_loaded", False)
+    assert knowledge_index.get_index() is None
+
+
+def test_concurrent_first_calls_wait_for_the_load(monkeypatch, tmp_path):
+    write_corpus(tmp_path)
+    build_index(str(tmp_path), str(tmp_path / "index"))
+    loads = []
+
+    class SlowIndex(KnowledgeIndex):
+        def __init__(self, path):
+            loads.append(path)
+            time.sleep(0.2)
+            super().__init__(path)
+
+    monkeypatch.setattr(knowledge_index, "KnowledgeIndex", SlowIndex)
+    monkeypatch.setattr(knowledge_index, "INDEX_PATH", str(tmp_path / "index"))
+    monkeypatch.setattr(knowledge_index, "_index", None)
+    monkeypatch.setattr(knowledge_index, "_index_loaded", False)
+
+    async def scenario():
+        topics = ["hottest planet", "fourth planet", "systems programming", "Guido"]
+        return await asyncio.gather(*(asyncio.to_thread(local_hits, topic) for topic in topics))
+
+    results = asyncio.run(scenario())
+    assert len(loads) == 1
+    assert [hits[0][1]["title"] for hits in results] == ["Venus", "Mars", "Rust", "Python"]
+    knowledge_index.get_index().close()
@@ -0,0 +1,32 @@
+# test_main.py
+import asyncio
+import logging
+import threading
+import pytest
+import main
+
+
+@pytest.fixture
+def fresh_warmup(monkeypatch):
+    monkeypatch.setattr(main, "_warmup_error", None)
+    monkeypatch.setattr(main, "_warmup", threading.Thread(target=main._warm_up, daemon=True))
+
+
+def test_warm_up_failure_is_logged_and_raised_on_first_use(fresh_warmup, monkeypatch, caplog):
+    def broken():
+        raise ImportError("no module named agent")
+
+    monkeypatch.setattr(main, "_load", broken)
+    with caplog.at_level(logging.ERROR):
+        with pytest.raises(RuntimeError) as raised:
+            asyncio.run(main._ready())
+    assert isinstance(raised.value.__cause__, ImportError)
+    assert "Background warm-up failed" in caplog.text
+
+
+def test_ready_waits_for_warm_up(fresh_warmup, monkeypatch):
+    loaded = []
+    monkeypatch.setattr(main, "_load", lambda: loaded.append(True))
+    asyncio.run(main._ready())
+    asyncio.run(main._ready())
+    assert loaded == [True]
@@ -0,0 +1,115 @@
+# test_prefetch.py
+import asyncio
+import pytest
+import research_cache
+import sources
+from circuit_breaker import OPEN
+from prefetch import Prefetcher, related_topics
+from research_cache import ResearchCache
+
+
+def test_related_topics_flattens_groups_and_dedupes():
+    data = {"RelatedTopics": [
+        {"FirstURL": "https://duckduckgo.com/Rust_(programming_language)", "Text": "..."},
+        {"Name": "See also", "Topics": [
+            {"FirstURL": "https://duckduckgo.com/Go_(programming_language)"},
+            {"FirstURL": "https://duckduckgo.com/Rust_(programming_language)"},
+        ]},
+        "not a dict",
+        {"FirstURL": "https://duckduckgo.com/C%2B%2B"},
+        {"FirstURL": "https://duckduckgo.com/Zig"},
+    ]}
+    assert related_topics(data, limit=3) == ["Rust (programming language)", "Go (programming language)", "C++"]
+    assert related_topics({}) == []
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ResearchCache(path=None)
+    monkeypatch.setattr(research_cache, "_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def fetched(monkeypatch):
+    topics = []
+
+    async def fetch(topic, prefetch_related=True):
+        assert prefetch_related is False
+        topics.append(topic)
+        return f"about {topic}"
+
+    monkeypatch.setattr(sources, "fetch_duckduckgo", fetch)
+    monkeypatch.setattr(sources, "_duckduckgo", sources.DuckDuckGoSource())
+    return topics
+
+
+def drain(prefetcher, topics):
+    async def scenario():
+        prefetcher.schedule(topics)
+        await prefetcher._queue.join()
+        await prefetcher.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_prefetch_warms_cache_and_counts_use(cache, fetched):
+    prefetcher = Prefetcher(workers=1, rate_per_second=0)
+    drain(prefetcher, ["mars", "venus"])
+    assert fetched == ["mars", "venus"]
+    assert asyncio.run(cache.contains("Mars"))
+
+    prefetcher.note_request("Mars")
+    prefetcher.note_request("pluto")
+    assert prefetcher.usage() == {"issued": 2, "used": 1, "use_rate": 0.5}
+
+
+def test_prefetch_skips_cached_topics(cache, fetched):
+    asyncio.run(cache.set("mars", "already known"))
+    drain(Prefetcher(workers=1, rate_per_second=0), ["mars"])
+    assert fetched == []
+
+
+def test_prefetch_pauses_while_breaker_is_not_closed(cache, fetched):
+    sources.get_duckduckgo_source().breaker.state = OPEN
+    prefetcher = Prefetcher(workers=1, rate_per_second=0)
+    drain(prefetcher, ["mars"])
+    assert fetched == []
+    assert prefetcher.stats["issued"] == 0
+
+
+def test_queue_overflow_is_dropped(monkeypatch):
+    monkeypatch.setattr("prefetch.QUEUE_SIZE", 2)
+    prefetcher = Prefetcher(workers=0)
+
+    async def scenario():
+        prefetcher.schedule(["a", "b", "c", "d"])
+
+    asyncio.run(scenario())
+    assert prefetcher.stats["dropped"] == 2
+
+
+def test_prefetch_and_user_lookup_share_one_fetch(cache, monkeypatch):
+    calls = []
+
+    async def fetch(topic, prefetch_related=True):
+        calls.append(topic)
+        await asyncio.sleep(0.05)
+        return f"about {topic}"
+
+    monkeypatch.setattr(sources, "fetch_duckduckgo", fetch)
+    source = sources.DuckDuckGoSource()
+    monkeypatch.setattr(sources, "_duckduckgo", source)
+    prefetcher = Prefetcher(workers=1, rate_per_second=0)
+
+    async def scenario():
+        prefetcher.schedule(["mars"])
+        await asyncio.sleep(0.01)
+        answer = await source.search("Mars?")
+        await prefetcher._queue.join()
+        await prefetcher.aclose()
+        return answer
+
+    assert asyncio.run(scenario()) == "about mars"
+    assert calls == ["mars"]
+    assert prefetcher.stats["issued"] == 1
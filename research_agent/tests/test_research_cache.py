@@ -0,0 +1,119 @@
+# test_research_cache.py
+import asyncio
+import time
+import research_cache
+from research_cache import CacheEntry, DiskTier, MemoryTier, ResearchCache, normalize_topic
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_normalize_topic():
+    assert normalize_topic("  Quantum,   Computing?! ") == "quantum computing"
+
+
+def test_memory_tier_evicts_least_recently_used():
+    tier = MemoryTier(2)
+    far = time.time() + 60
+    tier.set("a", CacheEntry("A", far))
+    tier.set("b", CacheEntry("B", far))
+    tier.get("a")
+    tier.set("c", CacheEntry("C", far))
+    assert tier.get("b") is None
+    assert tier.get("a").value == "A"
+    assert len(tier) == 2
+
+
+def test_memory_tier_drops_expired_entries():
+    tier = MemoryTier(10)
+    tier.set("old", CacheEntry("x", time.time() - 1))
+    assert tier.get("old") is None
+    assert len(tier) == 0
+
+
+def test_hits_are_keyed_on_normalized_topic():
+    cache = ResearchCache(path=None)
+
+    async def scenario():
+        assert await cache.get("Python") is None
+        await cache.set("Python", "a language")
+        entry = await cache.get("  python? ")
+        assert entry.value == "a language"
+
+    run(scenario())
+    assert cache.stats["misses"] == 1
+    assert cache.stats["memory_hits"] == 1
+
+
+def test_negative_entries_use_short_ttl(monkeypatch):
+    cache = ResearchCache(path=None, ttl=100, negative_ttl=1)
+    now = time.time()
+    monkeypatch.setattr(research_cache.time, "time", lambda: now)
+
+    async def scenario():
+        await cache.set("nothing here", None)
+        entry = await cache.get("nothing here")
+        assert entry.negative and entry.value is None
+        monkeypatch.setattr(research_cache.time, "time", lambda: now + 2)
+        assert await cache.get("nothing here") is None
+
+    run(scenario())
+    assert cache.stats["negative_hits"] == 1
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+
+    async def store():
+        cache = ResearchCache(path=path)
+        await cache.set("rust", "a language")
+        cache.close()
+
+    async def load():
+        cache = ResearchCache(path=path)
+        entry = await cache.get("rust")
+        assert await cache.contains("rust")
+        cache.close()
+        return entry, cache.stats
+
+    run(store())
+    entry, stats = run(load())
+    assert entry.value == "a language"
+    assert stats["disk_hits"] == 1
+
+
+def test_disk_tier_bounds_rows(tmp_path):
+    cache = ResearchCache(path=str(tmp_path / "cache.sqlite3"), memory_entries=1, disk_entries=3)
+
+    async def scenario():
+        for i in range(6):
+            await cache.set(f"topic {i}", str(i))
+        return [await cache.contains(f"topic {i}") for i in range(6)]
+
+    present = run(scenario())
+    cache.close()
+    assert present == [False, False, False, True, True, True]
+
+
+def test_disk_hits_touch_access_time_at_most_once_per_resolution(tmp_path, monkeypatch):
+    now = time.time()
+    monkeypatch.setattr(research_cache.time, "time", lambda: now)
+    tier = DiskTier(str(tmp_path / "cache.sqlite3"), max_entries=10, access_resolution=60)
+    tier.set("rust", CacheEntry("a language", now + 3600))
+    writes = tier._conn.total_changes
+
+    def accessed_at():
+        return tier._conn.execute("SELECT accessed_at FROM research_cache WHERE key = 'rust'").fetchone()[0]
+
+    for step in (1, 30, 59):
+        monkeypatch.setattr(research_cache.time, "time", lambda: now + step)
+        assert tier.get("rust").value == "a language"
+    assert tier._conn.total_changes == writes
+    assert accessed_at() == now
+
+    monkeypatch.setattr(research_cache.time, "time", lambda: now + 61)
+    assert tier.get("rust").value == "a language"
+    assert tier._conn.total_changes == writes + 1
+    assert accessed_at() == now + 61
+    tier.close()
@@ -0,0 +1,99 @@
+# test_server.py
+import asyncio
+import httpx
+import pytest
+from pydantic_ai.models.test import TestModel
+import answer_cache
+import server
+from agent import research_agent
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    monkeypatch.setattr(server, "sessions", server.SessionStore())
+    monkeypatch.setattr(server, "limiter", server.RunLimiter(2, 1))
+    monkeypatch.setattr(answer_cache, "_cache", answer_cache.AnswerCache())
+
+
+def call(*requests):
+    """Send (method, path, json) requests to the app with the agent on a scripted model"""
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return [await client.request(method, path, json=body) for method, path, body in requests]
+
+    with research_agent.override(model=TestModel(call_tools=[], custom_output_text="Paris is the capital.")):
+        return asyncio.run(scenario())
+
+
+def test_chat_keeps_session_history():
+    first, = call(("POST", "/chat", {"message": "capital of france?"}))
+    assert first.status_code == 200
+    session_id = first.json()["session_id"]
+    assert first.json()["output"] == "Paris is the capital."
+
+    second, = call(("POST", "/chat", {"message": "and its population?", "session_id": session_id}))
+    assert second.json()["session_id"] == session_id
+    assert len(server.sessions.get_or_create(session_id).history) == 4
+    assert server.limiter.admitted == 0
+
+
+def test_chat_rejects_when_queue_is_full():
+    for _ in range(3):
+        assert server.limiter.try_admit()
+    response, = call(("POST", "/chat", {"message": "hello"}))
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "1"
+
+
+def test_end_session_and_health():
+    created, = call(("POST", "/chat", {"message": "hello"}))
+    session_id = created.json()["session_id"]
+    health, deleted, missing = call(
+        ("GET", "/health", None),
+        ("DELETE", f"/sessions/{session_id}", None),
+        ("DELETE", f"/sessions/{session_id}", None),
+    )
+    assert health.json() == {"status": "ok", "sessions": 1, "in_flight": 0}
+    assert deleted.json() == {"deleted": session_id}
+    assert missing.status_code == 404
+
+
+def test_chat_stream_sends_session_deltas_and_done():
+    response, = call(("POST", "/chat/stream", {"message": "capital of france?"}))
+    events = [block.split("\n")[0] for block in response.text.strip().split("\n\n")]
+    assert events[0] == "event: session"
+    assert "event: delta" in events
+    assert events[-1] == "event: done"
+    assert server.limiter.admitted == 0
+
+
+@pytest.mark.parametrize("spec_version", ["2.0", "2.4"])
+def test_chat_stream_releases_slot_when_client_leaves_before_body(spec_version):
+    started = []
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        # The client is already gone when the response starts
+        raise OSError("connection reset")
+
+    async def scenario():
+        response = await server.chat_stream(server.ChatRequest(message="hello"))
+        assert server.limiter.admitted == 1
+        response.body_iterator = track(response.body_iterator)
+        try:
+            await response({"type": "http", "asgi": {"spec_version": spec_version}}, receive, send)
+        except Exception:
+            pass
+
+    async def track(events):
+        started.append(True)
+        async for event in events:
+            yield event
+
+    asyncio.run(scenario())
+    assert server.limiter.admitted == 0
+    assert not started
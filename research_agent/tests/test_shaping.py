@@ -0,0 +1,45 @@
+# test_shaping.py
+from shaping import shape_and_measure, shape_result
+
+
+def test_header_replaced_and_duplicates_dropped():
+    text = "Live research about 'mars':\n• Mars is red. Mars is red.\n• It has two moons."
+    assert shape_result("mars", text) == "[web] mars\nMars is red. It has two moons."
+
+
+def test_merged_answers_get_one_header():
+    text = (
+        "Live research summary about 'mars':\nMars is the fourth planet.\n\n"
+        "Local knowledge about 'mars':\n• Mars is the fourth planet. It is cold."
+    )
+    shaped = shape_result("mars", text)
+    assert shaped.startswith("[web+local] mars\n")
+    assert "about 'mars'" not in shaped
+    assert shaped.count("Mars is the fourth planet.") == 1
+
+
+def test_topic_with_quote():
+    text = "Local knowledge about 'newton's laws':\nThree laws of motion."
+    assert shape_result("newton's laws", text) == "[local] newton's laws\nThree laws of motion."
+
+
+def test_unrecognised_text_is_kept():
+    assert shape_result("x", "Plain text. More text.") == "[web] x\nPlain text. More text."
+
+
+def test_budget_cuts_at_sentence_boundary():
+    text = "Live research about 't':\n" + " ".join(f"Sentence number {i}." for i in range(100))
+    shaped = shape_result("t", text, max_chars=60)
+    assert len(shaped) <= 60
+    assert shaped.endswith(".")
+
+
+def test_single_long_sentence_is_truncated():
+    shaped = shape_result("t", "word " * 100, max_chars=40)
+    assert len(shaped) <= 40 and shaped.endswith("…")
+
+
+def test_shape_and_measure_reports_saving():
+    text = "Live research about 'mars':\n" + "• Mars is red.\n" * 20
+    shaped, saved = shape_and_measure("mars", text)
+    assert saved == len(text.encode()) - len(shaped.encode()) > 0
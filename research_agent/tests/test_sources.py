@@ -0,0 +1,138 @@
+# test_sources.py
+import asyncio
+import threading
+import pytest
+import sources
+import tools
+from circuit_breaker import OPEN
+from sources import LocalIndexSource, ResearchSource, research
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class StubSource(ResearchSource):
+    def __init__(self, name, answer=None, delay=0.0, error=None):
+        self.name = name
+        self.answer = answer
+        self.delay = delay
+        self.error = error
+        self.cancelled = False
+
+    async def search(self, topic):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error:
+            raise self.error
+        return self.answer
+
+
+DOCS = {
+    "strong": (9.0, {"title": "Mars", "text": "Mars is the fourth planet."}),
+    "weak": (1.0, {"title": "Venus", "text": "Venus is hot."}),
+}
+
+
+@pytest.fixture
+def fake_index(monkeypatch):
+    lookups = []
+
+    def local_hits(topic):
+        lookups.append((topic, threading.get_ident()))
+        return [DOCS[word] for word in topic.split() if word in DOCS]
+
+    monkeypatch.setattr(sources, "local_hits", local_hits)
+    return lookups
+
+
+def test_research_source_is_abstract():
+    with pytest.raises(TypeError):
+        ResearchSource()
+
+
+def test_first_good_answer_wins_and_rest_are_cancelled():
+    slow = StubSource("slow", "slow answer", delay=1)
+    sources_ = [StubSource("empty"), StubSource("fast", "fast answer", delay=0.01), slow]
+    assert run(research("topic", sources_, deadline=2, strategy="first")) == "fast answer"
+    assert slow.cancelled
+
+
+def test_merge_keeps_answers_within_window_in_registration_order():
+    sources_ = [
+        StubSource("b", "second", delay=0.02),
+        StubSource("a", "first", delay=0.01),
+        StubSource("late", "too late", delay=1),
+    ]
+    assert run(research("topic", sources_, deadline=2, strategy="merge", merge_window=0.1)) == "second\n\nfirst"
+
+
+def test_deadline_and_failing_sources_give_none():
+    sources_ = [StubSource("broken", error=RuntimeError("boom")), StubSource("slow", "late", delay=1)]
+    assert run(research("topic", sources_, deadline=0.05)) is None
+
+
+def test_local_lookup_runs_off_the_event_loop(fake_index):
+    source = LocalIndexSource(min_score=4.0)
+    assert run(source.search("strong")).startswith("Local knowledge about 'strong':\n• Mars:")
+    assert fake_index[0][1] != threading.get_ident()
+
+
+def test_local_source_only_answers_strong_matches(fake_index):
+    source = LocalIndexSource(min_score=4.0)
+    assert run(source.search("weak")) is None
+    assert "Venus" in run(source.weak_answer("weak"))
+    assert len(fake_index) == 1
+
+
+def test_research_topic_searches_the_index_once(fake_index, monkeypatch):
+    local = LocalIndexSource(min_score=4.0)
+    monkeypatch.setattr(sources, "_local", local)
+    monkeypatch.setattr(sources, "_sources", [StubSource("web"), local])
+
+    result = run(tools.research_topic("weak"))
+    assert result.startswith("[local] weak\n")
+    assert "Venus is hot." in result
+    assert len(fake_index) == 1
+
+
+def test_research_topic_falls_back_when_nothing_matches(fake_index, monkeypatch):
+    local = LocalIndexSource(min_score=4.0)
+    monkeypatch.setattr(sources, "_local", local)
+    monkeypatch.setattr(sources, "_sources", [StubSource("web"), local])
+    assert "couldn't find current information" in run(tools.research_topic("nothing"))
+
+
+def test_breaker_times_out_before_the_research_deadline():
+    breaker = sources.DuckDuckGoSource().breaker
+    assert breaker.timeout() < sources.DEADLINE
+    assert breaker.max_timeout < sources.DEADLINE
+
+
+def test_hung_duckduckgo_opens_the_breaker(monkeypatch):
+    # The real relationship between breaker timeout and deadline, scaled down
+    monkeypatch.setattr(sources, "DEADLINE", 0.2)
+    hung = asyncio.Event()
+
+    async def fetch_duckduckgo(topic):
+        await hung.wait()
+
+    monkeypatch.setattr(sources, "fetch_duckduckgo", fetch_duckduckgo)
+    source = sources.DuckDuckGoSource()
+
+    async def scenario():
+        results = []
+        for i in range(source.breaker.min_calls + 1):
+            started = asyncio.get_running_loop().time()
+            results.append(await research(f"hung topic {i}", [source], deadline=sources.DEADLINE))
+            results.append(asyncio.get_running_loop().time() - started)
+        return results
+
+    results = run(scenario())
+    assert results[0::2] == [None] * (source.breaker.min_calls + 1)
+    assert source.breaker.state == OPEN
+    # Once open, a turn no longer waits out the deadline
+    assert results[-1] < 0.05
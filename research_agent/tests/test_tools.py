@@ -0,0 +1,55 @@
+# test_tools.py
+import asyncio
+import tools
+
+
+def test_get_research_many_dedupes_and_caps_topics(monkeypatch):
+    seen = []
+
+    async def research_topic(topic):
+        seen.append(topic)
+        return f"about {topic}"
+
+    monkeypatch.setattr(tools, "research_topic", research_topic)
+    monkeypatch.setattr(tools, "MULTI_MAX_TOPICS", 3)
+    topics = ["rust", " rust ", "", "go", "python", "java"]
+    results = asyncio.run(tools.get_research_many(None, topics))
+    assert results == {"rust": "about rust", "go": "about go", "python": "about python"}
+    assert sorted(seen) == ["go", "python", "rust"]
+
+
+def test_get_research_many_bounds_concurrency(monkeypatch):
+    running = peak = 0
+
+    async def research_topic(topic):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return topic
+
+    monkeypatch.setattr(tools, "research_topic", research_topic)
+    monkeypatch.setattr(tools, "MULTI_CONCURRENCY", 2)
+    asyncio.run(tools.get_research_many(None, [f"t{i}" for i in range(6)]))
+    assert peak == 2
+
+
+def test_get_research_many_falls_back_for_late_and_failed_topics(monkeypatch):
+    async def research_topic(topic):
+        if topic == "slow":
+            await asyncio.sleep(1)
+        if topic == "broken":
+            raise RuntimeError("boom")
+        return f"about {topic}"
+
+    monkeypatch.setattr(tools, "research_topic", research_topic)
+    monkeypatch.setattr(tools, "MULTI_DEADLINE", 0.05)
+    results = asyncio.run(tools.get_research_many(None, ["fast", "slow", "broken"]))
+    assert results["fast"] == "about fast"
+    assert results["slow"] == tools.offline_fallback("slow")
+    assert results["broken"] == tools.offline_fallback("broken")
+
+
+def test_get_research_many_with_no_topics():
+    assert asyncio.run(tools.get_research_many(None, ["  "])) == {}
@@ -1,64 +1,75 @@
 # tools.py
+import asyncio
 import os
-import httpx
-from typing import Any
+from typing import Any, Dict, List
 from pydantic_ai import RunContext
 import logfire
+from sources import get_local_source, research
+from shaping import shape_and_measure
+
+# Limits for get_research_many, overridable from the environment
+MULTI_CONCURRENCY = int(os.getenv("RESEARCH_MULTI_CONCURRENCY", "4"))
+MULTI_DEADLINE = float(os.getenv("RESEARCH_MULTI_DEADLINE", "10"))
+MULTI_MAX_TOPICS = int(os.getenv("RESEARCH_MULTI_MAX_TOPICS", "8"))
+
+
+def offline_fallback(topic: str) -> str:
+    logfire.info("Using offline fallback research", topic=topic)
+    return f"I couldn't find current information from external sources about '{topic}', but I can provide information from my knowledge base if you'd like me to explain this topic."
+
+
+async def research_topic(topic: str) -> str:
+    """Research one topic across all sources and return a compact result"""
+    # Weaker local matches come from the lookup the race already made
+    summary = await research(topic) or await get_local_source().weak_answer(topic)
+    if summary:
+        # Compact form keeps the model context (and later history) small
+        shaped, _ = shape_and_measure(topic, summary)
+        return shaped
+
+    # --- Offline fallback (always works) ---
+    return offline_fallback(topic)
+
 
 async def get_research(ctx: RunContext[Any], topic: str) -> str:
     """
     research tool.
-    Tries DuckDuckGo first. If not available, returns simple local results.
+    Queries all research sources (DuckDuckGo, local index, ...) concurrently.
+    If none has a good answer, returns weaker local results or a fallback message.
     """
 
     with logfire.span("tool.get_research", topic=topic):
         logfire.info("Research tool started", topic=topic)
+        return await research_topic(topic)
+
+
+async def get_research_many(ctx: RunContext[Any], topics: List[str]) -> Dict[str, str]:
+    """
+    research tool for several topics at once.
+    Researches every topic concurrently and returns the results keyed by topic.
+    """
+    # Keep order, drop duplicates, cap the fan-out
+    topics = list(dict.fromkeys(t.strip() for t in topics if t.strip()))[:MULTI_MAX_TOPICS]
 
-        try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                res = await client.get(
-                    "https://api.duckduckgo.com/",
-                    params={"q": topic, "format": "json", "no_redirect": "1"},
-                    headers={
-                        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                        "Accept": "application/json, text/plain, */*",
-                        "Accept-Language": "en-US,en;q=0.9",
-                        "Accept-Encoding": "gzip, deflate",
-                        "DNT": "1",
-                        "Connection": "keep-alive",
-                        "Upgrade-Insecure-Requests": "1"
-                    },
-                    timeout=30.0
-                )
-            data = res.json()
+    with logfire.span("tool.get_research_many", topics=topics):
+        logfire.info("Multi-topic research started", count=len(topics))
+        semaphore = asyncio.Semaphore(MULTI_CONCURRENCY)
 
-            # If the API returns useful info
-            if data.get("AbstractText") and data["AbstractText"].strip():
-                summary = data["AbstractText"]
-                logfire.info("Live research completed", summary_length=len(summary))
-                return f"Live research summary about '{topic}':\n{summary}"
-            
-            # Check for other possible data fields
-            elif data.get("Answer") and data["Answer"].strip():
-                summary = data["Answer"]
-                logfire.info("Live research completed", summary_length=len(summary))
-                return f"Live research summary about '{topic}':\n{summary}"
-            
-            # Try to get information from RelatedTopics
-            elif data.get("RelatedTopics") and len(data["RelatedTopics"]) > 0:
-                topics = []
-                for item in data["RelatedTopics"][:3]:  # Get first 3 topics
-                    if isinstance(item, dict) and item.get("Text"):
-                        topics.append(f"• {item['Text']}")
-                
-                if topics:
-                    summary = "\n".join(topics)
-                    logfire.info("Live research completed from RelatedTopics", summary_length=len(summary))
-                    return f"Live research about '{topic}':\n{summary}"
+        async def bounded(topic: str) -> str:
+            async with semaphore:
+                return await research_topic(topic)
 
-        except Exception as e:
-            logfire.warn("Live research failed", error=str(e), error_type=type(e).__name__)
+        tasks = {topic: asyncio.ensure_future(bounded(topic)) for topic in topics}
+        done, pending = await asyncio.wait(tasks.values(), timeout=MULTI_DEADLINE) if tasks else (set(), set())
+        for task in pending:
+            task.cancel()
+        if pending:
+            logfire.warn("Multi-topic research deadline reached", unfinished=len(pending))
 
-        # --- Offline fallback (always works) ---
-        logfire.info("Using offline fallback research", topic=topic)
-        return f"I couldn't find current information from external sources about '{topic}', but I can provide information from my knowledge base if you'd like me to explain this topic."
+        results = {}
+        for topic, task in tasks.items():
+            if task in done and not task.cancelled() and task.exception() is None:
+                results[topic] = task.result()
+            else:
+                results[topic] = offline_fallback(topic)
+        return results
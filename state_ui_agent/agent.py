@@ -1,12 +1,17 @@
 # agent.py - Ecommerce State Management
-from pydantic import BaseModel
-from typing import List, Dict, Optional
+import os
+from pydantic import BaseModel, BeforeValidator, ConfigDict, Field, PlainSerializer
+from typing import Annotated, Iterable, Iterator, List, Dict, Optional
+from catalog import Product
+from catalog_reload import CatalogReloader, CatalogSnapshot
+from product_search import tokenize, top_k
+from typeahead import TypeaheadRefresher, query_log
 
-class Product(BaseModel):
-    id: str
-    title: str
-    price: int
-    image: str
+# Search settings, overridable from the environment
+SEARCH_MODE = os.getenv("SHOP_SEARCH_MODE", "and")
+SEARCH_LIMIT = int(os.getenv("SHOP_SEARCH_LIMIT", "100"))
+# Products shown on the home page (and given to the AI assistant as context)
+PAGE_SIZE = int(os.getenv("SHOP_PAGE_SIZE", "100"))
 
 class CartItem(BaseModel):
     id: str
@@ -14,110 +19,228 @@ class CartItem(BaseModel):
     price: int
     qty: int
 
+class Cart:
+    """
+    Cart lines keyed by product ID (in the order first added), with the item
+    count and subtotal kept up to date on every change and a version number
+    bumped each time. Iterating yields CartItems.
+    """
+
+    __slots__ = ("_items", "count", "subtotal", "version")
+
+    def __init__(self, items: Iterable[CartItem] = (), version: int = 0):
+        self._items: Dict[str, CartItem] = {}
+        self.count = 0
+        self.subtotal = 0
+        self.version = version
+        for item in items:
+            self._items[item.id] = item
+            self.count += item.qty
+            self.subtotal += item.price * item.qty
+
+    def __iter__(self) -> Iterator[CartItem]:
+        return iter(self._items.values())
+
+    def __len__(self):
+        return len(self._items)
+
+    def __bool__(self):
+        return bool(self._items)
+
+    def __contains__(self, pid: str):
+        return pid in self._items
+
+    def get(self, pid: str) -> Optional[CartItem]:
+        return self._items.get(pid)
+
+    def quantity(self, pid: str) -> int:
+        item = self._items.get(pid)
+        return item.qty if item else 0
+
+    def add(self, pid: str, title: str, price: int):
+        item = self._items.get(pid)
+        if item:
+            item.qty += 1
+        else:
+            item = self._items[pid] = CartItem(id=pid, title=title, price=price, qty=1)
+        self.count += 1
+        self.subtotal += item.price
+        self.version += 1
+
+    def remove_one(self, pid: str):
+        item = self._items.get(pid)
+        if not item:
+            return
+        item.qty -= 1
+        if item.qty <= 0:
+            del self._items[pid]
+        self.count -= 1
+        self.subtotal -= item.price
+        self.version += 1
+
+    def remove_all(self, pid: str):
+        item = self._items.pop(pid, None)
+        if not item:
+            return
+        self.count -= item.qty
+        self.subtotal -= item.price * item.qty
+        self.version += 1
+
+    def clear(self):
+        self._items.clear()
+        self.count = 0
+        self.subtotal = 0
+        self.version += 1
+
+
+def _to_cart(value):
+    if isinstance(value, Cart):
+        return value
+    version = 0
+    if isinstance(value, dict):
+        version, value = value.get("version", 0), value.get("items", [])
+    return Cart((item if isinstance(item, CartItem) else CartItem.model_validate(item) for item in value), version)
+
+
+def _from_cart(cart: Cart) -> Dict:
+    return {"version": cart.version, "items": [item.model_dump() for item in cart]}
+
+
+# Serialized as {"version": ..., "items": [CartItem, ...]}; a bare list of items is also accepted
+CartField = Annotated[Cart, BeforeValidator(_to_cart), PlainSerializer(_from_cart, return_type=Dict)]
+
+
+class SearchResult(BaseModel):
+    products: List[Product]
+    # Matches after all filters (products holds at most one page of them)
+    total: int
+    # Matches per category with every filter but the category applied
+    category_counts: Dict[str, int]
+    # The query (typos corrected) when every one of its words matched, else "";
+    # only these are logged for typeahead suggestions
+    matched_query: str = ""
+
+
 class UIState(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     current_page: str = "home"
     last_search: str = ""
-    cart: List[CartItem] = []
+    # Typo corrections applied to the last search, e.g. "labtop → laptop"
+    search_correction: str = ""
+    cart: CartField = Field(default_factory=Cart)
 
     def snapshot(self):
         return {
             "current_page": self.current_page,
             "last_search": self.last_search or "None",
-            "cart_count": sum(item.qty for item in self.cart),
+            "cart_count": self.cart.count,
             "cart_items": [item.dict() for item in self.cart],
         }
 
-# Enhanced product catalog
-PRODUCT_CATALOG = [
-    # Laptops
-    Product(id="laptop-1", title="Basic Laptop", price=45000, image="https://via.placeholder.com/200x150/4CAF50/white?text=Basic+Laptop"),
-    Product(id="laptop-2", title="Gaming Laptop", price=75000, image="https://via.placeholder.com/200x150/FF5722/white?text=Gaming+Laptop"),
-    Product(id="laptop-3", title="Pro Laptop", price=95000, image="https://via.placeholder.com/200x150/2196F3/white?text=Pro+Laptop"),
-    
-    # Phones
-    Product(id="phone-1", title="Basic Phone", price=15000, image="https://via.placeholder.com/200x150/9C27B0/white?text=Basic+Phone"),
-    Product(id="phone-2", title="Pro Phone", price=35000, image="https://via.placeholder.com/200x150/E91E63/white?text=Pro+Phone"),
-    Product(id="phone-3", title="Flagship Phone", price=55000, image="https://via.placeholder.com/200x150/3F51B5/white?text=Flagship+Phone"),
-    
-    # Headphones
-    Product(id="headphone-1", title="Wired Headphones", price=2000, image="https://via.placeholder.com/200x150/795548/white?text=Wired"),
-    Product(id="headphone-2", title="Wireless Headphones", price=5000, image="https://via.placeholder.com/200x150/607D8B/white?text=Wireless"),
-    Product(id="headphone-3", title="Premium Headphones", price=8000, image="https://via.placeholder.com/200x150/009688/white?text=Premium"),
-    
-    # Tablets  
-    Product(id="tablet-1", title="Basic Tablet", price=25000, image="https://via.placeholder.com/200x150/FF9800/white?text=Basic+Tablet"),
-    Product(id="tablet-2", title="Pro Tablet", price=45000, image="https://via.placeholder.com/200x150/F44336/white?text=Pro+Tablet"),
-    
-    # Accessories
-    Product(id="accessory-1", title="Wireless Mouse", price=1500, image="https://via.placeholder.com/200x150/8BC34A/white?text=Mouse"),
-    Product(id="accessory-2", title="Keyboard", price=3000, image="https://via.placeholder.com/200x150/CDDC39/black?text=Keyboard"),
-    Product(id="accessory-3", title="Webcam", price=4000, image="https://via.placeholder.com/200x150/FFC107/black?text=Webcam"),
-]
+# Product catalog (from SHOP_CATALOG_PATH) and its search index, swapped as a whole on reload
+catalog_reloader = CatalogReloader()
 
-def get_all_products() -> List[Product]:
-    """Get all available products"""
-    return PRODUCT_CATALOG
+def catalog_snapshot() -> CatalogSnapshot:
+    """The current catalog snapshot; take it once and use it for the whole request"""
+    return catalog_reloader.snapshot
 
-def do_search(state: UIState, query: str) -> List[Product]:
-    """Search products by query"""
+def _catalog_titles():
+    snapshot = catalog_snapshot()
+    return snapshot.version, (title for _, title in snapshot.catalog.search_docs())
+
+# Typeahead trie, rebuilt in the background on catalog reloads and as popular queries change
+typeahead_refresher = TypeaheadRefresher(_catalog_titles, query_log)
+
+def get_all_products(limit: Optional[int] = PAGE_SIZE) -> List[Product]:
+    """Get available products (the first `limit`, or all when limit is None)"""
+    catalog = catalog_snapshot().catalog
+    count = len(catalog) if limit is None else min(limit, len(catalog))
+    return catalog.products(range(count))
+
+def get_product(pid: str) -> Optional[Product]:
+    """Look up one product by ID"""
+    return catalog_snapshot().catalog.get(pid)
+
+def search_products(state: UIState, query: str, category: Optional[str] = None,
+                    min_price: Optional[int] = None, max_price: Optional[int] = None) -> SearchResult:
+    """
+    Search and/or filter products by category and price range, best matches
+    first (misspelled words are corrected). Category counts come back with
+    the results.
+    """
     state.current_page = "search_results"
     state.last_search = query or ""
+    state.search_correction = ""
+    
+    snapshot = catalog_snapshot()
+    facets = snapshot.facets
     
     if not query:
-        return PRODUCT_CATALOG
+        # Browsing: the filters alone pick the products, in catalog order
+        in_price = facets.price_bitmap(min_price, max_price)
+        selected = in_price & facets.category_bitmap(category)
+        rows = facets.first_rows(selected, PAGE_SIZE)
+        return SearchResult(products=snapshot.catalog.products(rows), total=selected.bit_count(),
+                            category_counts=facets.category_counts(in_price))
     
-    query_lower = query.lower()
-    filtered_products = []
+    corrected, corrections = snapshot.search.correct(query)
+    if corrections:
+        state.search_correction = ", ".join(f"{typo} → {word}" for typo, word in corrections.items())
     
-    for product in PRODUCT_CATALOG:
-        if (query_lower in product.title.lower() or 
-            query_lower in product.id.lower() or
-            any(keyword in product.title.lower() for keyword in query_lower.split())):
-            filtered_products.append(product)
+    docs, scores = snapshot.search.matches(corrected, mode=SEARCH_MODE)
+    every_word = bool(docs) and (SEARCH_MODE == "and" or all(map(snapshot.search.expand, tokenize(corrected))))
+    if not docs and SEARCH_MODE == "and":
+        # No product has every word: fall back to any-word matches
+        docs, scores = snapshot.search.matches(corrected, mode="or")
     
-    return filtered_products if filtered_products else PRODUCT_CATALOG
+    docs, scores = facets.filter_price(docs, scores, min_price, max_price)
+    counts = facets.doc_category_counts(docs)
+    docs, scores = facets.filter_category(docs, scores, category)
+    
+    hits = top_k(docs, scores, SEARCH_LIMIT)
+    return SearchResult(products=snapshot.catalog.products(doc for doc, _ in hits), total=len(docs), category_counts=counts,
+                        matched_query=(corrected if corrections else query) if every_word else "")
+
+def suggest(prefix: str) -> List[str]:
+    """Autocomplete phrases for a partly typed search"""
+    return typeahead_refresher.typeahead.suggest(prefix)
+
+def do_search(state: UIState, query: str) -> List[Product]:
+    """Search products by query, best matches first (misspelled words are corrected)"""
+    return search_products(state, query).products
 
 def find_cart_item(state: UIState, pid: str) -> Optional[CartItem]:
     """Find item in cart by product ID"""
-    for item in state.cart:
-        if item.id == pid:
-            return item
-    return None
+    return state.cart.get(pid)
 
 def add_to_cart(state: UIState, product: Dict):
     """Add product to cart or increment quantity if exists"""
-    existing = find_cart_item(state, product["id"])
-    if existing:
-        existing.qty += 1
-    else:
-        state.cart.append(CartItem(
-            id=product["id"], 
-            title=product["title"], 
-            price=int(product["price"]), 
-            qty=1
-        ))
+    state.cart.add(product["id"], product["title"], int(product["price"]))
 
 def remove_from_cart(state: UIState, pid: str):
     """Remove one item or decrease quantity"""
-    existing = find_cart_item(state, pid)
-    if not existing:
-        return
-    
-    existing.qty -= 1
-    if existing.qty <= 0:
-        state.cart = [item for item in state.cart if item.id != pid]
+    state.cart.remove_one(pid)
 
 def remove_all_from_cart(state: UIState, pid: str):
     """Remove all items of this type from cart"""
-    state.cart = [item for item in state.cart if item.id != pid]
+    state.cart.remove_all(pid)
+
+def clear_cart(state: UIState):
+    """Empty the cart"""
+    state.cart.clear()
+
+def cart_count(state: UIState) -> int:
+    """Number of items in the cart"""
+    return state.cart.count
 
 def cart_subtotal(state: UIState) -> int:
     """Calculate total cart value"""
-    return sum(item.price * item.qty for item in state.cart)
+    return state.cart.subtotal
 
 def checkout(state: UIState) -> int:
     """Process checkout and clear cart"""
     total = cart_subtotal(state)
-    state.cart = []
+    state.cart.clear()
     state.current_page = "checkout_success"
-    return total
\ No newline at end of file
+    return total
@@ -0,0 +1,111 @@
+# bench_catalog.py
+"""
+Catalog load-time and memory benchmark.
+
+Writes a synthetic catalog as CSV, JSONL and SQLite, then loads each file
+into the columnar Catalog in a fresh process and reports load time, resident
+memory added, bytes held by the columns, and id-lookup latency. A list of
+pydantic Product objects (the old representation) is measured for reference.
+
+Usage: python bench_catalog.py [--size 1000000]
+"""
+import argparse
+import csv
+import gc
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+
+def write_files(size: int, directory: str) -> dict:
+    from bench_search import synthetic_catalog
+
+    rows = [(pid, title, price, f"https://via.placeholder.com/200x150?text={pid.split('-')[0]}")
+            for pid, title, price in synthetic_catalog(size)]
+    paths = {fmt: os.path.join(directory, f"products.{fmt}") for fmt in ("csv", "jsonl", "sqlite")}
+    with open(paths["csv"], "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "title", "price", "image"])
+        writer.writerows(rows)
+    with open(paths["jsonl"], "w", encoding="utf-8") as f:
+        for pid, title, price, image in rows:
+            f.write(json.dumps({"id": pid, "title": title, "price": price, "image": image}) + "\n")
+    conn = sqlite3.connect(paths["sqlite"])
+    conn.execute("CREATE TABLE products (id TEXT PRIMARY KEY, title TEXT, price INTEGER, image TEXT)")
+    conn.executemany("INSERT INTO products VALUES (?, ?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+    return paths
+
+
+def child(kind: str, path: str):
+    """Runs in a fresh process; prints one JSON line of measurements"""
+    from catalog import Catalog, Product, read_rows
+
+    gc.collect()
+    before = rss_mb()
+    started = time.perf_counter()
+    if kind == "pydantic":
+        catalog = [Product(id=pid, title=title, price=price, image=image) for pid, title, price, image in read_rows(path)]
+        by_id = {p.id: p for p in catalog}
+        lookup = by_id.get
+        nbytes = None
+    else:
+        catalog = Catalog(read_rows(path))
+        lookup = catalog.get
+        nbytes = catalog.nbytes()
+    load_s = time.perf_counter() - started
+    gc.collect()
+    added = rss_mb() - before
+
+    probes = [f"laptop-{i}" for i in range(1, len(catalog), max(1, len(catalog) // 10000))]
+    started = time.perf_counter()
+    for pid in probes:
+        lookup(pid)
+    lookup_us = (time.perf_counter() - started) / len(probes) * 1e6
+    print(json.dumps({"load_s": load_s, "rss_mb": added, "columns_mb": nbytes / 1e6 if nbytes else None, "lookup_us": lookup_us}))
+
+
+def measure(kind: str, path: str) -> dict:
+    out = subprocess.run([sys.executable, __file__, "--child", kind, path], cwd=HERE,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument("--child", nargs=2, metavar=("KIND", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(*args.child)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        paths = write_files(args.size, tmp)
+        print(f"wrote {args.size:,} products in {time.perf_counter() - started:.1f}s")
+        print(f"{'source':>18} {'load_s':>8} {'rss_mb':>8} {'columns_mb':>11} {'lookup_us':>10}")
+        runs = [(f"columnar/{fmt}", fmt, path) for fmt, path in paths.items()] + [("pydantic/jsonl", "pydantic", paths["jsonl"])]
+        for label, kind, path in runs:
+            m = measure("columnar" if kind != "pydantic" else kind, path)
+            columns = f"{m['columns_mb']:.1f}" if m["columns_mb"] else "-"
+            print(f"{label:>18} {m['load_s']:>8.2f} {m['rss_mb']:>8.1f} {columns:>11} {m['lookup_us']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
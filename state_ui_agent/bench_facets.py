@@ -0,0 +1,81 @@
+# bench_facets.py
+"""
+Faceted filtering benchmark on synthetic catalogs.
+
+For each catalog size, reports the facet index build time and p50/p99
+latency for: browsing by category + price range (bitmap intersection,
+first page and category counts), and a search query combined with the
+same filters (per-match column tests, including category counts over all
+matches), plus the memory held by the price chunk bitmaps.
+
+Usage: python bench_facets.py [--sizes 1000000 2000000] [--queries 100]
+"""
+import argparse
+import random
+import sys
+import time
+from bench_search import CATEGORIES, percentile, sample_queries, synthetic_catalog
+from catalog import Catalog
+from facets import FacetIndex
+from product_search import ProductIndex, top_k
+
+
+def random_filters(rng: random.Random) -> dict:
+    low = rng.randrange(0, 100000, 5000)
+    return {
+        "category": rng.choice([None, *CATEGORIES]),
+        "min_price": low if rng.random() < 0.7 else None,
+        "max_price": low + rng.randrange(5000, 60000, 5000) if rng.random() < 0.7 else None,
+    }
+
+
+def browse(facets: FacetIndex, filters: dict, page: int = 100):
+    in_price = facets.price_bitmap(filters["min_price"], filters["max_price"])
+    selected = in_price & facets.category_bitmap(filters["category"])
+    return facets.first_rows(selected, page), selected.bit_count(), facets.category_counts(in_price)
+
+
+def search(index: ProductIndex, facets: FacetIndex, query: str, filters: dict, limit: int = 100):
+    docs, scores = index.matches(query)
+    docs, scores = facets.filter_price(docs, scores, filters["min_price"], filters["max_price"])
+    counts = facets.doc_category_counts(docs)
+    docs, scores = facets.filter_category(docs, scores, filters["category"])
+    return top_k(docs, scores, limit), len(docs), counts
+
+
+def timed(fn, cases) -> list:
+    timings = []
+    for case in cases:
+        started = time.perf_counter()
+        fn(*case)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000, 2_000_000])
+    parser.add_argument("--queries", type=int, default=100)
+    args = parser.parse_args()
+    rng = random.Random(3)
+    filters = [random_filters(rng) for _ in range(args.queries)]
+    queries = sample_queries(args.queries)
+
+    print(f"{'products':>9} {'build_s':>8} {'browse_p50':>11} {'browse_p99':>11} {'search_p50':>11} {'search_p99':>11} {'chunks_mb':>10}")
+    for n in args.sizes:
+        catalog = Catalog((pid, title, price, "") for pid, title, price in synthetic_catalog(n))
+        started = time.perf_counter()
+        facets = FacetIndex(catalog)
+        build_s = time.perf_counter() - started
+        index = ProductIndex(catalog.search_docs(), catalog.row_of)
+
+        browse_ms = timed(lambda f: browse(facets, f), [(f,) for f in filters])
+        search_ms = timed(lambda q, f: search(index, facets, q, f), list(zip(queries, filters)))
+        chunks_mb = sum(sys.getsizeof(chunk) for chunk in facets.price_chunks) / 1e6
+        print(f"{n:>9} {build_s:>8.2f} {percentile(browse_ms, 50):>11.2f} {percentile(browse_ms, 99):>11.2f} "
+              f"{percentile(search_ms, 50):>11.2f} {percentile(search_ms, 99):>11.2f} {chunks_mb:>10.1f}")
+        del catalog, facets, index
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# bench_search.py
+"""
+Product search benchmark on synthetic catalogs.
+
+For each catalog size, reports index build time, memory held by the index,
+query latency (p50/p99) for AND and OR queries, and latency plus accuracy
+of typo correction on misspelled queries. The old linear scan is
+timed as a reference at sizes up to --linear-max.
+
+Usage: python bench_search.py [--sizes 10000 100000 1000000] [--queries 200]
+"""
+import argparse
+import gc
+import random
+import statistics
+import sys
+import time
+from typing import Iterator, List, Tuple
+from product_search import ProductIndex, tokenize
+
+CATEGORIES = {
+    "laptop": ["Laptop", "Notebook", "Ultrabook", "Chromebook"],
+    "phone": ["Phone", "Smartphone", "Mobile"],
+    "headphone": ["Headphones", "Earbuds", "Headset"],
+    "tablet": ["Tablet", "E-Reader"],
+    "accessory": ["Mouse", "Keyboard", "Webcam", "Charger", "Cable", "Stand"],
+}
+BRANDS = ["Acme", "Nova", "Zenith", "Orbit", "Pixel", "Quantum", "Vertex", "Lumen", "Apex", "Nimbus",
+          "Stellar", "Helix", "Cobalt", "Summit", "Echo", "Fusion", "Titan", "Aero", "Ion", "Prism"]
+ADJECTIVES = ["Basic", "Pro", "Gaming", "Wireless", "Premium", "Slim", "Ultra", "Mini", "Max", "Lite",
+              "Flagship", "Budget", "Compact", "Rugged", "Smart", "Classic", "Studio", "Sport", "Air", "Plus"]
+COLORS = ["Black", "Silver", "Blue", "Red", "White", "Graphite", "Gold", "Green"]
+
+
+def synthetic_catalog(n: int, seed: int = 42) -> Iterator[Tuple[str, str, int]]:
+    """Yield (id, title, price) for n realistic-looking products"""
+    rng = random.Random(seed)
+    categories = list(CATEGORIES)
+    for i in range(n):
+        category = categories[i % len(categories)]
+        title = f"{rng.choice(BRANDS)} {rng.choice(ADJECTIVES)} {rng.choice(CATEGORIES[category])} {rng.randint(1, 99)} {rng.choice(COLORS)}"
+        yield f"{category}-{i + 1}", title, rng.randrange(500, 150000, 100)
+
+
+def sample_queries(count: int, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        category = rng.choice(list(CATEGORIES))
+        words = [rng.choice(CATEGORIES[category])]
+        if rng.random() < 0.7:
+            words.insert(0, rng.choice(ADJECTIVES))
+        if rng.random() < 0.4:
+            words.insert(0, rng.choice(BRANDS))
+        queries.append(" ".join(words).lower())
+    return queries
+
+
+def misspell(query: str, rng: random.Random) -> str:
+    """One random typo (drop, swap, replace or insert) in the query's longest word"""
+    words = query.split()
+    i = max(range(len(words)), key=lambda k: len(words[k]))
+    word, at = words[i], rng.randrange(1, len(words[i]) - 1)
+    kind = rng.choice(["drop", "swap", "replace", "insert"])
+    if kind == "drop":
+        word = word[:at] + word[at + 1:]
+    elif kind == "swap":
+        word = word[:at] + word[at + 1] + word[at] + word[at + 2:]
+    else:
+        letter = rng.choice("abcdefghijklmnopqrstuvwxyz")
+        word = word[:at] + letter + word[at + (kind == "replace"):]
+    words[i] = word
+    return " ".join(words)
+
+
+def linear_search(docs: List[Tuple[str, str]], query: str) -> List[int]:
+    # The original do_search loop, for reference
+    query_lower = query.lower()
+    return [i for i, (pid, title) in enumerate(docs)
+            if query_lower in title.lower() or query_lower in pid.lower()
+            or any(keyword in title.lower() for keyword in query_lower.split())]
+
+
+def index_size(index: ProductIndex) -> int:
+    """Bytes held by the index structures (postings arrays, dict and vocabulary)"""
+    size = sys.getsizeof(index.postings) + sys.getsizeof(index.vocabulary)
+    for term, (docs, weights) in index.postings.items():
+        size += sys.getsizeof(term) + sys.getsizeof(docs) + sys.getsizeof(weights)
+    return size
+
+
+def percentile(values: List[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def time_queries(fn, queries: List[str]) -> List[float]:
+    timings = []
+    for q in queries:
+        started = time.perf_counter()
+        fn(q)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--linear-max", type=int, default=100_000)
+    args = parser.parse_args()
+    queries = sample_queries(args.queries)
+    rng = random.Random(11)
+    typos = [(misspell(q, rng), q) for q in queries]
+
+    print(f"{'products':>9} {'build_s':>8} {'index_mb':>9} {'and_p50':>8} {'and_p99':>8} {'or_p50':>8} {'or_p99':>8} {'fuzzy_p50':>9} {'fuzzy_p99':>9} {'fixed':>6} {'linear_p50':>11}")
+    for n in args.sizes:
+        docs = [(pid, title) for pid, title, _ in synthetic_catalog(n)]
+        gc.collect()
+        started = time.perf_counter()
+        index = ProductIndex(docs)
+        build_s = time.perf_counter() - started
+        index_mb = index_size(index) / 1e6
+
+        and_ms = time_queries(lambda q: index.search(q, "and", args.limit), queries)
+        or_ms = time_queries(lambda q: index.search(q, "or", args.limit), queries)
+        fuzzy_ms = time_queries(lambda q: index.search(index.correct(q)[0], "and", args.limit), [t for t, _ in typos])
+        expected = [" ".join(tokenize(q)) for _, q in typos]
+        fixed = sum(index.correct(t)[0] == e for (t, _), e in zip(typos, expected)) / len(typos)
+        linear = "-"
+        if n <= args.linear_max:
+            linear = f"{statistics.median(time_queries(lambda q: linear_search(docs, q), queries[:20])):.2f}"
+        print(f"{n:>9} {build_s:>8.2f} {index_mb:>9.1f} {percentile(and_ms, 50):>8.2f} {percentile(and_ms, 99):>8.2f} "
+              f"{percentile(or_ms, 50):>8.2f} {percentile(or_ms, 99):>8.2f} "
+              f"{percentile(fuzzy_ms, 50):>9.2f} {percentile(fuzzy_ms, 99):>9.2f} {fixed:>6.0%} {linear:>11}")
+        del index, docs
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# bench_typeahead.py
+"""
+Typeahead benchmark on synthetic catalogs.
+
+For each catalog size, builds the prefix trie over product titles (plus a
+set of logged queries) and reports build time, trie node count, p50/p99
+latency of a lookup for prefixes of 1-12 characters (including the JSON
+encoding the /suggest endpoint does), and the mean response payload size.
+
+Usage: python bench_typeahead.py [--sizes 100000 1000000] [--prefixes 10000]
+"""
+import argparse
+import json
+import random
+import time
+from bench_search import percentile, sample_queries, synthetic_catalog
+from typeahead import Typeahead
+
+
+def sample_prefixes(titles: list, n: int, rng: random.Random) -> list:
+    """Prefixes of title words and phrases, as a user would type them"""
+    prefixes = []
+    for _ in range(n):
+        words = rng.choice(titles).lower().split()
+        text = " ".join(words[rng.randrange(len(words)):])
+        prefixes.append(text[:rng.randint(1, min(12, len(text)))])
+    return prefixes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--prefixes", type=int, default=10_000)
+    args = parser.parse_args()
+    rng = random.Random(5)
+    queries = {q: rng.randint(1, 50) for q in sample_queries(1000)}
+
+    print(f"{'products':>9} {'build_s':>8} {'nodes':>10} {'p50_us':>8} {'p99_us':>8} {'payload_b':>10}")
+    for n in args.sizes:
+        titles = [title for _, title, _ in synthetic_catalog(n)]
+        started = time.perf_counter()
+        typeahead = Typeahead(titles, queries)
+        build_s = time.perf_counter() - started
+
+        timings, payload = [], 0
+        for prefix in sample_prefixes(titles, args.prefixes, rng):
+            started = time.perf_counter()
+            body = json.dumps(typeahead.suggest(prefix), ensure_ascii=False, separators=(",", ":"))
+            timings.append((time.perf_counter() - started) * 1e6)
+            payload += len(body.encode())
+        print(f"{n:>9} {build_s:>8.2f} {typeahead.nodes:>10,} {percentile(timings, 50):>8.1f} "
+              f"{percentile(timings, 99):>8.1f} {payload / len(timings):>10.0f}")
+        del titles, typeahead
+
+
+if __name__ == "__main__":
+    main()
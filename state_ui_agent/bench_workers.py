@@ -0,0 +1,136 @@
+# bench_workers.py
+"""
+Throughput benchmark for the shop with several worker processes.
+
+For each worker count, starts `uvicorn main:app --workers N` with the chosen
+state backend, drives it with concurrent shoppers (add to cart + view cart),
+and reports requests per second. A contention check then sends concurrent
+adds for one shared cart and verifies that none were lost.
+
+Usage: python bench_workers.py [--backend sqlite] [--workers 1 2 4 8] [--seconds 10]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import httpx
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PRODUCT = {"id": "laptop-1", "title": "Basic Laptop", "price": "45000"}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(workers: int, backend: str, db_path: str, port: int) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        SHOP_STATE_BACKEND=backend,
+        SHOP_STATE_DB=db_path,
+        SHOP_SESSION_SECRET="bench-secret",
+        GOOGLE_API_KEY=os.getenv("GOOGLE_API_KEY", "bench"),
+        LOGFIRE_IGNORE_NO_CONFIG="1",
+    )
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--workers", str(workers),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=HERE, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/cart", timeout=1).status_code == 200:
+                return proc
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("server did not start")
+
+
+async def _shopper(base: str, stop_at: float, counts: list):
+    # Each shopper is its own visitor (own session cookie)
+    async with httpx.AsyncClient(base_url=base, timeout=30) as client:
+        while time.monotonic() < stop_at:
+            r = await client.post("/add", data=PRODUCT)
+            counts[0 if r.status_code < 400 else 1] += 1
+            r = await client.get("/cart")
+            counts[0 if r.status_code < 400 else 1] += 1
+
+
+def _load_process(base: str, shoppers: int, seconds: float, results):
+    async def run():
+        counts = [0, 0]
+        stop_at = time.monotonic() + seconds
+        await asyncio.gather(*(_shopper(base, stop_at, counts) for _ in range(shoppers)))
+        return counts
+
+    results.put(asyncio.run(run()))
+
+
+def drive(base: str, seconds: float, procs: int, shoppers: int):
+    results = multiprocessing.Queue()
+    started = time.perf_counter()
+    workers = [multiprocessing.Process(target=_load_process, args=(base, shoppers, seconds, results)) for _ in range(procs)]
+    for w in workers:
+        w.start()
+    counts = [results.get() for _ in workers]
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - started
+    ok, errors = sum(c[0] for c in counts), sum(c[1] for c in counts)
+    return ok / elapsed, errors
+
+
+async def contention_check(base: str, adds: int) -> tuple:
+    """Concurrent adds to one shared cart; returns (expected, actual) quantity"""
+    async with httpx.AsyncClient(base_url=base, timeout=30) as client:
+        await client.get("/")
+        cookies = dict(client.cookies)
+    clients = [httpx.AsyncClient(base_url=base, timeout=30, cookies=cookies) for _ in range(16)]
+    try:
+        await asyncio.gather(*(clients[i % len(clients)].post("/add", data=PRODUCT) for i in range(adds)))
+        page = (await clients[0].get("/")).text
+    finally:
+        await asyncio.gather(*(c.aclose() for c in clients))
+    match = re.search(r"Cart \((\d+)\)", page)
+    return adds, int(match.group(1)) if match else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", default="sqlite", choices=["sqlite", "memory"])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--load-procs", type=int, default=4, help="load generator processes")
+    parser.add_argument("--shoppers", type=int, default=16, help="concurrent shoppers per load process")
+    parser.add_argument("--adds", type=int, default=200, help="adds in the shared-cart contention check")
+    args = parser.parse_args()
+
+    print(f"backend: {args.backend}  load: {args.load_procs}x{args.shoppers} shoppers  {args.seconds:.0f}s per run")
+    print(f"{'workers':>7} {'req/s':>10} {'errors':>7} {'shared cart':>14}")
+    for n in args.workers:
+        with tempfile.TemporaryDirectory() as tmp:
+            port = free_port()
+            proc = start_server(n, args.backend, os.path.join(tmp, "state.sqlite3"), port)
+            base = f"http://127.0.0.1:{port}"
+            try:
+                rps, errors = drive(base, args.seconds, args.load_procs, args.shoppers)
+                expected, actual = asyncio.run(contention_check(base, args.adds))
+            finally:
+                proc.terminate()
+                proc.wait(timeout=30)
+        print(f"{n:>7} {rps:>10.1f} {errors:>7} {actual:>6}/{expected:<7}")
+
+
+if __name__ == "__main__":
+    main()
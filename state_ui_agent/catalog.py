@@ -0,0 +1,158 @@
+# catalog.py - Columnar product catalog loaded from a data file
+import array
+import csv
+import json
+import os
+import sqlite3
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from pydantic import BaseModel
+
+CATALOG_PATH = os.getenv("SHOP_CATALOG_PATH", os.path.join(os.path.dirname(__file__), "products.jsonl"))
+
+
+class Product(BaseModel):
+    id: str
+    title: str
+    price: int
+    image: str
+
+
+class StringPool:
+    """
+    Deduplicated strings stored back to back in one UTF-8 buffer. Columns
+    hold small integer references instead of one Python str per cell.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._offsets = array.array("q", [0])
+        self._refs: Optional[Dict[str, int]] = {}
+
+    def add(self, value: str) -> int:
+        ref = self._refs.get(value)
+        if ref is None:
+            ref = len(self._offsets) - 1
+            self._buffer += value.encode("utf-8")
+            self._offsets.append(len(self._buffer))
+            self._refs[value] = ref
+        return ref
+
+    def freeze(self):
+        """Drop the dedupe map once loading is done"""
+        self._refs = None
+        self._buffer = bytes(self._buffer)
+
+    def __getitem__(self, ref: int) -> str:
+        return self._buffer[self._offsets[ref]:self._offsets[ref + 1]].decode("utf-8")
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def nbytes(self) -> int:
+        return len(self._buffer) + self._offsets.itemsize * len(self._offsets)
+
+
+class Catalog:
+    """
+    Array-backed product catalog: one typed array per column, strings in a
+    shared pool. Rows are catalog positions; `Product` objects are only built
+    when a caller asks for them.
+    """
+
+    def __init__(self, rows: Iterable[Tuple[str, str, int, str]]):
+        self.strings = StringPool()
+        self.ids = array.array("i")
+        self.titles = array.array("i")
+        self.images = array.array("i")
+        self.prices = array.array("i")
+        for pid, title, price, image in rows:
+            self.ids.append(self.strings.add(pid))
+            self.titles.append(self.strings.add(title))
+            self.images.append(self.strings.add(image or ""))
+            self.prices.append(int(price))
+        self.strings.freeze()
+        # id lookup: row numbers sorted by the hash of their id
+        hashes = [hash(self.strings[ref]) for ref in self.ids]
+        order = sorted(range(len(hashes)), key=hashes.__getitem__)
+        self._id_hashes = array.array("q", (hashes[row] for row in order))
+        self._id_rows = array.array("i", order)
+
+    def __len__(self):
+        return len(self.prices)
+
+    def id(self, row: int) -> str:
+        return self.strings[self.ids[row]]
+
+    def title(self, row: int) -> str:
+        return self.strings[self.titles[row]]
+
+    def row_of(self, pid: str) -> Optional[int]:
+        h = hash(pid)
+        at = bisect_left(self._id_hashes, h)
+        while at < len(self._id_hashes) and self._id_hashes[at] == h:
+            row = self._id_rows[at]
+            if self.id(row) == pid:
+                return row
+            at += 1
+        return None
+
+    def product(self, row: int) -> Product:
+        return Product(id=self.id(row), title=self.title(row), price=self.prices[row],
+                       image=self.strings[self.images[row]])
+
+    def products(self, rows: Iterable[int]) -> List[Product]:
+        return [self.product(row) for row in rows]
+
+    def get(self, pid: str) -> Optional[Product]:
+        row = self.row_of(pid)
+        return None if row is None else self.product(row)
+
+    def search_docs(self) -> Iterator[Tuple[str, str]]:
+        """(id, title) per row, for building search indexes"""
+        for row in range(len(self)):
+            yield self.id(row), self.title(row)
+
+    def nbytes(self) -> int:
+        columns = (self.ids, self.titles, self.images, self.prices, self._id_hashes, self._id_rows)
+        return self.strings.nbytes() + sum(col.itemsize * len(col) for col in columns)
+
+
+# --- Loaders ---
+
+def _read_csv(path: str) -> Iterator[Tuple[str, str, int, str]]:
+    with open(path, newline="", encoding="utf-8") as f:
+        for record in csv.DictReader(f):
+            yield record["id"], record["title"], int(record["price"]), record.get("image", "")
+
+
+def _read_jsonl(path: str) -> Iterator[Tuple[str, str, int, str]]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                record = json.loads(line)
+                yield record["id"], record["title"], int(record["price"]), record.get("image", "")
+
+
+def _read_sqlite(path: str) -> Iterator[Tuple[str, str, int, str]]:
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        yield from conn.execute("SELECT id, title, price, COALESCE(image, '') FROM products ORDER BY rowid")
+    finally:
+        conn.close()
+
+
+def read_rows(path: str) -> Iterator[Tuple[str, str, int, str]]:
+    """(id, title, price, image) rows from a .csv, .jsonl or SQLite (.db/.sqlite) file"""
+    if path.endswith(".csv"):
+        return _read_csv(path)
+    if path.endswith(".jsonl"):
+        return _read_jsonl(path)
+    if path.endswith((".db", ".sqlite", ".sqlite3")):
+        return _read_sqlite(path)
+    raise ValueError(f"Unsupported catalog format: {path}")
+
+
+def load_catalog(path: str = CATALOG_PATH) -> Catalog:
+    return Catalog(read_rows(path))
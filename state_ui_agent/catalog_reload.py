@@ -0,0 +1,124 @@
+# catalog_reload.py - Catalog snapshots and background hot reload
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from catalog import CATALOG_PATH, Catalog, load_catalog
+from facets import FacetIndex
+from product_search import ProductIndex
+
+# Reload settings, overridable from the environment
+RELOAD_ENABLED = os.getenv("SHOP_CATALOG_RELOAD", "1") not in ("0", "false", "False")
+POLL_SECONDS = float(os.getenv("SHOP_CATALOG_POLL", "2"))
+
+
+class CatalogSnapshot:
+    """A catalog plus every index derived from it. Never modified once published"""
+
+    __slots__ = ("catalog", "search", "facets", "version", "built_at")
+
+    def __init__(self, catalog: Catalog, search: ProductIndex, facets: FacetIndex, version: int):
+        self.catalog = catalog
+        self.search = search
+        self.facets = facets
+        self.version = version
+        self.built_at = time.time()
+
+
+def build_snapshot(path: str, version: int) -> CatalogSnapshot:
+    catalog = load_catalog(path)
+    return CatalogSnapshot(catalog, ProductIndex(catalog.search_docs(), catalog.row_of), FacetIndex(catalog), version)
+
+
+def _signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class CatalogReloader:
+    """
+    Holds the current CatalogSnapshot. A background thread polls the catalog
+    file; when it changes (and has stopped changing for one poll), a new
+    snapshot is built off to the side and published by swapping a single
+    reference, so readers never wait on or observe a half-built index.
+    """
+
+    def __init__(self, path: str = CATALOG_PATH, interval: float = POLL_SECONDS):
+        self.path = path
+        self.interval = interval
+        self._signature = _signature(path)
+        self._pending: Optional[Tuple[int, int]] = None
+        started = time.perf_counter()
+        self._snapshot = build_snapshot(path, 1)
+        self.stats: Dict = {
+            "version": 1,
+            "products": len(self._snapshot.catalog),
+            "reloads": 0,
+            "rebuild_ms": round((time.perf_counter() - started) * 1000, 1),
+            "swap_us": 0.0,
+            "last_error": None,
+        }
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def snapshot(self) -> CatalogSnapshot:
+        # Callers should read this once per request and use that snapshot throughout
+        return self._snapshot
+
+    def check(self) -> bool:
+        """Reload if the file changed since the last build; returns True on a swap"""
+        signature = _signature(self.path)
+        if signature is None or signature == self._signature:
+            self._pending = None
+            return False
+        if signature != self._pending:
+            # Still being written (or just noticed): wait for it to settle
+            self._pending = signature
+            return False
+        return self.reload(signature)
+
+    def reload(self, signature: Optional[Tuple[int, int]] = None) -> bool:
+        signature = signature or _signature(self.path)
+        started = time.perf_counter()
+        try:
+            fresh = build_snapshot(self.path, self._snapshot.version + 1)
+        except Exception as e:
+            # Keep serving the old snapshot; retry once the file changes again
+            self._signature, self._pending = signature, None
+            self.stats["last_error"] = f"{type(e).__name__}: {e}"
+            return False
+        rebuild_ms = (time.perf_counter() - started) * 1000
+
+        swap_started = time.perf_counter()
+        self._snapshot = fresh
+        swap_us = (time.perf_counter() - swap_started) * 1e6
+
+        self._signature, self._pending = signature, None
+        self.stats.update(
+            version=fresh.version,
+            products=len(fresh.catalog),
+            reloads=self.stats["reloads"] + 1,
+            rebuild_ms=round(rebuild_ms, 1),
+            swap_us=round(swap_us, 2),
+            last_error=None,
+        )
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="catalog-reload", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
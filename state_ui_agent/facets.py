@@ -0,0 +1,140 @@
+# facets.py - Category bitmaps and sorted price index for filtered search
+import array
+import re
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from itertools import compress, repeat
+from operator import and_, eq, ge, le
+from typing import Dict, List, Optional, Tuple
+from catalog import Catalog
+
+# Pre-built price bitmaps: at most PRICE_CHUNKS of them (each one is a full-width
+# bitmap, so memory stays linear in the catalog), of at least PRICE_CHUNK_MIN rows.
+# A range query ORs whole chunks and only walks the two ends
+PRICE_CHUNKS = 64
+PRICE_CHUNK_MIN = 4096
+
+_NONZERO = re.compile(rb"[^\x00]")
+
+
+def category_of(pid: str) -> str:
+    """Category encoded in the product id prefix ("laptop-1" -> "laptop")"""
+    return pid.rsplit("-", 1)[0]
+
+
+class FacetIndex:
+    """
+    Filter structures built once per catalog snapshot. Bitmaps are Python
+    ints with bit `row` set, so intersections and counts run in C:
+      - one bitmap per category
+      - rows sorted by price (bisect for a range) plus a bitmap per chunk of
+        consecutive rows in price order
+    Search results are filtered per candidate against the price and category
+    columns instead, so their cost follows the match count, not the catalog.
+    """
+
+    def __init__(self, catalog: Catalog):
+        self.size = len(catalog)
+        self.nbytes = (self.size + 7) // 8
+        self.all_rows = (1 << self.size) - 1
+
+        self.categories: List[str] = []
+        refs: Dict[str, int] = {}
+        self.category_column = array.array("H")
+        category_bits: List[bytearray] = []
+        for row in range(self.size):
+            name = category_of(catalog.id(row))
+            ref = refs.get(name)
+            if ref is None:
+                ref = refs[name] = len(self.categories)
+                self.categories.append(name)
+                category_bits.append(bytearray(self.nbytes))
+            self.category_column.append(ref)
+            category_bits[ref][row >> 3] |= 1 << (row & 7)
+        self.category_bitmaps = {name: int.from_bytes(bits, "little") for name, bits in zip(self.categories, category_bits)}
+
+        self.prices = catalog.prices
+        self.price_order = array.array("i", sorted(range(self.size), key=self.prices.__getitem__))
+        self.sorted_prices = array.array("i", (self.prices[row] for row in self.price_order))
+        self.chunk = max(PRICE_CHUNK_MIN, -(-self.size // PRICE_CHUNKS))
+        self.price_chunks = [
+            self._bitmap(self.price_order[start:start + self.chunk]) for start in range(0, self.size, self.chunk)
+        ]
+
+    def _bitmap(self, rows) -> int:
+        bits = bytearray(self.nbytes)
+        for row in rows:
+            bits[row >> 3] |= 1 << (row & 7)
+        return int.from_bytes(bits, "little")
+
+    def price_bitmap(self, min_price: Optional[int] = None, max_price: Optional[int] = None) -> int:
+        """Rows priced within [min_price, max_price] (either bound optional)"""
+        lo = 0 if min_price is None else bisect_left(self.sorted_prices, min_price)
+        hi = self.size if max_price is None else bisect_right(self.sorted_prices, max_price)
+        if lo >= hi:
+            return 0
+        if lo == 0 and hi == self.size:
+            return self.all_rows
+        first_full = -(-lo // self.chunk)
+        last_full = hi // self.chunk
+        if first_full >= last_full:
+            return self._bitmap(self.price_order[lo:hi])
+        bitmap = 0
+        for chunk in self.price_chunks[first_full:last_full]:
+            bitmap |= chunk
+        edges = self.price_order[lo:first_full * self.chunk] + self.price_order[last_full * self.chunk:hi]
+        return bitmap | self._bitmap(edges) if edges else bitmap
+
+    def category_bitmap(self, category: Optional[str]) -> int:
+        if not category:
+            return self.all_rows
+        return self.category_bitmaps.get(category, 0)
+
+    def category_counts(self, bitmap: int) -> Dict[str, int]:
+        """Rows of `bitmap` in each category"""
+        return {name: (bits & bitmap).bit_count() for name, bits in self.category_bitmaps.items()}
+
+    def first_rows(self, bitmap: int, limit: int) -> List[int]:
+        """The first `limit` rows set in `bitmap`, in catalog order"""
+        data = bitmap.to_bytes(self.nbytes, "little")
+        rows: List[int] = []
+        for match in _NONZERO.finditer(data):
+            base, byte = match.start() * 8, data[match.start()]
+            while byte:
+                low = byte & -byte
+                rows.append(base + low.bit_length() - 1)
+                if len(rows) >= limit:
+                    return rows
+                byte ^= low
+        return rows
+
+    def filter_price(self, docs: List[int], scores: List[float], min_price: Optional[int] = None,
+                     max_price: Optional[int] = None) -> Tuple[List[int], List[float]]:
+        """Keep the (doc, score) pairs priced within [min_price, max_price]"""
+        if min_price is None and max_price is None:
+            return docs, scores
+        # The per-doc comparisons and the selection all run in C
+        prices = list(map(self.prices.__getitem__, docs))
+        if max_price is None:
+            selected = map(ge, prices, repeat(min_price))
+        elif min_price is None:
+            selected = map(le, prices, repeat(max_price))
+        else:
+            selected = map(and_, map(ge, prices, repeat(min_price)), map(le, prices, repeat(max_price)))
+        selected = bytes(selected)
+        return list(compress(docs, selected)), list(compress(scores, selected))
+
+    def filter_category(self, docs: List[int], scores: List[float],
+                        category: Optional[str]) -> Tuple[List[int], List[float]]:
+        """Keep the (doc, score) pairs in `category` (all of them when it is empty)"""
+        if not category:
+            return docs, scores
+        if category not in self.category_bitmaps:
+            return [], []
+        ref = self.categories.index(category)
+        selected = bytes(map(eq, map(self.category_column.__getitem__, docs), repeat(ref)))
+        return list(compress(docs, selected)), list(compress(scores, selected))
+
+    def doc_category_counts(self, docs: List[int]) -> Dict[str, int]:
+        counts = Counter(map(self.category_column.__getitem__, docs))
+        return {name: counts.get(ref, 0) for ref, name in enumerate(self.categories)}
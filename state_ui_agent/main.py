@@ -6,13 +6,15 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from fasthtml.common import *
-from agent import UIState, do_search, add_to_cart, remove_from_cart, remove_all_from_cart, checkout, cart_subtotal, get_all_products
+from agent import search_products, suggest, add_to_cart, remove_from_cart, remove_all_from_cart, clear_cart, checkout, cart_count, cart_subtotal, get_all_products, get_product, catalog_reloader, typeahead_refresher
+from catalog_reload import RELOAD_ENABLED
+from typeahead import query_log, suggest_latency
 from ui import home_page, search_page, cart_page, checkout_page
 from ai_assistant import process_ai_request
+from session_store import aget_state, aupdate_state, get_state, session_id
 import asyncio
-
-# Global state for demo
-state = UIState()
+import json
+import time
 
 # FastHTML app with custom CSS
 css = """
@@ -200,35 +202,66 @@ css = """
     }
 """
 
-app, rt = fast_app(hdrs=[Style(css)])
+# Set SHOP_SESSION_SECRET when running several workers so they all sign cookies alike
+app, rt = fast_app(hdrs=[Style(css)], secret_key=os.getenv("SHOP_SESSION_SECRET"))
+
+# Pick up catalog file changes without a restart
+if RELOAD_ENABLED:
+    catalog_reloader.start()
+# Build the typeahead trie off the startup path (no suggestions until it is ready)
+typeahead_refresher.start()
 
 @rt("/")
-def home():
+def home(session):
+    state = get_state(session)
     products = get_all_products()
-    cart_count = sum(item.qty for item in state.cart)
-    return home_page(products, cart_count, state.cart)
+    return home_page(products, cart_count(state), state.cart)
 
 @rt("/search")
-async def search(req):
-    q = req.query_params.get("q", "")
-    products = do_search(state, q) if q else get_all_products()
-    cart_count = sum(item.qty for item in state.cart)
-    return search_page(products, q, state.cart, cart_count)
+async def search(req, session):
+    params = req.query_params
+    q = params.get("q", "")
+    filters = {
+        "category": params.get("category") or None,
+        "min_price": parse_price(params.get("min_price")),
+        "max_price": parse_price(params.get("max_price")),
+    }
+    # Search on the read copy and persist only when the remembered search
+    # changed: re-filtering the same query (or browsing) costs no state write
+    state = await aget_state(session)
+    seen = (state.current_page, state.last_search, state.search_correction)
+    result = await asyncio.to_thread(search_products, state, q, **filters)
+    searched = (state.current_page, state.last_search, state.search_correction)
+    if searched != seen:
+        def remember(s):
+            s.current_page, s.last_search, s.search_correction = searched
+        await aupdate_state(session, remember)
+    if result.matched_query and result.total:
+        query_log.record(result.matched_query, session_id(session))
+    return search_page(result.products, q, state.cart, cart_count(state), state.search_correction if q else "",
+                       result.total, result.category_counts, filters)
+
+def parse_price(value):
+    """Price filter from a query parameter; blank or invalid means no bound"""
+    try:
+        return int(float(value)) if value else None
+    except (ValueError, OverflowError):
+        return None
 
 @rt("/add")
-async def add(req):
+async def add(req, session):
     try:
         form = await req.form()
-        pid = form.get("id")
-        title = form.get("title")
-        price = form.get("price")
+        # Product cards post "pid"; title and price always come from the catalog
+        pid = form.get("pid") or form.get("id")
+        found = get_product(pid) if pid else None
         
-        if not (pid and title and price):
+        if not found:
             return Div("Error: Missing product information", 
                       A("Back", href="/", cls="btn btn-secondary"))
             
-        product = {"id": pid, "title": title, "price": int(price)}
-        add_to_cart(state, product)
+        product = {"id": found.id, "title": found.title, "price": found.price}
+        await aupdate_state(session, lambda s: add_to_cart(s, product))
         
         # Return updated page or redirect
         return RedirectResponse("/", status_code=303)
@@ -237,34 +270,35 @@ async def add(req):
         return Div(f"Error: {str(e)}", A("Back", href="/", cls="btn btn-secondary"))
 
 @rt("/remove")
-async def remove(req):
+async def remove(req, session):
     try:
         form = await req.form()
-        pid = form.get("id")
+        pid = form.get("pid") or form.get("id")
         if pid:
-            remove_from_cart(state, pid)
+            await aupdate_state(session, lambda s: remove_from_cart(s, pid))
         return RedirectResponse("/cart", status_code=303)
     except Exception as e:
         return Div(f"Error: {str(e)}", A("Back", href="/cart", cls="btn btn-secondary"))
 
 @rt("/cart")
-def show_cart():
+def show_cart(session):
+    state = get_state(session)
     subtotal = cart_subtotal(state)
-    cart_count = sum(item.qty for item in state.cart)
-    return cart_page(state.cart, subtotal, cart_count)
+    return cart_page(state.cart, subtotal, cart_count(state))
 
 @rt("/checkout")
-async def do_checkout():
-    total = checkout(state)
+async def do_checkout(session):
+    total = await aupdate_state(session, checkout)
     return checkout_page(total)
 
 @rt("/clear-cart", methods=["GET", "POST"])
-async def clear_cart():
-    state.cart = []
+async def clear_cart_route(session):
+    await aupdate_state(session, clear_cart)
     return RedirectResponse("/", status_code=303)
 
 @rt("/ai-chat", methods=["POST"])
-async def ai_chat(req):
+async def ai_chat(req, session):
+    state = await aget_state(session)
     try:
         form = await req.form()
         user_input = form.get("message", "").strip()
@@ -281,75 +315,93 @@ async def ai_chat(req):
         # Process with AI assistant
         ai_result = await process_ai_request(user_input, state, available_products)
         
-        # Execute the action
-        response_message = ai_result.get("ai_response", "I understand your request.")
-        
-        if ai_result["action"] == "add":
-            product_id = ai_result.get("product_id")
-            if product_id:
-                # Find and add product
-                for product in available_products:
-                    if product["id"] == product_id:
-                        add_to_cart(state, product)
-                        response_message = f"✅ Added {product['title']} to your cart!"
-                        break
-        
-        elif ai_result["action"] == "remove":
-            product_id = ai_result.get("product_id")
-            if product_id:
-                # Find the item in cart before removing
-                item_to_remove = None
-                for item in state.cart:
-                    if item.id == product_id:
-                        item_to_remove = item
-                        break
-                
-                if item_to_remove:
-                    remove_from_cart(state, product_id)
-                    response_message = f"✅ Removed {item_to_remove.title} from your cart!"
-                else:
-                    response_message = "❌ That item is not in your cart."
-            else:
-                response_message = "❌ Please specify which item to remove."
-        
-        elif ai_result["action"] == "remove_all":
-            product_id = ai_result.get("product_id")
-            if product_id:
-                # Find the item in cart before removing
-                item_to_remove = None
-                for item in state.cart:
-                    if item.id == product_id:
-                        item_to_remove = item
-                        break
-                
-                if item_to_remove:
-                    remove_all_from_cart(state, product_id)
-                    response_message = f"✅ Completely removed all {item_to_remove.title} from your cart!"
-                else:
-                    response_message = "❌ That item is not in your cart."
-            else:
-                response_message = "Please specify which item you'd like to remove from your cart."
-        
-        elif ai_result["action"] == "clear_cart":
-            state.cart = []
-            response_message = "🗑️ Cart cleared successfully!"
-            
-        elif ai_result["action"] == "view_cart":
-            if state.cart:
-                cart_items = [f"• {item.title} (₹{item.price:,}) x{item.qty}" for item in state.cart]
-                total = cart_subtotal(state)
-                response_message = f"🛒 Your cart:\n" + "\n".join(cart_items) + f"\n\n💰 Total: ₹{total:,}"
-            else:
-                response_message = "🛒 Your cart is empty."
+        # Execute the action against the latest state (it may have changed during the AI call)
+        response_message, count = await aupdate_state(
+            session, lambda s: apply_ai_action(s, ai_result, available_products)
+        )
         
         return {
             "response": response_message,
-            "cart_count": sum(item.qty for item in state.cart)
+            "cart_count": count
         }
         
     except Exception as e:
         return {"error": f"Sorry, I couldn't process that: {str(e)}"}
 
+def apply_ai_action(state, ai_result, available_products):
+    """Apply the assistant's chosen action to the cart; returns (message, cart count)"""
+    response_message = ai_result.get("ai_response", "I understand your request.")
+    
+    if ai_result["action"] == "add":
+        product_id = ai_result.get("product_id")
+        if product_id:
+            # Find and add product
+            for product in available_products:
+                if product["id"] == product_id:
+                    add_to_cart(state, product)
+                    response_message = f"✅ Added {product['title']} to your cart!"
+                    break
+    
+    elif ai_result["action"] == "remove":
+        product_id = ai_result.get("product_id")
+        if product_id:
+            # Find the item in cart before removing
+            item_to_remove = state.cart.get(product_id)
+            
+            if item_to_remove:
+                remove_from_cart(state, product_id)
+                response_message = f"✅ Removed {item_to_remove.title} from your cart!"
+            else:
+                response_message = "❌ That item is not in your cart."
+        else:
+            response_message = "❌ Please specify which item to remove."
+    
+    elif ai_result["action"] == "remove_all":
+        product_id = ai_result.get("product_id")
+        if product_id:
+            # Find the item in cart before removing
+            item_to_remove = state.cart.get(product_id)
+            
+            if item_to_remove:
+                remove_all_from_cart(state, product_id)
+                response_message = f"✅ Completely removed all {item_to_remove.title} from your cart!"
+            else:
+                response_message = "❌ That item is not in your cart."
+        else:
+            response_message = "Please specify which item you'd like to remove from your cart."
+    
+    elif ai_result["action"] == "clear_cart":
+        clear_cart(state)
+        response_message = "🗑️ Cart cleared successfully!"
+        
+    elif ai_result["action"] == "view_cart":
+        if state.cart:
+            cart_items = [f"• {item.title} (₹{item.price:,}) x{item.qty}" for item in state.cart]
+            total = cart_subtotal(state)
+            response_message = f"🛒 Your cart:\n" + "\n".join(cart_items) + f"\n\n💰 Total: ₹{total:,}"
+        else:
+            response_message = "🛒 Your cart is empty."
+    
+    return response_message, cart_count(state)
+
+@rt("/suggest")
+def suggest_route(q: str = ""):
+    """Typeahead: a bare JSON list of suggested phrases"""
+    started = time.perf_counter()
+    body = json.dumps(suggest(q), ensure_ascii=False, separators=(",", ":"))
+    suggest_latency.observe(time.perf_counter() - started)
+    return Response(body, media_type="application/json", headers={"Cache-Control": "max-age=60"})
+
+@rt("/suggest/stats")
+def suggest_stats():
+    """Typeahead request count, p50/p99 lookup latency and the state of the trie"""
+    return {**suggest_latency.stats(), "trie": typeahead_refresher.stats}
+
+@rt("/catalog/status")
+def catalog_status():
+    """Catalog version, size and the cost of the last rebuild and swap"""
+    return catalog_reloader.stats
+
 @rt("/chat.js")
 def chat_js():
     js_content = """
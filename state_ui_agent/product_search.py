@@ -0,0 +1,288 @@
+# product_search.py - Inverted-index product search (BM25)
+import array
+import heapq
+import math
+import re
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict
+from operator import add, neg
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+K1 = 1.2
+B = 0.75
+TOP_CACHE_TERMS = 1024
+# Fuzzy matching: vocabulary candidates verified per unknown query term
+FUZZY_CANDIDATES = 50
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_token(token: str) -> str:
+    # Light plural folding so "headphone" matches "headphones"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    return [normalize_token(t) for t in _TOKEN_RE.findall(text.lower())]
+
+
+def trigrams(word: str) -> List[str]:
+    padded = f"${word}$"
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def max_edits(word: str) -> int:
+    # Short words tolerate fewer typos before everything looks alike
+    if len(word) < 3 or word.isdigit():
+        return 0
+    return 1 if len(word) <= 5 else 2
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Edit distance counting swapped neighbours as one edit (optimal string
+    alignment), or limit + 1 as soon as it must exceed limit
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i]
+        for j in range(1, len(b) + 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+
+def top_k(docs: Iterable[int], scores: Iterable[float], limit: int) -> List[Tuple[int, float]]:
+    # Best score first, ties in catalog order; plain tuples keep the comparisons in C
+    top = heapq.nlargest(limit, zip(scores, map(neg, docs)))
+    return [(-doc, score) for score, doc in top]
+
+
+class ProductIndex:
+    """
+    Inverted index over product titles and ids, built once at catalog load.
+    Documents are catalog positions. Each term's postings are sorted doc
+    numbers with precomputed BM25 weights, in typed arrays. A query that is
+    exactly a product id matches only that product.
+    """
+
+    def __init__(self, docs: Iterable[Tuple[str, str]], id_row: Optional[Callable[[str], Optional[int]]] = None):
+        """
+        `docs` yields (id, title) in catalog order. `id_row` maps a product id
+        to its doc (Catalog.row_of); without it, ids are kept in a dict here
+        """
+        self._ids: Optional[Dict[str, int]] = None if id_row else {}
+        self._id_row = id_row or self._ids.get
+        postings: Dict[str, List[int]] = defaultdict(list)
+        lengths = array.array("H")
+        for doc, (pid, title) in enumerate(docs):
+            if self._ids is not None:
+                self._ids[pid] = doc
+            # Id prefixes ("laptop-1") carry the category, so index them too
+            tokens = tokenize(title) + tokenize(pid.rsplit("-", 1)[0])
+            lengths.append(min(len(tokens), 65535))
+            for token in tokens:
+                postings[token].append(doc)
+
+        self.size = len(lengths)
+        avg_length = (sum(lengths) / self.size) if self.size else 1.0
+        norms = [K1 * (1 - B + B * length / avg_length) for length in lengths]
+        self.postings: Dict[str, Tuple[array.array, array.array]] = {}
+        for term, doc_list in postings.items():
+            # A doc appears once per occurrence, consecutively; collapse into tf
+            tfs: Dict[int, int] = {}
+            for doc in doc_list:
+                tfs[doc] = tfs.get(doc, 0) + 1
+            idf = math.log(1 + (self.size - len(tfs) + 0.5) / (len(tfs) + 0.5))
+            self.postings[term] = (
+                array.array("i", tfs),
+                array.array("f", (idf * tf * (K1 + 1) / (tf + norms[doc]) for doc, tf in tfs.items())),
+            )
+        # Sorted vocabulary for prefix expansion ("lap" -> "laptop")
+        self.vocabulary = sorted(self.postings)
+        # Trigram -> vocabulary positions, for typo correction
+        grams: Dict[str, List[int]] = defaultdict(list)
+        for position, word in enumerate(self.vocabulary):
+            for gram in set(trigrams(word)):
+                grams[gram].append(position)
+        self.trigram_index = {gram: array.array("i", positions) for gram, positions in grams.items()}
+        # Single-term top results, computed on first use
+        self._top: "OrderedDict[str, Tuple[int, List[Tuple[int, float]]]]" = OrderedDict()
+
+    def exact(self, query: str) -> Optional[int]:
+        """The doc whose id is the whole query ("laptop-1"), if any"""
+        query = query.strip()
+        if not query or " " in query:
+            return None
+        doc = self._id_row(query)
+        if doc is None and query != query.lower():
+            doc = self._id_row(query.lower())
+        return doc
+
+    def expand(self, term: str, limit: int = 20) -> List[str]:
+        """Index terms for a query term: exact match, else vocabulary words it prefixes"""
+        if term in self.postings:
+            return [term]
+        start = bisect_left(self.vocabulary, term)
+        matches = []
+        for word in self.vocabulary[start:start + limit]:
+            if not word.startswith(term):
+                break
+            matches.append(word)
+        return matches
+
+    def correct_term(self, term: str) -> Optional[str]:
+        """Closest vocabulary word within the edit budget, or None"""
+        limit = max_edits(term)
+        if not limit:
+            return None
+        shared: Dict[int, int] = defaultdict(int)
+        for gram in set(trigrams(term)):
+            for position in self.trigram_index.get(gram, ()):
+                shared[position] += 1
+        # Verify the words sharing the most trigrams; prefer fewer edits, then more popular words
+        best, best_key = None, None
+        for position in heapq.nlargest(FUZZY_CANDIDATES, shared, key=shared.__getitem__):
+            word = self.vocabulary[position]
+            distance = edit_distance(term, word, limit)
+            if distance > limit:
+                continue
+            key = (distance, -len(self.postings[word][0]), word)
+            if best_key is None or key < best_key:
+                best, best_key = word, key
+        return best
+
+    def correct(self, query: str) -> Tuple[str, Dict[str, str]]:
+        """
+        Replace query words the catalog doesn't know with their closest match.
+        Returns the corrected query and the corrections applied (typo -> word).
+        """
+        if self.exact(query) is not None:
+            return query, {}
+        corrections: Dict[str, str] = {}
+        words = []
+        for raw in _TOKEN_RE.findall(query.lower()):
+            term = normalize_token(raw)
+            if not self.expand(term):
+                fixed = self.correct_term(term)
+                if fixed:
+                    corrections[raw] = fixed
+                    term = fixed
+            words.append(term)
+        return " ".join(words), corrections
+
+    def _term_scores(self, term: str) -> Dict[int, float]:
+        """doc -> weight for one query term (prefix matches take their best weight)"""
+        words = self.expand(term)
+        if len(words) == 1:
+            docs, weights = self.postings[words[0]]
+            return dict(zip(docs, weights))
+        scores: Dict[int, float] = {}
+        for word in words:
+            docs, weights = self.postings[word]
+            for doc, weight in zip(docs, weights):
+                if weight > scores.get(doc, 0.0):
+                    scores[doc] = weight
+        return scores
+
+    def _weight_of(self, term: str, doc: int) -> float:
+        best = 0.0
+        for word in self.expand(term):
+            docs, weights = self.postings[word]
+            at = bisect_left(docs, doc)
+            if at < len(docs) and docs[at] == doc and weights[at] > best:
+                best = weights[at]
+        return best
+
+    def _doc_set(self, term: str) -> set:
+        words = self.expand(term)
+        if len(words) == 1:
+            return set(self.postings[words[0]][0])
+        return set().union(*(self.postings[word][0] for word in words))
+
+    def _matches(self, term: str) -> int:
+        return sum(len(self.postings[word][0]) for word in self.expand(term))
+
+    def _single(self, term: str, limit: int) -> List[Tuple[int, float]]:
+        cached = self._top.get(term)
+        if cached is not None and cached[0] >= limit:
+            self._top.move_to_end(term)
+            return cached[1][:limit]
+        words = self.expand(term)
+        if len(words) == 1:
+            ranked = top_k(*self.postings[words[0]], limit)
+        else:
+            scores = self._term_scores(term)
+            ranked = top_k(scores.keys(), scores.values(), limit)
+        self._top[term] = (limit, ranked)
+        if len(self._top) > TOP_CACHE_TERMS:
+            self._top.popitem(last=False)
+        return ranked
+
+    def _and(self, terms: List[str]) -> Tuple[List[int], List[float]]:
+        # Intersect doc sets (rarest term first), then score only the survivors
+        terms = sorted(terms, key=self._matches)
+        candidates = self._doc_set(terms[0])
+        for term in terms[1:]:
+            if not candidates:
+                return [], []
+            words = self.expand(term)
+            if len(words) == 1:
+                candidates.intersection_update(self.postings[words[0]][0])
+            else:
+                candidates &= self._doc_set(term)
+        docs = list(candidates)
+        totals = [0.0] * len(docs)
+        for term in terms:
+            if len(docs) * 16 < self._matches(term):
+                weights = [self._weight_of(term, doc) for doc in docs]
+            else:
+                weights = map(self._term_scores(term).__getitem__, docs)
+            totals = list(map(add, totals, weights))
+        return docs, totals
+
+    def _or(self, terms: List[str]) -> Tuple[List[int], List[float]]:
+        scores: Dict[int, float] = {}
+        get = scores.get
+        for term in terms:
+            for doc, weight in self._term_scores(term).items():
+                scores[doc] = get(doc, 0.0) + weight
+        return list(scores), list(scores.values())
+
+    def matches(self, query: str, mode: str = "and") -> Tuple[List[int], List[float]]:
+        """Every matching doc with its score, unranked"""
+        doc = self.exact(query)
+        if doc is not None:
+            return [doc], [math.inf]
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self.size:
+            return [], []
+        if len(terms) == 1:
+            scores = self._term_scores(terms[0])
+            return list(scores), list(scores.values())
+        return self._and(terms) if mode == "and" else self._or(terms)
+
+    def search(self, query: str, mode: str = "and", limit: int = 100) -> List[Tuple[int, float]]:
+        """
+        Ranked (doc, score) pairs. `mode` is "and" (every term must match) or
+        "or" (any term).
+        """
+        doc = self.exact(query)
+        if doc is not None:
+            return [(doc, math.inf)]
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self.size:
+            return []
+        if len(terms) == 1:
+            return self._single(terms[0], limit)
+        docs, scores = self._and(terms) if mode == "and" else self._or(terms)
+        return top_k(docs, scores, limit)
@@ -0,0 +1,135 @@
+# session_store.py - Per-session UI state
+import asyncio
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, List, TypeVar
+from agent import UIState
+from state_backend import StateBackend, SqliteStateBackend
+
+T = TypeVar("T")
+
+# Store settings, overridable from the environment
+SHARDS = int(os.getenv("SHOP_SESSION_SHARDS", "16"))
+SESSION_TTL = float(os.getenv("SHOP_SESSION_TTL", "3600"))
+# Memory bound: total sessions kept in memory (least recently used evicted first)
+MAX_SESSIONS = int(os.getenv("SHOP_MAX_SESSIONS", "50000"))
+# "memory" (single process) or "sqlite" (shared across worker processes)
+BACKEND = os.getenv("SHOP_STATE_BACKEND", "memory")
+
+SESSION_KEY = "sid"
+
+
+class _Shard:
+    def __init__(self, max_sessions: int):
+        self.lock = threading.Lock()
+        self.max_sessions = max_sessions
+        # sid -> (state, last access), ordered by last access
+        self.sessions: "OrderedDict[str, List]" = OrderedDict()
+
+
+class SessionStateStore(StateBackend):
+    """
+    In-memory session-scoped UIState, sharded by session id so concurrent
+    requests for different users rarely contend on the same lock. Each shard
+    is an LRU with idle TTL and its share of the overall session bound.
+    Only valid with a single worker process.
+    """
+
+    def __init__(self, shards: int = SHARDS, ttl: float = SESSION_TTL, max_sessions: int = MAX_SESSIONS):
+        self.ttl = ttl
+        per_shard = max(1, max_sessions // shards)
+        self._shards = [_Shard(per_shard) for _ in range(shards)]
+        self.evicted = 0
+
+    def _shard(self, sid: str) -> _Shard:
+        return self._shards[hash(sid) % len(self._shards)]
+
+    def _touch(self, shard: _Shard, sid: str) -> UIState:
+        # Caller holds shard.lock. Expire idle sessions on every access, so a
+        # read-mostly shard sheds them too (and an expired sid starts afresh)
+        now = time.monotonic()
+        self._evict(shard, now)
+        entry = shard.sessions.get(sid)
+        if entry is None:
+            entry = [UIState(), now]
+            shard.sessions[sid] = entry
+            self._evict(shard, now)
+        else:
+            entry[1] = now
+            shard.sessions.move_to_end(sid)
+        return entry[0]
+
+    def get(self, sid: str) -> UIState:
+        """
+        A copy of the state for a session (created on first use), so readers
+        never iterate a cart that an update is changing
+        """
+        shard = self._shard(sid)
+        with shard.lock:
+            return self._touch(shard, sid).model_copy(deep=True)
+
+    def update(self, sid: str, mutate: Callable[[UIState], T]) -> T:
+        shard = self._shard(sid)
+        with shard.lock:
+            return mutate(self._touch(shard, sid))
+
+    def drop(self, sid: str):
+        shard = self._shard(sid)
+        with shard.lock:
+            shard.sessions.pop(sid, None)
+
+    def _evict(self, shard: _Shard, now: float):
+        # Oldest entries are at the front: expire idle ones, then enforce the bound
+        while shard.sessions:
+            sid, (_, last_access) = next(iter(shard.sessions.items()))
+            if now - last_access < self.ttl and len(shard.sessions) <= shard.max_sessions:
+                break
+            del shard.sessions[sid]
+            self.evicted += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {"sessions": len(self), "evicted": self.evicted, "shards": len(self._shards)}
+
+    def __len__(self):
+        return sum(len(shard.sessions) for shard in self._shards)
+
+
+def make_backend(kind: str = BACKEND) -> StateBackend:
+    if kind == "sqlite":
+        return SqliteStateBackend(ttl=SESSION_TTL)
+    if kind == "memory":
+        return SessionStateStore()
+    raise ValueError(f"Unknown state backend: {kind}")
+
+
+store = make_backend()
+
+
+def session_id(session) -> str:
+    sid = session.get(SESSION_KEY)
+    if not sid:
+        sid = session[SESSION_KEY] = uuid.uuid4().hex
+    return sid
+
+
+def get_state(session) -> UIState:
+    """UIState for the visitor behind this (signed-cookie) session, for reading"""
+    return store.get(session_id(session))
+
+
+def update_state(session, mutate: Callable[[UIState], T]) -> T:
+    """Apply `mutate` to this visitor's UIState and persist it atomically"""
+    return store.update(session_id(session), mutate)
+
+
+# Async routes use these so a blocking backend (SQLite busy timeout, shard
+# locks) never stalls the event loop
+async def aget_state(session) -> UIState:
+    return await asyncio.to_thread(store.get, session_id(session))
+
+
+async def aupdate_state(session, mutate: Callable[[UIState], T]) -> T:
+    return await asyncio.to_thread(store.update, session_id(session), mutate)
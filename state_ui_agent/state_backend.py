@@ -0,0 +1,120 @@
+# state_backend.py - Pluggable storage for per-session UIState
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, TypeVar
+from agent import UIState
+
+T = TypeVar("T")
+
+STATE_DB_PATH = os.getenv("SHOP_STATE_DB", os.path.join(os.path.dirname(__file__), ".shop_state.sqlite3"))
+MAX_RETRIES = 20
+
+
+class ConcurrentUpdateError(Exception):
+    """A state update kept losing the optimistic-concurrency race"""
+
+
+class StateBackend(ABC):
+    """
+    Where session state lives. `get` returns the state for reading;
+    `update` applies a mutation atomically and returns its result.
+    Both may block (locks, disk): async code calls them via asyncio.to_thread.
+    """
+
+    @abstractmethod
+    def get(self, sid: str) -> UIState:
+        ...
+
+    @abstractmethod
+    def update(self, sid: str, mutate: Callable[[UIState], T]) -> T:
+        ...
+
+    @abstractmethod
+    def drop(self, sid: str):
+        ...
+
+    def stats(self) -> Dict[str, int]:
+        return {}
+
+
+class SqliteStateBackend(StateBackend):
+    """
+    Shared state for multiple worker processes: one SQLite database in WAL
+    mode. Writes use optimistic versioning (compare-and-swap on a version
+    column) and retry the mutation on a fresh copy when another worker wins.
+    """
+
+    def __init__(self, path: str = STATE_DB_PATH, ttl: float = 3600, cleanup_every: int = 1000):
+        self.path = path
+        self.ttl = ttl
+        self.cleanup_every = cleanup_every
+        self._local = threading.local()
+        self._writes = 0
+        self.conflicts = 0
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS ui_state ("
+            " sid TEXT PRIMARY KEY, data TEXT NOT NULL, version INTEGER NOT NULL, updated_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_ui_state_updated ON ui_state(updated_at)")
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread; autocommit so each statement is its own transaction
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _load(self, sid: str):
+        row = self._conn().execute("SELECT data, version, updated_at FROM ui_state WHERE sid = ?", (sid,)).fetchone()
+        if row is None:
+            return UIState(), 0
+        if row[2] < time.time() - self.ttl:
+            # Idle past the TTL but not yet cleaned up: start afresh, keeping the
+            # version so the next write replaces the stale row
+            return UIState(), row[1]
+        return UIState.model_validate_json(row[0]), row[1]
+
+    def get(self, sid: str) -> UIState:
+        return self._load(sid)[0]
+
+    def update(self, sid: str, mutate: Callable[[UIState], T]) -> T:
+        conn = self._conn()
+        for _ in range(MAX_RETRIES):
+            state, version = self._load(sid)
+            result = mutate(state)
+            data, now = state.model_dump_json(), time.time()
+            if version == 0:
+                cur = conn.execute(
+                    "INSERT OR IGNORE INTO ui_state (sid, data, version, updated_at) VALUES (?, ?, 1, ?)",
+                    (sid, data, now),
+                )
+            else:
+                cur = conn.execute(
+                    "UPDATE ui_state SET data = ?, version = version + 1, updated_at = ? WHERE sid = ? AND version = ?",
+                    (data, now, sid, version),
+                )
+            if cur.rowcount == 1:
+                self._after_write()
+                return result
+            # Another worker committed first: retry against its version
+            self.conflicts += 1
+        raise ConcurrentUpdateError(f"Could not update session state after {MAX_RETRIES} attempts")
+
+    def _after_write(self):
+        self._writes += 1
+        if self._writes % self.cleanup_every == 0:
+            self._conn().execute("DELETE FROM ui_state WHERE updated_at < ?", (time.time() - self.ttl,))
+
+    def drop(self, sid: str):
+        self._conn().execute("DELETE FROM ui_state WHERE sid = ?", (sid,))
+
+    def stats(self) -> Dict[str, int]:
+        (count,) = self._conn().execute("SELECT COUNT(*) FROM ui_state").fetchone()
+        return {"sessions": count, "conflicts": self.conflicts}
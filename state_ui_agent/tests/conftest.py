@@ -0,0 +1,13 @@
+# conftest.py - Test setup for state_ui_agent
+import os
+import sys
+
+# Modules import each other by bare name, as when run from state_ui_agent/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Offline, single-process defaults; set before the app modules are imported
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+os.environ.setdefault("LOGFIRE_IGNORE_NO_CONFIG", "1")
+os.environ.setdefault("SHOP_SESSION_SECRET", "test-secret")
+os.environ.setdefault("SHOP_STATE_BACKEND", "memory")
+os.environ.setdefault("SHOP_CATALOG_RELOAD", "0")
@@ -0,0 +1,126 @@
+# test_agent.py
+import pytest
+from pydantic import ValidationError
+from agent import (UIState, add_to_cart, cart_count, cart_subtotal, checkout, find_cart_item,
+                   remove_all_from_cart, remove_from_cart, search_products)
+
+
+def ids(result):
+    return [product.id for product in result.products]
+
+
+def test_search_corrects_typos_and_says_so():
+    state = UIState()
+    result = search_products(state, "labtop")
+    assert state.last_search == "labtop"
+    assert state.search_correction == "labtop → laptop"
+    assert ids(result) == ["laptop-1", "laptop-2", "laptop-3"]
+
+
+def test_search_without_typos_clears_the_correction():
+    state = UIState(search_correction="labtop → laptop")
+    result = search_products(state, "pro phone")
+    assert state.search_correction == ""
+    assert ids(result) == ["phone-2"]
+
+
+def test_search_falls_back_to_any_word():
+    result = search_products(UIState(), "gaming phone")
+    assert ids(result)[0] == "laptop-2"
+    assert "phone-1" in ids(result)
+
+
+def test_cart_keeps_running_totals():
+    state = UIState()
+    add_to_cart(state, {"id": "phone-1", "title": "Basic Phone", "price": "15000"})
+    add_to_cart(state, {"id": "laptop-1", "title": "Basic Laptop", "price": 45000})
+    add_to_cart(state, {"id": "phone-1", "title": "Basic Phone", "price": 15000})
+    assert [(item.id, item.qty) for item in state.cart] == [("phone-1", 2), ("laptop-1", 1)]
+    assert cart_count(state) == 3
+    assert cart_subtotal(state) == 75000
+    assert find_cart_item(state, "phone-1").price == 15000
+    assert state.cart.version == 3
+
+    remove_from_cart(state, "phone-1")
+    assert state.cart.quantity("phone-1") == 1
+    remove_from_cart(state, "phone-1")
+    assert "phone-1" not in state.cart
+    assert (cart_count(state), cart_subtotal(state), len(state.cart)) == (1, 45000, 1)
+
+    remove_all_from_cart(state, "laptop-1")
+    assert not state.cart
+    assert (cart_count(state), cart_subtotal(state), state.cart.version) == (0, 0, 6)
+
+
+def test_removing_a_missing_item_is_a_no_op():
+    state = UIState()
+    add_to_cart(state, {"id": "phone-1", "title": "Basic Phone", "price": 15000})
+    remove_from_cart(state, "laptop-1")
+    remove_all_from_cart(state, "laptop-1")
+    assert (cart_count(state), cart_subtotal(state), state.cart.version) == (1, 15000, 1)
+    assert find_cart_item(state, "laptop-1") is None
+    assert state.cart.quantity("laptop-1") == 0
+
+
+def test_checkout_clears_the_cart():
+    state = UIState()
+    add_to_cart(state, {"id": "laptop-1", "title": "Basic Laptop", "price": 45000})
+    add_to_cart(state, {"id": "laptop-1", "title": "Basic Laptop", "price": 45000})
+    assert checkout(state) == 90000
+    assert state.current_page == "checkout_success"
+    assert (cart_count(state), cart_subtotal(state), state.cart.version) == (0, 0, 3)
+
+
+def test_cart_json_round_trip():
+    state = UIState()
+    add_to_cart(state, {"id": "phone-1", "title": "Basic Phone", "price": 15000})
+    add_to_cart(state, {"id": "phone-1", "title": "Basic Phone", "price": 15000})
+    data = state.model_dump()
+    assert data["cart"] == {"version": 2, "items": [{"id": "phone-1", "title": "Basic Phone", "price": 15000, "qty": 2}]}
+
+    restored = UIState.model_validate_json(state.model_dump_json())
+    assert [item.model_dump() for item in restored.cart] == data["cart"]["items"]
+    assert (restored.cart.count, restored.cart.subtotal, restored.cart.version) == (2, 30000, 2)
+
+
+def test_cart_accepts_a_bare_list_of_items():
+    items = [{"id": "phone-1", "title": "Basic Phone", "price": 15000, "qty": 2},
+             {"id": "laptop-1", "title": "Basic Laptop", "price": 45000, "qty": 1}]
+    state = UIState.model_validate({"cart": items})
+    assert (state.cart.count, state.cart.subtotal, state.cart.version) == (3, 75000, 0)
+    assert state.snapshot()["cart_items"] == items
+
+
+def test_cart_rejects_malformed_items():
+    with pytest.raises(ValidationError):
+        UIState.model_validate({"cart": [{"id": "phone-1", "title": "Basic Phone", "price": "cheap", "qty": 1}]})
+
+
+def test_browse_by_category_and_price():
+    result = search_products(UIState(), "", category="laptop", max_price=80000)
+    assert ids(result) == ["laptop-1", "laptop-2"]
+    assert result.total == 2
+    # Counts ignore the category filter but keep the price range
+    assert result.category_counts["laptop"] == 2
+    assert result.category_counts["phone"] == 3
+
+
+def test_search_with_filters():
+    state = UIState()
+    result = search_products(state, "pro", category="phone")
+    assert ids(result) == ["phone-2"]
+    assert result.category_counts["laptop"] == 1
+    result = search_products(state, "pro", min_price=50000)
+    assert ids(result) == ["laptop-3"]
+    assert result.total == 1
+    assert search_products(state, "pro", category="camera").products == []
+
+
+def test_only_fully_matched_queries_are_offered_for_suggestions():
+    assert search_products(UIState(), "pro phone").matched_query == "pro phone"
+    assert search_products(UIState(), "labtop").matched_query == "laptop"
+    assert search_products(UIState(), "phone-2").matched_query == "phone-2"
+    # Any-word fallback: some words matched nothing
+    result = search_products(UIState(), "laptop click evil-site dot com")
+    assert result.total and result.matched_query == ""
+    assert search_products(UIState(), "").matched_query == ""
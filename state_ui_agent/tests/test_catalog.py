@@ -0,0 +1,107 @@
+# test_catalog.py
+import json
+import sqlite3
+import pytest
+from catalog import Catalog, Product, StringPool, load_catalog, read_rows
+
+ROWS = [
+    ("laptop-1", "Basic Laptop", 45000, "laptop.png"),
+    ("phone-1", "Basic Phone", 15000, ""),
+    ("phone-2", "Pro Phone — ünïcode", 35000, "laptop.png"),
+]
+
+
+def test_string_pool_dedupes_and_round_trips():
+    pool = StringPool()
+    refs = [pool.add(value) for value in ("a", "ünï", "", "a")]
+    assert refs == [0, 1, 2, 0]
+    pool.freeze()
+    assert [pool[ref] for ref in refs] == ["a", "ünï", "", "a"]
+    assert len(pool) == 3
+
+
+def test_catalog_columns_and_products():
+    catalog = Catalog(ROWS)
+    assert len(catalog) == 3
+    assert catalog.id(2) == "phone-2"
+    assert catalog.title(2) == "Pro Phone — ünïcode"
+    assert catalog.product(0) == Product(id="laptop-1", title="Basic Laptop", price=45000, image="laptop.png")
+    assert [p.id for p in catalog.products([2, 0])] == ["phone-2", "laptop-1"]
+    assert list(catalog.search_docs()) == [(pid, title) for pid, title, _, _ in ROWS]
+    # The shared image is stored once
+    assert len(catalog.strings) == 8
+    assert catalog.nbytes() > 0
+
+
+def test_lookup_by_id():
+    catalog = Catalog(ROWS)
+    assert [catalog.row_of(pid) for pid, _, _, _ in ROWS] == [0, 1, 2]
+    assert catalog.get("phone-1").price == 15000
+    assert catalog.row_of("phone-3") is None
+    assert catalog.get("") is None
+
+
+def test_empty_catalog():
+    catalog = Catalog([])
+    assert len(catalog) == 0
+    assert catalog.get("laptop-1") is None
+
+
+def write_catalog(path, rows):
+    if path.suffix == ".csv":
+        lines = ["id,title,price,image"] + [f'{pid},"{title}",{price},{image}' for pid, title, price, image in rows]
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    elif path.suffix == ".jsonl":
+        records = (json.dumps({"id": pid, "title": title, "price": price, "image": image}) for pid, title, price, image in rows)
+        path.write_text("\n".join(records) + "\n\n", encoding="utf-8")
+    else:
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE products (id TEXT, title TEXT, price INTEGER, image TEXT)")
+        conn.executemany("INSERT INTO products VALUES (?, ?, ?, NULLIF(?, ''))", rows)
+        conn.commit()
+        conn.close()
+
+
+@pytest.mark.parametrize("name", ["products.csv", "products.jsonl", "products.db", "products.sqlite"])
+def test_load_every_format(tmp_path, name):
+    path = tmp_path / name
+    write_catalog(path, ROWS)
+    catalog = load_catalog(str(path))
+    assert [catalog.product(row).model_dump() for row in range(len(catalog))] == [
+        {"id": pid, "title": title, "price": price, "image": image} for pid, title, price, image in ROWS]
+
+
+def test_missing_image_column_defaults_to_empty(tmp_path):
+    path = tmp_path / "products.jsonl"
+    path.write_text('{"id": "a-1", "title": "A", "price": "12"}\n', encoding="utf-8")
+    assert load_catalog(str(path)).get("a-1") == Product(id="a-1", title="A", price=12, image="")
+
+
+def test_unsupported_format(tmp_path):
+    with pytest.raises(ValueError, match="Unsupported catalog format"):
+        read_rows(str(tmp_path / "products.xml"))
+
+
+@pytest.mark.parametrize("content, error", [
+    ('{"id": "a-1", "title": "A"}\n', KeyError),
+    ('{"id": "a-1", "title": "A", "price": "cheap"}\n', ValueError),
+    ('{"id": "a-1",\n', json.JSONDecodeError),
+])
+def test_bad_rows_raise(tmp_path, content, error):
+    path = tmp_path / "products.jsonl"
+    path.write_text(content, encoding="utf-8")
+    with pytest.raises(error):
+        load_catalog(str(path))
+
+
+def test_missing_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        load_catalog(str(tmp_path / "products.csv"))
+    with pytest.raises(sqlite3.OperationalError):
+        load_catalog(str(tmp_path / "products.db"))
+
+
+def test_default_catalog_loads():
+    catalog = load_catalog()
+    assert len(catalog) == 14
+    assert catalog.get("laptop-1").title == "Basic Laptop"
@@ -0,0 +1,106 @@
+# test_catalog_reload.py
+import json
+import os
+import pytest
+from catalog_reload import CatalogReloader
+
+
+def write_catalog(path, count, mtime):
+    lines = (json.dumps({"id": f"phone-{i}", "title": f"Phone {i}", "price": 1000 * i}) for i in range(1, count + 1))
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    os.utime(path, ns=(mtime, mtime))
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / "products.jsonl"
+    write_catalog(path, 2, 1_000_000_000)
+    return path
+
+
+def test_initial_snapshot(path):
+    reloader = CatalogReloader(str(path))
+    snapshot = reloader.snapshot
+    assert snapshot.version == 1
+    assert len(snapshot.catalog) == 2
+    assert reloader.stats["version"] == 1
+    assert reloader.stats["products"] == 2
+    assert reloader.stats["reloads"] == 0
+    assert reloader.stats["last_error"] is None
+
+
+def test_unchanged_file_is_not_reloaded(path):
+    reloader = CatalogReloader(str(path))
+    assert not reloader.check()
+    assert not reloader.check()
+    assert reloader.snapshot.version == 1
+
+
+def test_reload_waits_for_the_file_to_settle(path):
+    reloader = CatalogReloader(str(path))
+    old = reloader.snapshot
+    write_catalog(path, 3, 2_000_000_000)
+    assert not reloader.check()
+    # Changed again before the next poll: start waiting over
+    write_catalog(path, 4, 3_000_000_000)
+    assert not reloader.check()
+    assert reloader.snapshot is old
+    assert reloader.check()
+
+    fresh = reloader.snapshot
+    assert fresh.version == 2
+    assert len(fresh.catalog) == 4
+    assert fresh.search.search("phone-4") == [(3, float("inf"))]
+    assert reloader.stats["reloads"] == 1
+    assert reloader.stats["products"] == 4
+    # The old snapshot a request may still hold is untouched
+    assert len(old.catalog) == 2
+    assert not reloader.check()
+
+
+def test_bad_file_keeps_the_old_snapshot(path):
+    reloader = CatalogReloader(str(path))
+    old = reloader.snapshot
+    path.write_text('{"id": "phone-1", "title": "Phone"}\n', encoding="utf-8")
+    os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+    assert not reloader.check()
+    assert not reloader.check()
+    assert reloader.snapshot is old
+    assert reloader.stats["last_error"] == "KeyError: 'price'"
+    # Not retried until the file changes again
+    assert not reloader.check()
+    assert not reloader.check()
+
+    write_catalog(path, 3, 3_000_000_000)
+    reloader.check()
+    assert reloader.check()
+    assert reloader.snapshot.version == 2
+    assert reloader.stats["last_error"] is None
+
+
+def test_deleted_file_keeps_the_old_snapshot(path):
+    reloader = CatalogReloader(str(path))
+    path.unlink()
+    assert not reloader.check()
+    assert not reloader.check()
+    assert reloader.snapshot.version == 1
+
+
+def test_missing_file_at_startup_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        CatalogReloader(str(tmp_path / "products.jsonl"))
+
+
+def test_background_thread_starts_and_stops(path):
+    reloader = CatalogReloader(str(path), interval=0.01)
+    reloader.start()
+    write_catalog(path, 3, 2_000_000_000)
+    try:
+        for _ in range(500):
+            if reloader.snapshot.version == 2:
+                break
+            reloader._stop.wait(0.01)
+    finally:
+        reloader.stop()
+    assert reloader.snapshot.version == 2
+    assert reloader._thread is None
@@ -0,0 +1,95 @@
+# test_facets.py
+import random
+import pytest
+import facets
+from catalog import Catalog
+from facets import FacetIndex, category_of
+
+CATEGORIES = ["laptop", "phone", "tablet"]
+
+
+def make_catalog(n, seed=1):
+    rng = random.Random(seed)
+    return Catalog((f"{CATEGORIES[i % 3]}-{i}", f"Item {i}", rng.randrange(0, 1000, 10), "") for i in range(n))
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    # Force several chunks so range queries take both the chunk and edge paths
+    monkeypatch.setattr(facets, "PRICE_CHUNK_MIN", 16)
+    monkeypatch.setattr(facets, "PRICE_CHUNKS", 8)
+
+
+def rows_of(bitmap):
+    return [row for row in range(bitmap.bit_length()) if bitmap >> row & 1]
+
+
+def test_category_of():
+    assert category_of("laptop-12") == "laptop"
+    assert category_of("usb-c-cable-3") == "usb-c-cable"
+
+
+@pytest.mark.parametrize("n", [0, 1, 100, 1000])
+def test_price_bitmap_matches_a_scan(small_chunks, n):
+    catalog = make_catalog(n)
+    index = FacetIndex(catalog)
+    rng = random.Random(n)
+    for _ in range(50):
+        low, high = sorted(rng.randrange(-10, 1010) for _ in range(2))
+        for lo, hi in ((low, high), (low, None), (None, high), (None, None)):
+            expected = [row for row in range(n) if (lo is None or catalog.prices[row] >= lo)
+                        and (hi is None or catalog.prices[row] <= hi)]
+            assert rows_of(index.price_bitmap(lo, hi)) == expected
+
+
+def test_chunk_count_is_bounded(small_chunks):
+    index = FacetIndex(make_catalog(1000))
+    assert index.chunk == 125
+    assert len(index.price_chunks) == 8
+    assert FacetIndex(make_catalog(50)).chunk == 16
+
+
+def test_empty_range():
+    index = FacetIndex(make_catalog(100))
+    assert index.price_bitmap(500, 100) == 0
+    assert index.price_bitmap(2000, None) == 0
+
+
+def test_category_bitmaps_and_counts():
+    catalog = make_catalog(30)
+    index = FacetIndex(catalog)
+    assert rows_of(index.category_bitmap("phone")) == list(range(1, 30, 3))
+    assert index.category_bitmap("") == index.all_rows
+    assert index.category_bitmap("camera") == 0
+    assert index.category_counts(index.all_rows) == {"laptop": 10, "phone": 10, "tablet": 10}
+    assert index.category_counts(0b1111) == {"laptop": 2, "phone": 1, "tablet": 1}
+
+
+def test_first_rows_in_catalog_order():
+    index = FacetIndex(make_catalog(100))
+    assert index.first_rows(index.category_bitmap("tablet"), 4) == [2, 5, 8, 11]
+    assert index.first_rows(1 << 99 | 1 << 64, 10) == [64, 99]
+    assert index.first_rows(0, 10) == []
+
+
+def test_filter_price_per_candidate():
+    catalog = make_catalog(200)
+    index = FacetIndex(catalog)
+    docs = list(range(199, -1, -7))
+    scores = [float(doc) for doc in docs]
+    for lo, hi in ((100, 500), (None, 300), (700, None), (600, 100)):
+        kept, kept_scores = index.filter_price(docs, scores, lo, hi)
+        expected = [doc for doc in docs if (lo is None or catalog.prices[doc] >= lo)
+                    and (hi is None or catalog.prices[doc] <= hi)]
+        assert kept == expected
+        assert kept_scores == [float(doc) for doc in expected]
+    assert index.filter_price(docs, scores) == (docs, scores)
+
+
+def test_filter_category_per_candidate():
+    index = FacetIndex(make_catalog(30))
+    docs, scores = [9, 4, 1, 0, 28], [5.0, 4.0, 3.0, 2.0, 1.0]
+    assert index.filter_category(docs, scores, "phone") == ([4, 1, 28], [4.0, 3.0, 1.0])
+    assert index.filter_category(docs, scores, None) == (docs, scores)
+    assert index.filter_category(docs, scores, "camera") == ([], [])
+    assert index.doc_category_counts(docs) == {"laptop": 2, "phone": 3, "tablet": 0}
@@ -0,0 +1,108 @@
+# test_main.py
+import pytest
+from starlette.testclient import TestClient
+import main
+import session_store
+from main import parse_price
+from session_store import SessionStateStore
+from typeahead import QueryLog
+
+
+class CountingStore(SessionStateStore):
+    def __init__(self):
+        super().__init__(shards=1)
+        self.updates = 0
+
+    def update(self, sid, mutate):
+        self.updates += 1
+        return super().update(sid, mutate)
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = CountingStore()
+    monkeypatch.setattr(session_store, "store", store)
+    return store
+
+
+@pytest.fixture
+def client(store):
+    return TestClient(main.app)
+
+
+def state_of(store):
+    (sid,) = store._shards[0].sessions
+    return store.get(sid)
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("40000", 40000), ("399.99", 399), ("", None), (None, None),
+    ("abc", None), ("nan", None), ("inf", None), ("-inf", None), ("1e400", None),
+])
+def test_parse_price(value, expected):
+    assert parse_price(value) == expected
+
+
+def test_bad_prices_mean_no_bound(client):
+    response = client.get("/search", params={"q": "pro", "min_price": "1e400", "max_price": "abc"})
+    assert response.status_code == 200
+    assert "Pro Phone" in response.text and "Pro Laptop" in response.text
+
+
+def test_search_filters(client):
+    response = client.get("/search", params={"q": "pro", "category": "phone", "max_price": "inf"})
+    assert response.status_code == 200
+    assert "Pro Phone" in response.text and "Pro Laptop" not in response.text
+
+
+def test_search_persists_only_when_the_search_changes(client, store):
+    client.get("/search", params={"q": "labtop"})
+    assert store.updates == 1
+    state = state_of(store)
+    assert (state.current_page, state.last_search, state.search_correction) == ("search_results", "labtop", "labtop → laptop")
+
+    # Same query with other filters: nothing new to remember
+    client.get("/search", params={"q": "labtop", "max_price": "50000"})
+    client.get("/search", params={"q": "labtop", "category": "laptop"})
+    assert store.updates == 1
+
+    client.get("/search", params={"q": "phone"})
+    assert store.updates == 2
+    assert (state_of(store).last_search, state_of(store).search_correction) == ("phone", "")
+
+
+def test_search_keeps_the_cart(client, store):
+    client.post("/add", data={"pid": "phone-1"})
+    client.get("/search", params={"q": "pro"})
+    state = state_of(store)
+    assert state.last_search == "pro"
+    assert [(item.id, item.qty) for item in state.cart] == [("phone-1", 1)]
+
+
+def test_suggest_endpoint(client):
+    main.typeahead_refresher.refresh()
+    response = client.get("/suggest", params={"q": "lap"})
+    assert response.headers["content-type"] == "application/json"
+    assert response.json()[0] == "Laptop"
+    assert client.get("/suggest").json() == []
+    stats = client.get("/suggest/stats").json()
+    assert stats["requests"] >= 2
+    assert stats["trie"]["ready"] is True
+
+
+def test_a_single_visitor_cannot_plant_suggestions(client, monkeypatch):
+    monkeypatch.setattr(main, "query_log", QueryLog(min_sessions=3))
+    monkeypatch.setattr(main.typeahead_refresher, "_log", main.query_log)
+    for _ in range(5):
+        client.get("/search", params={"q": "laptop click evil-site dot com"})
+        client.get("/search", params={"q": "gaming laptop"})
+    main.typeahead_refresher.refresh()
+    assert client.get("/suggest", params={"q": "l"}).json() == ["Laptop"]
+    assert client.get("/suggest", params={"q": "g"}).json()[0] == "Gaming"
+
+    # The same full-match query from enough distinct visitors is suggested
+    for _ in range(2):
+        TestClient(main.app).get("/search", params={"q": "gaming laptop"})
+    main.typeahead_refresher.refresh()
+    assert client.get("/suggest", params={"q": "g"}).json()[0] == "Gaming Laptop"
+    assert "laptop click evil-site dot com" not in main.query_log.popular()
@@ -0,0 +1,102 @@
+# test_product_search.py
+import pytest
+from catalog import Catalog
+from product_search import ProductIndex, edit_distance, tokenize, top_k
+
+DOCS = [
+    ("laptop-1", "Basic Laptop"),
+    ("laptop-2", "Gaming Laptop"),
+    ("laptop-10", "Pro Laptop"),
+    ("phone-1", "Basic Phone"),
+    ("phone-2", "Pro Phone"),
+    ("headphones-1", "Wireless Headphones"),
+]
+
+
+@pytest.fixture(params=["own ids", "catalog ids"])
+def index(request):
+    if request.param == "own ids":
+        return ProductIndex(DOCS)
+    catalog = Catalog((pid, title, 100, "") for pid, title in DOCS)
+    return ProductIndex(catalog.search_docs(), catalog.row_of)
+
+
+def ids(index, hits):
+    return [DOCS[doc][0] for doc, _ in hits]
+
+
+def test_tokenize_lowercases_and_folds_plurals():
+    assert tokenize("Wireless Headphones, 2 pcs") == ["wireless", "headphone", "2", "pcs"]
+
+
+@pytest.mark.parametrize("query, expected", [("laptop-1", ["laptop-1"]), ("phone-2", ["phone-2"]), (" Phone-2 ", ["phone-2"])])
+def test_exact_id_matches_only_that_product(index, query, expected):
+    assert ids(index, index.search(query)) == expected
+    docs, _ = index.matches(query)
+    assert [DOCS[doc][0] for doc in docs] == expected
+    assert index.correct(query) == (query, {})
+
+
+def test_unknown_id_falls_back_to_terms(index):
+    assert set(ids(index, index.search("laptop-99", mode="or"))) == {"laptop-1", "laptop-2", "laptop-10"}
+
+
+def test_and_requires_every_term(index):
+    assert ids(index, index.search("pro phone")) == ["phone-2"]
+    assert set(ids(index, index.search("pro phone", mode="or"))) == {"phone-2", "laptop-10", "phone-1"}
+
+
+def test_category_prefix_and_word_prefix(index):
+    assert set(ids(index, index.search("headphone"))) == {"headphones-1"}
+    assert set(ids(index, index.search("lap"))) == {"laptop-1", "laptop-2", "laptop-10"}
+
+
+def test_empty_query(index):
+    assert index.search("  ") == []
+    assert index.matches("") == ([], [])
+
+
+def test_top_k_breaks_ties_in_catalog_order():
+    assert top_k([5, 2, 9], [1.0, 1.0, 2.0], 2) == [(9, 2.0), (2, 1.0)]
+
+
+def test_edit_distance_counts_transpositions_once():
+    assert edit_distance("phnoe", "phone", 2) == 1
+    assert edit_distance("abc", "xyz", 1) == 2
+
+
+@pytest.mark.parametrize("a, b, limit, expected", [
+    ("laptop", "laptop", 2, 0),
+    ("labtop", "laptop", 2, 1),
+    ("lpatop", "laptop", 2, 1),
+    ("lptp", "laptop", 2, 2),
+    ("phone", "headphone", 2, 3),
+    ("phone", "headphone", 5, 4),
+])
+def test_edit_distance_stops_past_the_limit(a, b, limit, expected):
+    assert edit_distance(a, b, limit) == expected
+
+
+def test_correct_term_respects_the_edit_budget(index):
+    assert index.correct_term("labtop") == "laptop"
+    assert index.correct_term("wirelss") == "wireless"
+    # Short and numeric words are never corrected
+    assert index.correct_term("pr") is None
+    assert index.correct_term("12") is None
+    # Too many edits for a five-letter word
+    assert index.correct_term("pxxne") is None
+
+
+def test_correct_leaves_known_words_and_prefixes(index):
+    assert index.correct("Basic Laptop") == ("basic laptop", {})
+    assert index.correct("head") == ("head", {})
+
+
+def test_correct_reports_each_typo(index):
+    assert index.correct("gamng labtop") == ("gaming laptop", {"gamng": "gaming", "labtop": "laptop"})
+    assert ids(index, index.search(index.correct("prp phnoe")[0])) == ["phone-2"]
+
+
+def test_uncorrectable_word_is_kept(index):
+    assert index.correct("zzzzzz phone") == ("zzzzzz phone", {})
+    assert index.search("zzzzzz phone") == []
@@ -0,0 +1,93 @@
+# test_session_store.py
+import pytest
+import session_store
+from agent import add_to_cart
+from session_store import SessionStateStore, session_id
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(session_store.time, "monotonic", clock)
+    return clock
+
+
+def test_sessions_are_isolated():
+    store = SessionStateStore(shards=4)
+    store.update("alice", lambda s: setattr(s, "last_search", "laptop"))
+    assert store.get("alice").last_search == "laptop"
+    assert store.get("bob").last_search == ""
+
+
+def test_update_returns_mutation_result():
+    store = SessionStateStore(shards=1)
+    assert store.update("alice", lambda s: "done") == "done"
+
+
+def test_idle_sessions_expire_on_read(clock):
+    store = SessionStateStore(shards=1, ttl=60)
+    store.update("alice", lambda s: setattr(s, "last_search", "laptop"))
+    store.get("bob")
+    clock.now += 30
+    store.get("bob")
+    clock.now += 40
+    # Only reads from here on: alice has been idle 70s and goes on bob's read
+    store.get("bob")
+    assert len(store) == 1
+    assert store.evicted == 1
+    assert store.get("alice").last_search == ""
+
+
+def test_expired_session_starts_afresh(clock):
+    store = SessionStateStore(shards=1, ttl=60)
+    store.update("alice", lambda s: setattr(s, "last_search", "laptop"))
+    clock.now += 61
+    assert store.get("alice").last_search == ""
+
+
+def test_capacity_evicts_least_recently_used():
+    store = SessionStateStore(shards=1, max_sessions=2)
+    for sid in ("a", "b", "a", "c"):
+        store.get(sid)
+    assert len(store) == 2
+    assert store.stats()["evicted"] == 1
+    store.drop("a")
+    assert len(store) == 1
+
+
+def test_session_id_is_created_once():
+    session = {}
+    sid = session_id(session)
+    assert session == {"sid": sid}
+    assert session_id(session) == sid
+
+
+def test_make_backend_rejects_unknown_kind():
+    with pytest.raises(ValueError):
+        session_store.make_backend("redis")
+
+
+def test_get_returns_a_snapshot():
+    store = SessionStateStore(shards=1)
+    store.update("alice", lambda s: add_to_cart(s, {"id": "phone-1", "title": "Phone", "price": 100}))
+    snapshot = store.get("alice")
+    lines = iter(snapshot.cart)
+    # An update while a reader is iterating leaves the reader's copy alone
+    store.update("alice", lambda s: add_to_cart(s, {"id": "laptop-1", "title": "Laptop", "price": 900}))
+    store.update("alice", lambda s: add_to_cart(s, {"id": "phone-1", "title": "Phone", "price": 100}))
+    assert [(item.id, item.qty) for item in lines] == [("phone-1", 1)]
+    assert (snapshot.cart.count, snapshot.cart.subtotal) == (1, 100)
+
+    # ...and changes to the copy are not persisted
+    snapshot.cart.clear()
+    snapshot.last_search = "ignored"
+    state = store.get("alice")
+    assert (state.cart.count, state.cart.subtotal, state.last_search) == (3, 1100, "")
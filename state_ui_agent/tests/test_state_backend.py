@@ -0,0 +1,112 @@
+# test_state_backend.py
+import asyncio
+import threading
+import time
+import pytest
+import session_store
+import state_backend
+from agent import UIState, add_to_cart
+from session_store import SessionStateStore
+from state_backend import SqliteStateBackend, StateBackend
+
+PRODUCT = {"id": "laptop-1", "title": "Laptop", "price": 50000}
+
+
+@pytest.fixture
+def backend(tmp_path):
+    return SqliteStateBackend(path=str(tmp_path / "state.sqlite3"))
+
+
+def test_state_backend_is_abstract():
+    with pytest.raises(TypeError):
+        StateBackend()
+
+
+def test_sqlite_round_trip_and_drop(backend):
+    assert backend.get("alice").cart.count == 0
+    backend.update("alice", lambda s: add_to_cart(s, PRODUCT))
+    state = backend.get("alice")
+    assert state.cart.quantity("laptop-1") == 1
+    assert backend.stats()["sessions"] == 1
+    backend.drop("alice")
+    assert backend.get("alice").cart.count == 0
+
+
+def test_sqlite_shared_between_instances(backend):
+    backend.update("alice", lambda s: add_to_cart(s, PRODUCT))
+    other = SqliteStateBackend(path=backend.path)
+    assert other.get("alice").cart.quantity("laptop-1") == 1
+
+
+def test_sqlite_concurrent_updates_are_not_lost(backend):
+    workers = [SqliteStateBackend(path=backend.path) for _ in range(4)]
+
+    def shopper(worker):
+        for _ in range(25):
+            worker.update("shared", lambda s: add_to_cart(s, PRODUCT))
+
+    threads = [threading.Thread(target=shopper, args=(w,)) for w in workers]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert backend.get("shared").cart.quantity("laptop-1") == 100
+
+
+def test_sqlite_retries_after_losing_the_race(backend):
+    other = SqliteStateBackend(path=backend.path)
+    backend.update("alice", lambda s: add_to_cart(s, PRODUCT))
+    raced = []
+
+    def mutate(state):
+        if not raced:
+            # Another worker commits between our read and our write
+            raced.append(True)
+            other.update("alice", lambda s: add_to_cart(s, PRODUCT))
+        add_to_cart(state, PRODUCT)
+
+    backend.update("alice", mutate)
+    assert backend.conflicts == 1
+    assert backend.get("alice").cart.quantity("laptop-1") == 3
+
+
+class SlowBackend(SessionStateStore):
+    def update(self, sid, mutate):
+        time.sleep(0.2)
+        return super().update(sid, mutate)
+
+
+def test_async_helpers_do_not_block_the_event_loop(monkeypatch):
+    monkeypatch.setattr(session_store, "store", SlowBackend(shards=1))
+    ticks = []
+
+    async def ticker():
+        for _ in range(10):
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    async def scenario():
+        session = {}
+        _, result = await asyncio.gather(ticker(), session_store.aupdate_state(session, lambda s: "ok"))
+        return session, result
+
+    session, result = asyncio.run(scenario())
+    assert result == "ok" and "sid" in session
+    assert len(ticks) == 10 and ticks[-1] - ticks[0] < 0.2
+
+
+def test_sqlite_expired_session_starts_afresh(tmp_path, monkeypatch):
+    backend = SqliteStateBackend(path=str(tmp_path / "state.sqlite3"), ttl=60)
+    now = time.time()
+    monkeypatch.setattr(state_backend.time, "time", lambda: now)
+    backend.update("alice", lambda s: add_to_cart(s, PRODUCT))
+
+    monkeypatch.setattr(state_backend.time, "time", lambda: now + 59)
+    assert backend.get("alice").cart.count == 1
+
+    monkeypatch.setattr(state_backend.time, "time", lambda: now + 61)
+    assert backend.get("alice").cart.count == 0
+    # The next write replaces the stale row instead of reviving it
+    backend.update("alice", lambda s: add_to_cart(s, PRODUCT))
+    assert backend.get("alice").cart.count == 1
+    assert backend.stats()["sessions"] == 1
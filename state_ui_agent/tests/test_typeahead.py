@@ -0,0 +1,164 @@
+# test_typeahead.py
+import threading
+import pytest
+from typeahead import LatencyTracker, QueryLog, Typeahead, TypeaheadRefresher, title_phrases
+
+TITLES = ["Basic Laptop", "Gaming Laptop", "Pro Laptop", "Basic Phone", "Pro Phone", "Wireless Headphones"]
+
+
+def test_title_phrases_up_to_three_words():
+    assert [key for key, _ in title_phrases("Pro Gaming Laptop Max")] == [
+        "pro", "pro gaming", "pro gaming laptop", "gaming", "gaming laptop", "gaming laptop max",
+        "laptop", "laptop max", "max"]
+
+
+def test_suggest_ranks_by_product_count():
+    typeahead = Typeahead(TITLES)
+    assert typeahead.suggest("l") == ["Laptop"]
+    assert typeahead.suggest("pro") == ["Pro", "Pro Laptop", "Pro Phone"]
+    assert typeahead.suggest("  BASIC  p") == ["Basic Phone"]
+    assert typeahead.suggest("ph") == ["Phone"]
+    assert typeahead.suggest("headphones") == ["Headphones"]
+
+
+def test_suggest_limits():
+    typeahead = Typeahead(TITLES, k=2)
+    assert typeahead.suggest("p") == ["Phone", "Pro"]
+    assert typeahead.suggest("p", limit=1) == ["Phone"]
+
+
+def test_no_suggestions():
+    typeahead = Typeahead(TITLES)
+    assert typeahead.suggest("") == []
+    assert typeahead.suggest("   ") == []
+    assert typeahead.suggest("camera") == []
+    assert typeahead.suggest("lapz") == []
+    assert Typeahead([]).suggest("l") == []
+
+
+def test_logged_queries_outrank_titles():
+    typeahead = Typeahead(TITLES, {"Pro Tablet": 1, "  ": 5})
+    assert typeahead.suggest("pro")[0] == "pro tablet"
+    assert "" not in typeahead.phrases
+
+
+def test_query_log_keeps_the_popular_half():
+    log = QueryLog(max_queries=4, min_sessions=1)
+    for query, times in (("laptop", 5), ("Phone", 4), ("phone ", 1), ("tablet", 2), ("cable", 1), ("", 3)):
+        for _ in range(times):
+            log.record(query)
+    assert log.version == 13
+    # A fifth distinct query trims the log to the two most common
+    log.record("mouse")
+    assert log.popular() == {"laptop": 5, "phone": 5}
+    assert log.popular(1) == {"laptop": 5}
+
+
+def test_query_log_needs_distinct_sessions():
+    log = QueryLog(min_sessions=3)
+    for _ in range(50):
+        log.record("laptop click evil-site dot com", "mallory")
+    log.record("pro phone", "alice")
+    log.record("pro phone", "bob")
+    assert log.popular() == {}
+    log.record("Pro  Phone", "carol")
+    assert log.popular() == {"pro phone": 3}
+
+
+def test_latency_tracker():
+    tracker = LatencyTracker(window=100)
+    assert tracker.stats() == {"requests": 0, "p50_ms": 0.0, "p99_ms": 0.0}
+    for ms in range(1, 201):
+        tracker.observe(ms / 1000)
+    assert tracker.stats() == {"requests": 200, "p50_ms": 151.0, "p99_ms": 200.0}
+
+
+class FakeCatalog:
+    def __init__(self, titles):
+        self.version, self.titles = 1, titles
+
+    def __call__(self):
+        return self.version, iter(self.titles)
+
+
+@pytest.fixture
+def catalog():
+    return FakeCatalog(TITLES)
+
+
+def test_empty_until_the_first_build(catalog):
+    refresher = TypeaheadRefresher(catalog, QueryLog())
+    assert refresher.typeahead.suggest("lap") == []
+    assert refresher.stats["ready"] is False
+    assert refresher.due()
+    assert refresher.refresh()
+    assert refresher.typeahead.suggest("lap") == ["Laptop"]
+    assert refresher.stats["ready"] is True
+    assert refresher.stats["catalog_version"] == 1
+    assert not refresher.due()
+
+
+def test_rebuilds_on_a_new_catalog(catalog):
+    refresher = TypeaheadRefresher(catalog, QueryLog())
+    refresher.refresh()
+    catalog.version, catalog.titles = 2, ["Smart Watch"]
+    assert refresher.due()
+    refresher.refresh()
+    assert refresher.typeahead.suggest("s") == ["Smart", "Smart Watch"]
+    assert refresher.stats["builds"] == 2
+
+
+def test_folds_in_popular_queries_on_the_interval(catalog):
+    log = QueryLog(min_sessions=1)
+    refresher = TypeaheadRefresher(catalog, log, interval=0)
+    refresher.refresh()
+    # Nothing new logged: no rebuild, however long it has been
+    assert not refresher.due()
+    log.record("pro tablet")
+    assert refresher.due()
+    refresher.refresh()
+    assert refresher.typeahead.suggest("pro")[0] == "pro tablet"
+
+    waiting = TypeaheadRefresher(catalog, log, interval=3600)
+    waiting.refresh()
+    log.record("pro tablet")
+    assert not waiting.due()
+
+
+def test_failed_build_keeps_the_previous_trie(catalog):
+    refresher = TypeaheadRefresher(catalog, QueryLog())
+    refresher.refresh()
+    catalog.version, catalog.titles = 2, [None]
+    assert not refresher.refresh()
+    assert refresher.typeahead.suggest("lap") == ["Laptop"]
+    assert refresher.stats["last_error"].startswith("AttributeError")
+    assert refresher.stats["catalog_version"] == 1
+    # Not retried until the catalog changes again
+    assert not refresher.due()
+
+    catalog.version, catalog.titles = 3, ["Smart Watch"]
+    assert refresher.refresh()
+    assert refresher.stats["last_error"] is None
+
+
+def test_background_thread_builds_without_blocking(catalog):
+    release = threading.Event()
+
+    def slow_catalog():
+        release.wait(5)
+        return catalog()
+
+    refresher = TypeaheadRefresher(slow_catalog, QueryLog(), check_interval=0.01)
+    refresher.start()
+    try:
+        # Startup is not held up: lookups answer (empty) while the first build runs
+        assert refresher.typeahead.suggest("lap") == []
+        release.set()
+        for _ in range(500):
+            if refresher.stats["ready"]:
+                break
+            refresher._stop.wait(0.01)
+        assert refresher.typeahead.suggest("lap") == ["Laptop"]
+    finally:
+        refresher.stop()
+    assert refresher._thread is None
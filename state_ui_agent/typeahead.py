@@ -0,0 +1,285 @@
+# typeahead.py - Prefix-trie autocomplete over product titles and popular queries
+import heapq
+import os
+import threading
+import time
+from collections import Counter, deque
+from itertools import islice
+from os.path import commonprefix
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Typeahead settings, overridable from the environment
+TOP_K = int(os.getenv("SHOP_SUGGEST_COUNT", "8"))
+# Seconds between trie rebuilds that fold in newly popular queries
+REFRESH_SECONDS = float(os.getenv("SHOP_SUGGEST_REFRESH", "60"))
+# Seconds between checks for a new catalog snapshot
+CATALOG_CHECK_SECONDS = 1.0
+# Suggestions are title phrases of up to this many words, starting at any word
+PHRASE_WORDS = 3
+POPULAR_QUERIES = 1000
+# A logged query is only suggested once this many distinct visitors searched for it
+MIN_SESSIONS = int(os.getenv("SHOP_SUGGEST_MIN_SESSIONS", "3"))
+# A logged query counts like this many products containing the phrase
+QUERY_WEIGHT = 10
+LATENCY_WINDOW = 10000
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def title_phrases(title: str) -> Iterable[Tuple[str, str]]:
+    """(key, display) for each run of 1..PHRASE_WORDS words in a title"""
+    words = title.split()
+    for start in range(len(words)):
+        for end in range(start + 1, min(start + PHRASE_WORDS, len(words)) + 1):
+            display = " ".join(words[start:end])
+            yield display.lower(), display
+
+
+class _Node:
+    __slots__ = ("children", "phrase", "top")
+
+    def __init__(self):
+        # first character -> (edge label, child)
+        self.children: Dict[str, Tuple[str, "_Node"]] = {}
+        self.phrase = -1
+        self.top: List[int] = []
+
+
+class Typeahead:
+    """
+    Compressed (radix) prefix trie. Every node keeps the ids of its TOP_K
+    heaviest completions, computed once at build time, so a lookup is a walk
+    down at most len(prefix) characters and no ranking at query time.
+    """
+
+    def __init__(self, titles: Iterable[str], queries: Optional[Dict[str, int]] = None, k: int = TOP_K):
+        weights: Counter = Counter()
+        display: Dict[str, str] = {}
+        for title in titles:
+            # Count each phrase once per product
+            phrases = dict(title_phrases(title))
+            weights.update(phrases.keys())
+            for key, text in phrases.items():
+                display.setdefault(key, text)
+        for query, count in (queries or {}).items():
+            key = normalize(query)
+            if key:
+                weights[key] += count * QUERY_WEIGHT
+                display.setdefault(key, key)
+
+        self.k = k
+        self.phrases: List[str] = []
+        self.weights: List[int] = []
+        self.root = _Node()
+        self.nodes = 1
+        for key in sorted(weights):
+            self._insert(key, len(self.phrases))
+            self.phrases.append(display[key])
+            self.weights.append(weights[key])
+        self._rank(self.root)
+
+    def _insert(self, key: str, phrase: int):
+        node, i = self.root, 0
+        while i < len(key):
+            edge = node.children.get(key[i])
+            if edge is None:
+                leaf = _Node()
+                node.children[key[i]] = (key[i:], leaf)
+                node, i = leaf, len(key)
+                self.nodes += 1
+                break
+            label, child = edge
+            shared = len(commonprefix((label, key[i:])))
+            if shared < len(label):
+                # Split the edge at the point where the keys diverge
+                middle = _Node()
+                middle.children[label[shared]] = (label[shared:], child)
+                node.children[key[i]] = (label[:shared], middle)
+                child = middle
+                self.nodes += 1
+            node, i = child, i + shared
+        node.phrase = phrase
+
+    def _rank(self, root: _Node):
+        # Post-order without recursion: children are ranked before their parent
+        order, stack = [], [root]
+        while stack:
+            node = stack.pop()
+            order.append(node)
+            stack.extend(child for _, child in node.children.values())
+        weights = self.weights
+        for node in reversed(order):
+            candidates = [node.phrase] if node.phrase >= 0 else []
+            for _, child in node.children.values():
+                candidates.extend(child.top)
+            node.top = heapq.nsmallest(self.k, candidates, key=lambda p: (-weights[p], p))
+
+    def suggest(self, prefix: str, limit: Optional[int] = None) -> List[str]:
+        key = normalize(prefix)
+        if not key:
+            return []
+        node, i = self.root, 0
+        while i < len(key):
+            edge = node.children.get(key[i])
+            if edge is None:
+                return []
+            label, child = edge
+            rest = key[i:]
+            if rest.startswith(label):
+                node, i = child, i + len(label)
+            elif label.startswith(rest):
+                node, i = child, len(key)
+            else:
+                return []
+        return [self.phrases[p] for p in node.top[:limit or self.k]]
+
+
+class QueryLog:
+    """
+    Bounded counts of searches whose every word matched, folded into the next
+    trie build. A query is only reported as popular once MIN_SESSIONS distinct
+    sessions searched for it, so one visitor cannot put text in front of everyone.
+    """
+
+    def __init__(self, max_queries: int = POPULAR_QUERIES * 10, min_sessions: int = MIN_SESSIONS):
+        self.max_queries = max_queries
+        self.min_sessions = min_sessions
+        self._counts: Counter = Counter()
+        # query -> distinct sessions that searched it (at most min_sessions kept)
+        self._sessions: Dict[str, set] = {}
+        self._lock = threading.Lock()
+        # Bumped on every record, so a refresher can tell when there is something new
+        self.version = 0
+
+    def record(self, query: str, session: str = ""):
+        key = normalize(query)
+        if not key:
+            return
+        with self._lock:
+            self._counts[key] += 1
+            seen = self._sessions.setdefault(key, set())
+            if len(seen) < self.min_sessions:
+                seen.add(session)
+            self.version += 1
+            if len(self._counts) > self.max_queries:
+                # Forget the rarer half
+                self._counts = Counter(dict(self._counts.most_common(self.max_queries // 2)))
+                self._sessions = {key: self._sessions[key] for key in self._counts}
+
+    def popular(self, n: int = POPULAR_QUERIES) -> Dict[str, int]:
+        with self._lock:
+            shared = (item for item in self._counts.most_common() if len(self._sessions[item[0]]) >= self.min_sessions)
+            return dict(islice(shared, n))
+
+
+class TypeaheadRefresher:
+    """
+    Holds the current Typeahead and rebuilds it in a background thread, off
+    the startup path: as soon as it starts, whenever the catalog version
+    changes, and every `interval` seconds when new queries were logged. The
+    new trie is published by swapping a single reference; until the first
+    build finishes, lookups see an empty trie (no suggestions).
+
+    `catalog` returns the current (version, titles) to build from.
+    """
+
+    def __init__(self, catalog: Callable[[], Tuple[int, Iterable[str]]], log: QueryLog,
+                 interval: float = REFRESH_SECONDS, check_interval: float = CATALOG_CHECK_SECONDS):
+        self._catalog = catalog
+        self._log = log
+        self.interval = interval
+        self.check_interval = check_interval
+        self.typeahead = Typeahead([])
+        self._catalog_version: Optional[int] = None
+        self._log_version = -1
+        self._built_at = 0.0
+        self.stats: Dict = {
+            "ready": False,
+            "catalog_version": None,
+            "builds": 0,
+            "build_ms": 0.0,
+            "last_error": None,
+        }
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def due(self) -> bool:
+        if self._catalog_version is None:
+            return True
+        version, _ = self._catalog()
+        if version != self._catalog_version:
+            return True
+        return self._log.version != self._log_version and time.monotonic() - self._built_at >= self.interval
+
+    def refresh(self) -> bool:
+        """Build a trie from the current catalog and popular queries; returns True on a swap"""
+        log_version = self._log.version
+        version, titles = self._catalog()
+        started = time.perf_counter()
+        try:
+            fresh = Typeahead(titles, self._log.popular())
+        except Exception as e:
+            # Keep serving the previous trie; retried on the next change or interval
+            self._catalog_version, self._log_version = version, log_version
+            self._built_at = time.monotonic()
+            self.stats["last_error"] = f"{type(e).__name__}: {e}"
+            return False
+        self.typeahead = fresh
+        self._catalog_version, self._log_version = version, log_version
+        self._built_at = time.monotonic()
+        self.stats.update(
+            ready=True,
+            catalog_version=version,
+            builds=self.stats["builds"] + 1,
+            build_ms=round((time.perf_counter() - started) * 1000, 1),
+            last_error=None,
+        )
+        return True
+
+    def _run(self):
+        self.refresh()
+        while not self._stop.wait(self.check_interval):
+            if self.due():
+                self.refresh()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="typeahead-refresh", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+class LatencyTracker:
+    """Recent request durations with percentiles"""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._samples: deque = deque(maxlen=window)
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self._samples.append(seconds)
+        self.count += 1
+
+    def percentile(self, pct: float) -> float:
+        samples = sorted(self._samples)
+        if not samples:
+            return 0.0
+        return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+    def stats(self) -> Dict:
+        return {
+            "requests": self.count,
+            "p50_ms": round(self.percentile(50) * 1000, 3),
+            "p99_ms": round(self.percentile(99) * 1000, 3),
+        }
+
+
+query_log = QueryLog()
+suggest_latency = LatencyTracker()
@@ -1,12 +1,11 @@
 # ui.py - Enhanced UI Components for Ecommerce AI Assistant
 from fasthtml.common import *
+from urllib.parse import urlencode
+from agent import Cart
 
 def get_cart_quantity(cart, product_id):
     """Get quantity of product in cart"""
-    for item in cart:
-        if item.id == product_id:
-            return item.qty
-    return 0
+    return cart.quantity(product_id)
 
 def product_card(product, cart):
     """Enhanced product card with quantity display and improved styling"""
@@ -69,8 +68,9 @@ def product_card(product, cart):
         style="position: relative;"
     )
 
-def search_bar(current_query=""):
-    """Enhanced search bar"""
+def search_bar(current_query="", filters=None):
+    """Enhanced search bar with price range (keeps the selected category)"""
+    filters = filters or {}
     return Div(
         Form(
             Input(
@@ -78,12 +78,68 @@ def search_bar(current_query=""):
                 name="q", 
                 value=current_query,
                 placeholder="Search laptops, phones, headphones...",
-                cls="search-bar"
+                cls="search-bar",
+                id="search-input",
+                list="search-suggestions",
+                autocomplete="off"
             ),
+            Datalist(id="search-suggestions"),
+            Input(type="number", name="min_price", value=filters.get("min_price") or "", placeholder="Min ₹",
+                  min="0", cls="search-bar", style="width: 120px;"),
+            Input(type="number", name="max_price", value=filters.get("max_price") or "", placeholder="Max ₹",
+                  min="0", cls="search-bar", style="width: 120px;"),
+            Input(type="hidden", name="category", value=filters.get("category") or "") if filters.get("category") else "",
             Button("Search", type="submit", cls="btn btn-primary"),
             action="/search", method="get",
             style="display: flex; gap: 10px; margin-bottom: 20px;"
-        )
+        ),
+        typeahead_javascript()
+    )
+
+def typeahead_javascript():
+    """Fill the search box's suggestion list from /suggest while typing"""
+    return Script("""
+        (function() {
+            const input = document.getElementById('search-input');
+            const list = document.getElementById('search-suggestions');
+            if (!input || !list) return;
+            let timer = null, last = '';
+            input.addEventListener('input', function() {
+                clearTimeout(timer);
+                timer = setTimeout(async function() {
+                    const q = input.value.trim();
+                    if (!q || q === last) return;
+                    last = q;
+                    try {
+                        const res = await fetch('/suggest?q=' + encodeURIComponent(q));
+                        const phrases = await res.json();
+                        if (input.value.trim() !== q) return;
+                        list.replaceChildren(...phrases.map(phrase => {
+                            const option = document.createElement('option');
+                            option.value = phrase;
+                            return option;
+                        }));
+                    } catch (e) {
+                        // Suggestions are optional; the search form still works
+                    }
+                }, 80);
+            });
+        })();
+    """)
+
+def facet_bar(query, category_counts, filters):
+    """Category filter links with match counts"""
+    def link(label, category):
+        params = {k: v for k, v in {"q": query, "category": category,
+                                    "min_price": filters.get("min_price"), "max_price": filters.get("max_price")}.items() if v}
+        active = (category or None) == (filters.get("category") or None)
+        return A(label, href="/search?" + urlencode(params),
+                 cls="btn btn-primary" if active else "btn btn-secondary", style="padding: 6px 12px;")
+    
+    return Div(
+        link(f"All ({sum(category_counts.values()):,})", None),
+        *[link(f"{name.title()} ({count:,})", name) for name, count in category_counts.items()],
+        style="display: flex; flex-wrap: wrap; gap: 8px; margin-bottom: 20px;"
     )
 
 def navigation_bar(cart_count=0):
@@ -361,7 +417,7 @@ def ai_chat_javascript():
 def home_page(products, cart_count=0, cart=None):
     """Enhanced home page with products and AI assistant drawer"""
     if cart is None:
-        cart = []
+        cart = Cart()
         
     return Html(
         Head(
@@ -397,10 +453,10 @@ def home_page(products, cart_count=0, cart=None):
         )
     )
 
-def search_page(products, query, cart, cart_count=0):
+def search_page(products, query, cart, cart_count=0, correction="", total=None, category_counts=None, filters=None):
     """Search results page with AI assistant drawer"""
     if cart is None:
-        cart = []
+        cart = Cart()
     
     return Html(
         Head(
@@ -413,9 +469,13 @@ def search_page(products, query, cart, cart_count=0):
             Div(
                 H2(f"Search Results for '{query}'" if query else "All Products"),
                 
-                search_bar(query),
+                search_bar(query, filters),
+                
+                facet_bar(query, category_counts, filters or {}) if category_counts else "",
+                
+                P(f"Showing results for corrected spelling: {correction}", cls="quantity-display") if correction else "",
                 
-                P(f"Found {len(products)} products") if products else P("No products found. Try a different search."),
+                P(f"Found {total if total is not None else len(products):,} products") if products else P("No products found. Try a different search."),
                 
                 Div(
                     *[product_card(product, cart) for product in products],